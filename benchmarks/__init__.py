@@ -0,0 +1 @@
+# Performance benchmarks for connect4 project.
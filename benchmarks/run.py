@@ -0,0 +1,343 @@
+"""Performance benchmarks for the board and the bots.
+
+The suite measures
+
+- micro-benchmarks of the board operations on a fixed set of positions,
+- end-to-end games per second for each bot pairing,
+- move latency percentiles of the bots,
+- the scaling of the parallel search with the number of worker processes.
+
+Results are written as JSON and can be compared against a stored baseline::
+
+    PYTHONPATH=src python -m benchmarks.run --output bench.json
+    PYTHONPATH=src python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    PYTHONPATH=src python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+
+With a baseline the command exits with status 1 if any result got worse by more
+than the threshold (relative change).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from connect4 import GameBoard, Bot, SmartBot, SearchBot, MCTSBot
+from connect4.parallel import ParallelSearch
+from connect4.simulate import simulate
+
+
+# Bot pairings for the end-to-end benchmarks: name -> (player1 spec, player2 spec)
+PAIRINGS = {
+    "Bot-Bot": (Bot, Bot),
+    "SmartBot-Bot": (SmartBot, Bot),
+    "SmartBot-SmartBot": (SmartBot, SmartBot),
+    "SearchBot-SmartBot": ((SearchBot, {"max_time": None, "max_depth": 4}), SmartBot),
+    "MCTSBot-SmartBot": ((MCTSBot, {"max_playouts": 200}), SmartBot),
+}
+
+
+def make_positions(count: int = 200, seed: int = 42) -> list[list[int]]:
+    """Return a fixed set of positions as move lists.
+
+    The positions are random games cut off at a random number of moves; games
+    which are already won or drawn are left out, so every position can be
+    continued.
+
+    Parameters
+    ----------
+    count : int
+        Number of positions.
+    seed : int
+        Seed of the random games.
+
+    Returns
+    -------
+    list[list[int]]
+        Played columns per position, red moves first.
+    """
+    rng = random.Random(seed)
+    positions = []
+    board = GameBoard()
+    while len(positions) < count:
+        board.reset_board()
+        moves = []
+        for _ in range(rng.randrange(0, 36)):
+            column = rng.choice(board.legal_moves())
+            board.play(column)
+            moves.append(column)
+            if board.check_last_move_wins():
+                break
+        else:
+            positions.append(moves)
+    return positions
+
+
+def _boards(positions: list[list[int]]) -> list[GameBoard]:
+    """Create one board per position."""
+    boards = []
+    for moves in positions:
+        board = GameBoard()
+        for column in moves:
+            board.play(column)
+        boards.append(board)
+    return boards
+
+
+def _time_per_call(operation, boards: list[GameBoard], repeat: int) -> float:
+    """Return the best time of ``repeat`` rounds of ``operation`` over all boards, in nanoseconds per call.
+
+    ``operation`` is called with a board and a column of the board that is not full.
+    """
+    cases = [(board, board.legal_moves(centre_first=True)[0]) for board in boards]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for board, column in cases:
+            operation(board, column)
+        best = min(best, time.perf_counter() - start)
+    return 1e9 * best / len(cases)
+
+
+def _add_coin_and_undo(board: GameBoard, column: int):
+    board.add_coin(board.color_to_move(), column)
+    board.undo()
+
+
+def _play_and_undo(board: GameBoard, column: int):
+    board.play(column)
+    board.undo()
+
+
+# Board operations: name -> function called with a board and a free column
+BOARD_OPERATIONS = {
+    "add_coin+undo": _add_coin_and_undo,
+    "play+undo": _play_and_undo,
+    "check_for_winner": lambda board, column: board.check_for_winner("red"),
+    "check_last_move_wins": lambda board, column: board.check_last_move_wins(),
+    "check_for_draw": lambda board, column: board.check_for_draw(),
+    "legal_moves": lambda board, column: board.legal_moves(),
+    "landing_row": lambda board, column: board.landing_row(column),
+    "position_key": lambda board, column: board.position_key(),
+}
+
+
+def board_benchmarks(positions: list[list[int]], repeat: int) -> dict:
+    """Measure the board operations on a set of positions.
+
+    Returns
+    -------
+    dict
+        Result per operation in nanoseconds per call (lower is better).
+    """
+    boards = _boards(positions)
+    results = {}
+    for name, operation in BOARD_OPERATIONS.items():
+        results[f"board.{name}"] = {"value": _time_per_call(operation, boards, repeat), "unit": "ns/op",
+                                    "higher_is_better": False}
+    return results
+
+
+def smartbot_benchmarks(positions: list[list[int]]) -> dict:
+    """Measure the move latency of SmartBot.play_turn on a set of positions.
+
+    Returns
+    -------
+    dict
+        Median and 95th percentile in microseconds (lower is better).
+    """
+    bot = SmartBot("bench", color="red")
+    bot.verbose = False
+    times = []
+    for board in _boards(positions):
+        start = time.perf_counter()
+        bot.play_turn(board)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "smartbot.play_turn.p50": {"value": 1e6 * statistics.median(times), "unit": "us", "higher_is_better": False},
+        "smartbot.play_turn.p95": {"value": 1e6 * times[int(0.95 * (len(times) - 1))], "unit": "us",
+                                   "higher_is_better": False},
+    }
+
+
+def game_benchmarks(games: int, seed: int = 0) -> dict:
+    """Play games for every bot pairing in this process.
+
+    Returns
+    -------
+    dict
+        Games per second per pairing (higher is better) and move latency
+        percentiles of player 1 in milliseconds (lower is better). The latency
+        of the random Bot is left out, it is too small to be measured reliably.
+    """
+    results = {}
+    for name, (player1, player2) in PAIRINGS.items():
+        report = simulate(player1, player2, games, workers=1, seed=seed)
+        results[f"games.{name}.games_per_second"] = {"value": report.games_per_second, "unit": "games/s",
+                                                     "higher_is_better": True}
+        if player1 is Bot:
+            continue
+        latency = report.latency("player1")
+        for percentile in ("p50", "p95"):
+            results[f"games.{name}.player1_latency.{percentile}"] = {"value": latency[percentile], "unit": "ms",
+                                                                     "higher_is_better": False}
+    return results
+
+
+def parallel_benchmarks(positions: list[list[int]], depth: int, workers: list[int] | None = None) -> dict:
+    """Measure how the parallel search scales with the number of worker processes.
+
+    Every position is searched to a fixed depth with a fresh ``ParallelSearch``
+    per worker count; the speedup is the time with one worker divided by the
+    time with more workers.
+
+    Parameters
+    ----------
+    positions : list[list[int]]
+        Positions to search.
+    depth : int
+        Search depth in plies.
+    workers : list[int] or None
+        Worker counts to measure, by default 1, 2, 4, ... up to the number of
+        CPU cores (and the number of cores itself).
+
+    Returns
+    -------
+    dict
+        Seconds for all positions (lower is better), searched nodes per
+        second (higher is better) and speedup against one worker (higher is
+        better) per worker count.
+    """
+    if workers is None:
+        cores = os.cpu_count() or 1
+        workers = sorted({1 << n for n in range(cores.bit_length()) if 1 << n <= cores} | {cores})
+    searches = []
+    for board in _boards(positions):
+        position = board.get_bitboard(board.color_to_move())
+        searches.append((position, board.get_bitboard("red") | board.get_bitboard("yellow")))
+
+    results = {}
+    single = None
+    for count in workers:
+        with ParallelSearch(count, table_size=1 << 18) as search:
+            # Start the worker processes before timing
+            search.search(0, 0, max_time=None, max_depth=1)
+            nodes = 0
+            seconds = 0.0
+            for position, mask in searches:
+                search.table.clear()
+                start = time.perf_counter()
+                search.search(position, mask, max_time=None, max_depth=depth)
+                seconds += time.perf_counter() - start
+                nodes += search.nodes
+        single = single or seconds
+        results[f"parallel.workers_{count}.seconds"] = {"value": seconds, "unit": "s", "higher_is_better": False}
+        results[f"parallel.workers_{count}.nodes_per_second"] = {"value": nodes / seconds, "unit": "nodes/s",
+                                                                 "higher_is_better": True}
+        results[f"parallel.workers_{count}.speedup"] = {"value": single / seconds, "unit": "x",
+                                                        "higher_is_better": True}
+    return results
+
+
+def run_suite(quick: bool = False) -> dict:
+    """Run all benchmarks.
+
+    Parameters
+    ----------
+    quick : bool
+        Use fewer positions, repeats and games, e.g. for a smoke test.
+
+    Returns
+    -------
+    dict
+        ``{"meta": {...}, "results": {name: {"value", "unit", "higher_is_better"}}}``
+    """
+    positions = make_positions(50 if quick else 200)
+    results = {}
+    results.update(board_benchmarks(positions, repeat=3 if quick else 20))
+    results.update(smartbot_benchmarks(positions))
+    results.update(game_benchmarks(4 if quick else 40))
+    # Middlegame positions, where a single move takes long enough to gain from more cores
+    middlegame = [moves for moves in positions if 8 <= len(moves) <= 20]
+    results.update(parallel_benchmarks(middlegame[:2 if quick else 10], depth=6 if quick else 10))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compare results against a baseline.
+
+    Parameters
+    ----------
+    current : dict
+        Results of ``run_suite``.
+    baseline : dict
+        Stored results of an earlier run.
+    threshold : float
+        Allowed relative change for the worse, e.g. 0.2 for 20 %.
+
+    Returns
+    -------
+    list[str]
+        One message per regression; benchmarks missing in either run are skipped.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        change = (result["value"] - reference["value"]) / reference["value"]
+        if result["higher_is_better"]:
+            change = -change
+        if change > threshold:
+            regressions.append(f"{name}: {reference['value']:.3f} -> {result['value']:.3f} {result['unit']}"
+                               f" ({100 * change:.1f} % worse)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point, see ``python -m benchmarks.run --help``."""
+    parser = argparse.ArgumentParser(description="Run the connect4 performance benchmarks.")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as new baseline to this file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument("--quick", action="store_true", help="fewer positions and games")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.quick)
+    for name, result in current["results"].items():
+        print(f"{name:55} {result['value']:12.3f} {result['unit']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(current, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {100 * args.threshold:.0f} %:")
+            for message in regressions:
+                print("  " + message)
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
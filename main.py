@@ -1,119 +1,94 @@
 #File to execute the game logic itself
-from connect4 import GameSetup, GameBoard
+import argparse
 
-print("Welcome to Connect-4!")
-print("""
+from connect4 import GameSetup, GameBoard, GameSession
+from connect4.records import GameLog, GameRecord
+
+#Every finished game is appended to this file, see "python -m connect4.records game_records.bin"
+LOG_PATH = "game_records.bin"
+
+
+def main():
+    """Play games on the command line until the players stop."""
+    #Board size and connect length, e.g. "python main.py --rows 7 --columns 9 --connect 5"
+    parser = argparse.ArgumentParser(description="Play Connect 4 on the command line.")
+    parser.add_argument("--rows", type=int, default=6, help="number of rows (default 6)")
+    parser.add_argument("--columns", type=int, default=7, help="number of columns (default 7)")
+    parser.add_argument("--connect", type=int, default=4, help="coins in a row needed to win (default 4)")
+    args = parser.parse_args()
+
+    print("Welcome to Connect-4!")
+    print("""
     Rules:
     Players take turns dropping one disc into any column.
     The disc falls to the lowest empty space in that column.
     The goal is to connect four of your discs in a row (horizontal, vertical, or diagonal).
-    The first player to connect four wins.
+    The first player to connect four (or the chosen connect length) wins.
     If the grid fills and no one connects four, the game is a draw.
     -------------
     To surrender the game please enter "I surrender!" on your turn.
     """)
-print("Let's begin! \n\n")
-
-
-#Outline logic for game
-
-#Create setup
-setup = GameSetup()
-
-#Create empty board
-board = GameBoard()
-
-#Select number of players
-num_players = setup.choose_players()
-
-#Create player objects
-players = setup.create_players(num_players)
-
-while True:
-    #Select starting player
-    starter = setup.pick_starting_player(players)
+    print("Let's begin! \n\n")
 
-    #Assigning player1 and player2
-    player1 = starter
-    player2 = players[0] if starter is players[1] else players[1]
 
-    #Print empty board
-    board.print_board()
+    #Outline logic for game
 
-    #Play game until one winner or draw 
-    game_over = False
-    while not game_over:
+    #Create setup
+    setup = GameSetup()
 
-        move = player1.play_turn(board)
-        if move is None:
-            print(f"{player2.name} has won the game! {player1.name} surrendered.")
-            game_over = True
-            break
+    #Create empty board
+    board = GameBoard(args.rows, args.columns, args.connect)
 
-        # Keep asking until the coin is placed (full or invalid column)
-        while True:
-            result = board.add_coin(player1.color, move)
-            if result is True:
-                break
-            print(result if type(result) == str else "The last turn was not valid. Please enter a valid column.")
-            move = player1.play_turn(board)
-            if move is None:
-                print(f"{player2.name} has won the game! {player1.name} surrendered.")
-                game_over = True
-                break
-        if move is None:
-            break
+    #Open the game log
+    game_log = GameLog(LOG_PATH)
 
-        board.print_board()
+    #Select number of players
+    num_players = setup.choose_players()
 
-        if board.check_for_winner(player1.color):
-            print(f"{player1.name} has won the game!")
-            game_over = True
-            break
+    #Create player objects
+    players = setup.create_players(num_players, board)
 
-        elif board.check_for_draw():
-            print("Game has ended with a draw.")
-            game_over = True
-            break
+    while True:
+        #Select starting player
+        starter = setup.pick_starting_player(players)
 
+        #Assigning player1 and player2
+        player1 = starter
+        player2 = players[0] if starter is players[1] else players[1]
 
-        move = player2.play_turn(board)
-        if move is None:
-            print(f"{player1.name} has won the game! {player2.name} surrendered.")
-            game_over = True
-            break
-
-        # Keep asking until the coin is placed (full or invalid column)
-        while True:
-            result = board.add_coin(player2.color, move)
-            if result is True:
-                break
-            print(result if type(result) == str else "The last turn was not valid. Please enter a valid column.")
-            move = player2.play_turn(board)
-            if move is None:
-                print(f"{player1.name} has won the game! {player2.name} surrendered.")
-                game_over = True
-                break
-        if move is None:
-            break
-
+        #Print empty board
         board.print_board()
 
-        if board.check_for_winner(player2.color):
-            print(f"{player2.name} has won the game!")
-            game_over = True
-            break
-
-        elif board.check_for_draw():
-            print("Game has ended with a draw.")
-            game_over = True
+        #Play game until one winner or draw
+        session = GameSession(player1, player2, board)
+        while not session.is_over:
+            result = session.play_turn()
+
+            # Keep asking until the coin is placed (full or invalid column)
+            if result is not True:
+                print(result if type(result) == str else "The last turn was not valid. Please enter a valid column.")
+                continue
+
+            if session.surrendered is None:
+                board.print_board()
+
+        print(session.result_message())
+        game_log.append(GameRecord.from_session(session))
+        #End game
+
+        #Clear board
+        board.reset_board()
+
+        #Option to play again
+        if not setup.choose_to_play_again():
+            print("Thanks for playing!")
+            game_log.close()
+            #Stop the search processes of the bot
+            for player in players:
+                player.close()
             break
-    #End game
 
-    #Clear board
-    board.reset_board()
 
-    #Option to play again
-    if not setup.choose_to_play_again():
-        print("Thanks for playing!")
-        break    
\ No newline at end of file
+#Worker processes of the bots import this module again when they are spawned, so the game only runs as a script
+if __name__ == "__main__":
+    main()
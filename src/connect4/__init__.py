@@ -9,9 +9,11 @@ __version__ = '1.0.0'
 __author__ = 'Melina Fellner & Martin Matzer'
 
 from .game_board import GameBoard
+from .position import Position
 from .game_setup import GameSetup
-from .players import HumanPlayer, Bot, SmartBot
+from .session import GameSession
+from .players import HumanPlayer, Bot, SmartBot, SearchBot, MCTSBot, PerfectBot
 
 # Define what gets imported with "from package import *"
-__all__ = ['GameBoard', 'GameSetup', 'HumanPlayer', 'Bot', 'SmartBot']
+__all__ = ['GameBoard', 'Position', 'GameSetup', 'GameSession', 'HumanPlayer', 'Bot', 'SmartBot', 'SearchBot', 'MCTSBot', 'PerfectBot']
 
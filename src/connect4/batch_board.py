@@ -0,0 +1,148 @@
+"""Vectorized game board for many games in lockstep.
+
+``BatchGameBoard`` stores K boards as NumPy arrays and advances all of them
+with one call, e.g. for self-play or Monte Carlo rollouts. It follows the
+rules of ``GameBoard``: coins fall to the lowest free cell, a full or invalid
+column is rejected, four connected coins win and a full board is a draw.
+
+This module needs NumPy, which is an optional dependency of the package
+(``pip install .[numpy]``).
+"""
+
+import numpy as np
+
+from . import bitboard
+from .game_board import GameBoard
+from .position import Position
+
+
+EMPTY = 0
+RED = 1
+YELLOW = 2
+
+
+class BatchGameBoard:
+    """K Connect 4 boards stored as NumPy arrays.
+
+    Attributes
+    ----------
+    cells : numpy.ndarray
+        ``int8`` array of shape (K, 6, 7) with EMPTY, RED or YELLOW per cell;
+        row 0 is the top row like in ``GameBoard``.
+    heights : numpy.ndarray
+        ``int8`` array of shape (K, 7) with the number of coins per column.
+    to_move : numpy.ndarray
+        ``int8`` array of shape (K,) with the color to move next per board.
+    """
+
+    def __init__(self, count: int):
+        """Create ``count`` empty boards with red to move.
+
+        Parameters
+        ----------
+        count : int
+            Number of boards K.
+        """
+        self._ROW_COUNT = bitboard.ROW_COUNT
+        self._COLUMN_COUNT = bitboard.COLUMN_COUNT
+        self.cells = np.zeros((count, self._ROW_COUNT, self._COLUMN_COUNT), dtype=np.int8)
+        self.heights = np.zeros((count, self._COLUMN_COUNT), dtype=np.int8)
+        self.to_move = np.full(count, RED, dtype=np.int8)
+
+    def __len__(self) -> int:
+        """Return the number of boards K."""
+        return len(self.cells)
+
+    def reset_board(self):
+        """Remove all coins from all boards and give red the next move."""
+        self.cells[:] = EMPTY
+        self.heights[:] = 0
+        self.to_move[:] = RED
+
+    def add_coin(self, columns, colors=None) -> np.ndarray:
+        """Add one coin to every board.
+
+        Parameters
+        ----------
+        columns : array_like
+            Column per board; a negative value skips the board.
+        colors : array_like or None
+            RED or YELLOW per board, defaults to ``to_move``.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array of shape (K,), True where a coin was added and False
+            where the column was invalid, full or skipped.
+        """
+        columns = np.asarray(columns, dtype=np.int64)
+        colors = self.to_move.copy() if colors is None else np.asarray(colors, dtype=np.int8)
+        boards = np.arange(len(self))
+
+        valid = (columns >= 0) & (columns < self._COLUMN_COUNT)
+        safe_columns = np.where(valid, columns, 0)
+        heights = self.heights[boards, safe_columns]
+        placed = valid & (heights < self._ROW_COUNT)
+
+        boards = boards[placed]
+        safe_columns = safe_columns[placed]
+        self.cells[boards, self._ROW_COUNT - 1 - heights[placed], safe_columns] = colors[placed]
+        self.heights[boards, safe_columns] += 1
+        self.to_move[boards] = RED + YELLOW - colors[placed]
+        return placed
+
+    def valid_moves_mask(self) -> np.ndarray:
+        """Return a boolean array of shape (K, 7), True for every column that is not full."""
+        return self.heights < self._ROW_COUNT
+
+    def winners(self) -> np.ndarray:
+        """Return the winner of every board.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``int8`` array of shape (K,) with RED or YELLOW for boards with four
+            connected coins of that color and EMPTY otherwise.
+        """
+        result = np.zeros(len(self), dtype=np.int8)
+        result[_has_four(self.cells == YELLOW)] = YELLOW
+        result[_has_four(self.cells == RED)] = RED
+        return result
+
+    def is_draw(self) -> np.ndarray:
+        """Return a boolean array of shape (K,), True for every full board like ``GameBoard.check_for_draw``."""
+        return np.all(self.heights >= self._ROW_COUNT, axis=1)
+
+    def to_game_board(self, index: int) -> GameBoard:
+        """Copy one board of the batch into a ``GameBoard``.
+
+        Parameters
+        ----------
+        index : int
+            Index of the board in the batch.
+
+        Returns
+        -------
+        GameBoard
+            Board with the same coins and color to move, without a move
+            history (see ``GameBoard.from_position``).
+        """
+        bitboards = {RED: 0, YELLOW: 0}
+        for row, column in zip(*np.nonzero(self.cells[index])):
+            bitboards[int(self.cells[index, row, column])] |= bitboard.cell_bit(int(row), int(column))
+        to_move = int(self.to_move[index])
+        mask = bitboards[RED] | bitboards[YELLOW]
+        return GameBoard.from_position(Position(bitboards[to_move], mask, to_move == RED))
+
+
+def _has_four(coins: np.ndarray) -> np.ndarray:
+    """Return for every board of a boolean (K, rows, columns) array whether it has four connected cells.
+
+    Each direction is checked by AND-ing four shifted views of the array.
+    """
+    horizontal = coins[:, :, :-3] & coins[:, :, 1:-2] & coins[:, :, 2:-1] & coins[:, :, 3:]
+    vertical = coins[:, :-3, :] & coins[:, 1:-2, :] & coins[:, 2:-1, :] & coins[:, 3:, :]
+    falling = coins[:, :-3, :-3] & coins[:, 1:-2, 1:-2] & coins[:, 2:-1, 2:-1] & coins[:, 3:, 3:]
+    rising = coins[:, 3:, :-3] & coins[:, 2:-1, 1:-2] & coins[:, 1:-2, 2:-1] & coins[:, :-3, 3:]
+    return (horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2))
+            | falling.any(axis=(1, 2)) | rising.any(axis=(1, 2)))
@@ -0,0 +1,475 @@
+"""Bitboard helpers for the Connect 4 game board.
+
+A position is stored as one integer per color. Every column of the board uses
+``ROW_COUNT + 1`` consecutive bits: the lowest bit is the bottom cell of the
+column and the additional top bit always stays empty. This separator bit makes
+sure that shifting a bitboard never carries a coin over into the next column,
+so that a win check only needs a few shift-and-mask operations.
+
+Bit layout for the standard 6x7 board (bit index, row 0 is the top row)::
+
+     5 12 19 26 33 40 47
+     4 11 18 25 32 39 46
+     3 10 17 24 31 38 45
+     2  9 16 23 30 37 44
+     1  8 15 22 29 36 43
+     0  7 14 21 28 35 42
+
+Other board sizes and connect lengths are described by a ``Geometry``.
+"""
+
+import functools
+
+ROW_COUNT = 6
+COLUMN_COUNT = 7
+HEIGHT = ROW_COUNT + 1
+
+# One bit per column marking the bottom cell
+BOTTOM_MASK = sum(1 << (column * HEIGHT) for column in range(COLUMN_COUNT))
+
+# All playable cells of one column (without the separator bit)
+COLUMN_BITS = (1 << ROW_COUNT) - 1
+
+# All playable cells of the board
+BOARD_MASK = BOTTOM_MASK * COLUMN_BITS
+
+# Number of playable cells of the board
+CELL_COUNT = ROW_COUNT * COLUMN_COUNT
+
+# Columns ordered from the centre to the edges, used for move ordering
+CENTRE_ORDER = tuple(sorted(range(COLUMN_COUNT), key=lambda column: (abs(2 * column - COLUMN_COUNT + 1), column)))
+
+# Shift distances for the four directions: vertical, horizontal and both diagonals
+DIRECTIONS = (1, HEIGHT, HEIGHT - 1, HEIGHT + 1)
+
+
+def cell_bit(row: int, column: int) -> int:
+    """Return the bit of a single cell.
+
+    Parameters
+    ----------
+    row : int
+        Row index as printed on the board (0 is the top row).
+    column : int
+        Column index (0-6).
+
+    Returns
+    -------
+    int
+        Bitboard with only the given cell set.
+    """
+    return 1 << (column * HEIGHT + ROW_COUNT - 1 - row)
+
+
+def column_mask(column: int) -> int:
+    """Return a bitboard with all playable cells of a column set.
+
+    Parameters
+    ----------
+    column : int
+        Column index (0-6).
+
+    Returns
+    -------
+    int
+        Bitboard of the given column.
+    """
+    return COLUMN_BITS << (column * HEIGHT)
+
+
+def bottom_bit(column: int) -> int:
+    """Return the bit of the bottom cell of a column."""
+    return 1 << (column * HEIGHT)
+
+
+def top_bit(column: int) -> int:
+    """Return the bit of the top playable cell of a column."""
+    return 1 << (column * HEIGHT + ROW_COUNT - 1)
+
+
+def column_height(occupied: int, column: int) -> int:
+    """Return the number of rows of a column up to its topmost coin.
+
+    Parameters
+    ----------
+    occupied : int
+        Bitboard of all coins on the board.
+    column : int
+        Column index (0-6).
+
+    Returns
+    -------
+    int
+        Level of the topmost coin plus one, 0 for an empty column.
+    """
+    return ((occupied >> (column * HEIGHT)) & COLUMN_BITS).bit_length()
+
+
+def has_four(bits: int) -> bool:
+    """Check whether a bitboard contains four connected coins.
+
+    For each direction the bitboard is combined with a shifted copy of itself,
+    which leaves one bit for every pair of neighbouring coins. Combining the
+    pairs once more with a copy shifted by two cells leaves a bit for every
+    four in a row.
+
+    Parameters
+    ----------
+    bits : int
+        Bitboard of a single color.
+
+    Returns
+    -------
+    bool
+        True if four coins are connected horizontally, vertically or diagonally.
+    """
+    for shift in DIRECTIONS:
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+def can_play(mask: int, column: int) -> bool:
+    """Check whether a column of a position still has a free cell.
+
+    Parameters
+    ----------
+    mask : int
+        Bitboard of all coins on the board.
+    column : int
+        Column index (0-6).
+
+    Returns
+    -------
+    bool
+        True if the top cell of the column is empty.
+    """
+    return not mask & top_bit(column)
+
+
+def play(position: int, mask: int, column: int) -> tuple[int, int]:
+    """Drop a coin of the player to move into a column.
+
+    The search code describes a position by the coins of the player to move
+    (``position``) and all coins on the board (``mask``). Adding the bottom bit
+    of a column to ``mask`` carries into the first empty cell of the column.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+    column : int
+        Column index (0-6), must be playable.
+
+    Returns
+    -------
+    tuple[int, int]
+        ``(position, mask)`` after the move, seen from the opponent who moves next.
+    """
+    return position ^ mask, mask | (mask + bottom_bit(column))
+
+
+def is_winning_move(position: int, mask: int, column: int) -> bool:
+    """Check whether dropping a coin into a column wins for the player to move.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+    column : int
+        Column index (0-6), must be playable.
+
+    Returns
+    -------
+    bool
+        True if the move connects four.
+    """
+    return has_four(position | ((mask + bottom_bit(column)) & column_mask(column)))
+
+
+def winning_cells(position: int, mask: int) -> int:
+    """Return all empty cells which would complete four in a row for a player.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player.
+    mask : int
+        Bitboard of all coins on the board.
+
+    Returns
+    -------
+    int
+        Bitboard of the empty cells (reachable or not) that would win for the player.
+    """
+    cells = 0
+    for shift in DIRECTIONS:
+        pair_up = (position << shift) & (position << 2 * shift)
+        pair_down = (position >> shift) & (position >> 2 * shift)
+        cells |= pair_up & (position << 3 * shift)
+        cells |= pair_up & (position >> shift)
+        cells |= pair_down & (position << shift)
+        cells |= pair_down & (position >> 3 * shift)
+    return cells & (BOARD_MASK ^ mask)
+
+
+def mirror(bits: int) -> int:
+    """Mirror a bitboard from left to right.
+
+    Parameters
+    ----------
+    bits : int
+        Bitboard to mirror.
+
+    Returns
+    -------
+    int
+        Bitboard with column ``c`` moved to column ``COLUMN_COUNT - 1 - c``.
+    """
+    mirrored = 0
+    for column in range(COLUMN_COUNT):
+        mirrored |= ((bits >> (column * HEIGHT)) & COLUMN_BITS) << ((COLUMN_COUNT - 1 - column) * HEIGHT)
+    return mirrored
+
+
+def position_key(red: int, yellow: int) -> int:
+    """Return the unique key of a position.
+
+    The key is ``red + (red | yellow)``. Within every column the occupied cells
+    form a block of ones starting at the bottom; adding the red coins to this
+    block gives a different number for every coloring and never carries beyond
+    the separator bit. The key of the standard board fits into 64 bits.
+
+    Parameters
+    ----------
+    red : int
+        Bitboard of the red coins.
+    yellow : int
+        Bitboard of the yellow coins.
+
+    Returns
+    -------
+    int
+        Key of the position.
+    """
+    return red + (red | yellow)
+
+
+def canonical_key(position: int, mask: int) -> tuple[int, bool]:
+    """Return the key of a position seen from the player to move, shared with its mirror image.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+
+    Returns
+    -------
+    tuple[int, bool]
+        The smaller one of ``position + mask`` and the key of the mirrored
+        position, and True if the mirrored key was taken.
+    """
+    key = position + mask
+    mirrored = mirror(position) + mirror(mask)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+def popcount(bits: int) -> int:
+    """Return the number of set bits of a bitboard."""
+    return bin(bits).count("1")
+
+
+class Geometry:
+    """Board size and connect length together with the lookup tables of the board.
+
+    The module level constants and functions above describe the standard 6x7
+    board with four in a row and are used by the search code. A ``Geometry``
+    holds the same constants for any board size and connect length; all tables
+    are computed once when the geometry is created, so ``GameBoard`` does the
+    same amount of work per move on every board. Use ``geometry`` to get the
+    shared instance for a size instead of creating new ones.
+
+    Attributes
+    ----------
+    rows, columns : int
+        Size of the board.
+    connect : int
+        Number of coins in a row needed to win.
+    height : int
+        Bits per column including the separator bit.
+    bottom_mask, board_mask : int
+        Bottom cell of every column and all playable cells.
+    directions : tuple[int, ...]
+        Shift distances of the vertical, horizontal and both diagonal directions.
+    centre_order : tuple[int, ...]
+        Columns from the centre to the edges, for move ordering.
+    valid_moves, ordered_moves : tuple[tuple[int, ...], ...]
+        Columns which are not full, ascending and in centre order, indexed by
+        a bitset of the full columns (bit ``c`` set if column ``c`` is full).
+    has_won : callable
+        ``has_won(bits)`` checks whether a bitboard contains ``connect``
+        connected coins, see ``has_four``.
+    lines : tuple[int, ...]
+        Bitmask of every winning line (``connect`` cells in a row), 69 on the
+        standard board.
+    cell_lines : tuple[tuple[int, ...], ...]
+        Bitmasks of the winning lines through a cell, indexed by the bit
+        index of the cell (empty for the separator bits).
+    """
+
+    __slots__ = ("rows", "columns", "connect", "height", "column_bits", "bottom_mask", "board_mask", "cell_count",
+                 "all_columns", "directions", "centre_order", "valid_moves", "ordered_moves", "has_won",
+                 "lines", "cell_lines")
+
+    def __init__(self, rows: int = ROW_COUNT, columns: int = COLUMN_COUNT, connect: int = 4):
+        """Compute the tables of a board.
+
+        Parameters
+        ----------
+        rows : int
+            Number of rows.
+        columns : int
+            Number of columns, at most 12.
+        connect : int
+            Number of coins in a row needed to win.
+
+        Raises
+        ------
+        ValueError
+            If the board is empty, has more than 12 columns or nobody can
+            connect ``connect`` coins on it.
+        """
+        if rows < 1 or not 1 <= columns <= 12:
+            raise ValueError("A board needs at least one row and 1-12 columns")
+        if not 2 <= connect <= max(rows, columns):
+            raise ValueError(f"Cannot connect {connect} coins on a {rows}x{columns} board")
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.height = rows + 1
+        self.column_bits = (1 << rows) - 1
+        self.bottom_mask = sum(1 << (column * self.height) for column in range(columns))
+        self.board_mask = self.bottom_mask * self.column_bits
+        self.cell_count = rows * columns
+        self.all_columns = (1 << columns) - 1
+        self.directions = (1, self.height, self.height - 1, self.height + 1)
+        self.centre_order = tuple(sorted(range(columns), key=lambda column: (abs(2 * column - columns + 1), column)))
+        self.valid_moves = tuple(tuple(column for column in range(columns) if not full >> column & 1)
+                                 for full in range(1 << columns))
+        self.ordered_moves = tuple(tuple(column for column in self.centre_order if not full >> column & 1)
+                                   for full in range(1 << columns))
+
+        # Run lengths are doubled as long as possible, e.g. shifts of 1 and 2 cells for four in a row;
+        # the remaining cells are added with one more shift.
+        steps = []
+        length = 1
+        while 2 * length <= connect:
+            steps.append(length)
+            length *= 2
+        if length < connect:
+            steps.append(connect - length)
+        self.has_won = _make_win_check(tuple(tuple(step * shift for step in steps) for shift in self.directions))
+
+        # Winning lines as (column step, level step): vertical, horizontal and both diagonals
+        lines = []
+        for column_step, level_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for column in range(columns):
+                for level in range(rows):
+                    cells = [(column + k * column_step, level + k * level_step) for k in range(connect)]
+                    if all(0 <= c < columns and 0 <= l < rows for c, l in cells):
+                        lines.append(sum(1 << (c * self.height + l) for c, l in cells))
+        self.lines = tuple(lines)
+        self.cell_lines = tuple(tuple(line for line in lines if line >> index & 1)
+                                for index in range(columns * self.height))
+
+    def __repr__(self) -> str:
+        return f"Geometry(rows={self.rows}, columns={self.columns}, connect={self.connect})"
+
+    def __reduce__(self):
+        return geometry, (self.rows, self.columns, self.connect)
+
+    def cell_bit(self, row: int, column: int) -> int:
+        """Return the bit of a single cell, row 0 is the top row."""
+        return 1 << (column * self.height + self.rows - 1 - row)
+
+    def column_height(self, occupied: int, column: int) -> int:
+        """Return the number of rows of a column up to its topmost coin."""
+        return ((occupied >> (column * self.height)) & self.column_bits).bit_length()
+
+    def winning_cells(self, position: int, mask: int) -> int:
+        """Return all empty cells which would complete a line for a player, see ``winning_cells``.
+
+        For every direction a cell wins if ``k`` own coins follow on one side
+        and ``connect - 1 - k`` on the other; the runs are built with shifts.
+        """
+        cells = 0
+        length = self.connect - 1
+        for shift in self.directions:
+            up = [-1]
+            down = [-1]
+            for step in range(1, length + 1):
+                up.append(up[-1] & (position >> step * shift))
+                down.append(down[-1] & (position << step * shift))
+            for count in range(length + 1):
+                cells |= up[count] & down[length - count]
+        return cells & (self.board_mask ^ mask)
+
+    def mirror(self, bits: int) -> int:
+        """Mirror a bitboard from left to right."""
+        mirrored = 0
+        for column in range(self.columns):
+            mirrored |= ((bits >> (column * self.height)) & self.column_bits) << ((self.columns - 1 - column) * self.height)
+        return mirrored
+
+
+def geometry(rows: int = ROW_COUNT, columns: int = COLUMN_COUNT, connect: int = 4) -> Geometry:
+    """Return the shared ``Geometry`` of a board size and connect length, see ``Geometry``."""
+    return _geometry(rows, columns, connect)
+
+
+def _make_win_check(win_shifts: tuple[tuple[int, ...], ...]):
+    """Return a win check for the shift sequences of the four directions.
+
+    The common case of two shifts per direction (four in a row) gets the
+    unrolled check of ``has_four``, so it is as fast on every board size.
+    """
+    if all(len(shifts) == 2 for shifts in win_shifts):
+        def has_won(bits: int) -> bool:
+            for first, second in win_shifts:
+                pairs = bits & (bits >> first)
+                if pairs & (pairs >> second):
+                    return True
+            return False
+    else:
+        def has_won(bits: int) -> bool:
+            for shifts in win_shifts:
+                run = bits
+                for shift in shifts:
+                    run &= run >> shift
+                if run:
+                    return True
+            return False
+    return has_won
+
+
+@functools.lru_cache(maxsize=None)
+def _geometry(rows: int, columns: int, connect: int) -> Geometry:
+    """Create the geometry of a size once, the cache key does not depend on how the arguments are passed."""
+    return Geometry(rows, columns, connect)
+
+
+# Geometry of the standard board, the only one supported by the search code
+STANDARD = geometry()
+
+# Winning lines of the standard board and the lines through every cell, see Geometry
+LINES = STANDARD.lines
+CELL_LINES = STANDARD.cell_lines
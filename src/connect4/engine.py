@@ -0,0 +1,378 @@
+"""Search engine for computer-controlled players.
+
+The engine searches the game tree with negamax and alpha-beta pruning on the
+bitboards of module ``bitboard``. Positions are described from the view of the
+player to move: ``position`` holds the coins of that player and ``mask`` all
+coins on the board.
+
+Classes
+-------
+TranspositionTable
+    Fixed-size cache of search results keyed by position.
+SearchResult
+    Outcome of a search: best column, score, reached depth and node count.
+SearchEngine
+    Negamax search with iterative deepening under a time or node budget.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from . import bitboard
+from .evaluation import evaluate
+
+
+# Score of a won position. Wins are scored as WIN_SCORE minus the number of coins
+# on the board at the end, so that faster wins get higher scores.
+WIN_SCORE = 100_000
+
+# Bounds stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Keys are multiplied by this odd constant and the high bits of the product pick the slot. The low bits of a
+# key only depend on the left columns, so positions differing on the right would share a slot otherwise.
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# Nodes between two polls of the deadline and the stop callback
+_CHECK_INTERVAL = 256
+
+
+class _SearchAborted(Exception):
+    """Raised inside the search when the time or node budget is used up."""
+
+
+class TranspositionTable:
+    """Fixed-size cache of search results.
+
+    Every position key maps to one slot, picked by a multiplicative hash of the
+    key. A slot is replaced if it
+    is empty, holds another position of an older search, or the new entry was
+    searched at least as deep as the stored one (depth-preferred replacement with
+    aging). A deeper entry of the same position is kept also from an older
+    search, e.g. one found while pondering.
+
+    Attributes
+    ----------
+    size : int
+        Number of slots of the table.
+    """
+
+    def __init__(self, size: int = 1 << 20):
+        """Create an empty table.
+
+        Parameters
+        ----------
+        size : int
+            Number of slots of the table.
+        """
+        self.size = size
+        self._entries = [None] * size
+        self._generation = 0
+
+    def new_search(self):
+        """Mark all stored entries as belonging to an older search."""
+        self._generation += 1
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries = [None] * self.size
+
+    def get(self, key: int):
+        """Look up a position.
+
+        Parameters
+        ----------
+        key : int
+            Position key.
+
+        Returns
+        -------
+        tuple or None
+            ``(depth, flag, value, move)`` of the stored entry or None if the
+            position is not in the table.
+        """
+        entry = self._entries[(key * _HASH_MULTIPLIER >> 32) % self.size]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move: int):
+        """Store the result of a search if the replacement policy allows it.
+
+        Parameters
+        ----------
+        key : int
+            Position key.
+        depth : int
+            Remaining search depth of the result.
+        flag : int
+            EXACT, LOWER or UPPER bound.
+        value : int
+            Score of the position for the player to move.
+        move : int
+            Best column found, -1 if none.
+        """
+        index = (key * _HASH_MULTIPLIER >> 32) % self.size
+        entry = self._entries[index]
+        if entry is None or depth >= entry[1] or entry[5] != self._generation and entry[0] != key:
+            self._entries[index] = (key, depth, flag, value, move, self._generation)
+
+
+@dataclass
+class SearchResult:
+    """Outcome of a search.
+
+    Attributes
+    ----------
+    column : int
+        Best column found.
+    score : int
+        Score of the position for the player to move.
+    depth : int
+        Depth of the last completed iteration.
+    nodes : int
+        Number of searched positions.
+    """
+
+    column: int
+    score: int
+    depth: int
+    nodes: int
+
+
+class SearchEngine:
+    """Negamax search with alpha-beta pruning and iterative deepening.
+
+    Moves are ordered by the best move stored in the transposition table first
+    and then from the centre to the edges. The search deepens one ply at a time
+    until the position is solved, the maximum depth is reached or the time or
+    node budget is used up; then the result of the last completed iteration is
+    returned.
+
+    Leaves are scored by ``evaluation.evaluate`` one at a time, or by an
+    evaluator which scores many positions at once, e.g. a learned
+    ``network.ValueNetwork``. With an evaluator the replies of a node one ply
+    above the search horizon are queued and scored in one batch.
+    """
+
+    def __init__(self, table_size: int = 1 << 20, table=None, evaluator: Callable[[list, list], list] | None = None):
+        """Create an engine with an empty transposition table.
+
+        Parameters
+        ----------
+        table_size : int
+            Number of slots of the transposition table.
+        table : TranspositionTable or SharedTranspositionTable or None
+            Table to use instead of a new one, e.g. a table shared with other
+            processes; ``table_size`` is ignored then.
+        evaluator : callable or None
+            Scores a batch of leaves instead of ``evaluation.evaluate``: it is
+            called with a list of positions and a list of masks and returns
+            the score of every position for its player to move, e.g.
+            ``ValueNetwork.scores``.
+        """
+        self.table = table if table is not None else TranspositionTable(table_size)
+        self.evaluator = evaluator
+        self.nodes = 0
+        self._next_check = _CHECK_INTERVAL
+        self._deadline = None
+        self._max_nodes = None
+        self._stop = None
+
+    def search(self, position: int, mask: int, max_time: float | None = 1.0,
+               max_nodes: int | None = None, max_depth: int | None = None,
+               stop: Callable[[], bool] | None = None, root_shift: int = 0,
+               age_table: bool = True) -> SearchResult:
+        """Search the best column for the player to move.
+
+        Parameters
+        ----------
+        position : int
+            Bitboard of the player to move.
+        mask : int
+            Bitboard of all coins on the board.
+        max_time : float or None
+            Time budget in seconds, None for no limit.
+        max_nodes : int or None
+            Node budget, None for no limit.
+        max_depth : int or None
+            Maximum search depth in plies, None to search until the end of the game.
+        stop : callable or None
+            Polled together with the deadline; the search ends as soon as it
+            returns True, e.g. when the move request was cancelled.
+        root_shift : int
+            Rotate the centre-first order of the root moves by this many
+            places and ignore the stored best move at the root; helper
+            searches of a parallel search use it to start on other moves
+            than the main search.
+        age_table : bool
+            Start a new generation of the transposition table. A parallel
+            search ages its shared table once and not in every worker.
+
+        Returns
+        -------
+        SearchResult
+            Best column and score of the deepest completed iteration; column
+            -1 and score 0 on a full board.
+        """
+        self.nodes = 0
+        self._next_check = _CHECK_INTERVAL
+        self._deadline = None if max_time is None else time.perf_counter() + max_time
+        self._max_nodes = max_nodes
+        self._stop = stop
+        if age_table:
+            self.table.new_search()
+
+        moves = bitboard.popcount(mask)
+        remaining = bitboard.CELL_COUNT - moves
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+
+        legal = [column for column in bitboard.CENTRE_ORDER if bitboard.can_play(mask, column)]
+        for column in legal:
+            if bitboard.is_winning_move(position, mask, column):
+                return SearchResult(column, WIN_SCORE - moves - 1, 1, len(legal))
+        if not legal:
+            return SearchResult(-1, 0, 0, 0)
+
+        shift = root_shift % len(legal)
+        order = legal[shift:] + legal[:shift] if shift else None
+
+        result = SearchResult(legal[0], 0, 0, 0)
+        for depth in range(1, max_depth + 1):
+            try:
+                column, score = self._search_root(position, mask, moves, depth, legal, order)
+            except _SearchAborted:
+                break
+            result = SearchResult(column, score, depth, self.nodes)
+            # A proven win or loss does not change with deeper searches
+            if abs(score) > WIN_SCORE - bitboard.CELL_COUNT - 1:
+                break
+        result.nodes = self.nodes
+        return result
+
+    def _search_root(self, position: int, mask: int, moves: int, depth: int, legal: list[int],
+                     order: list[int] | None = None) -> tuple[int, int]:
+        """Search all root moves with a full window and return the best column and its score.
+
+        The moves are searched in ``order`` if given, otherwise best stored move first.
+        """
+        alpha = -WIN_SCORE - 1
+        best_column = legal[0]
+        for column in order or self._ordered(legal, self.table.get(position + mask)):
+            child_position, child_mask = bitboard.play(position, mask, column)
+            score = -self._negamax(child_position, child_mask, moves + 1, depth - 1, -WIN_SCORE - 1, -alpha)
+            if score > alpha:
+                alpha = score
+                best_column = column
+        self.table.store(position + mask, depth, EXACT, alpha, best_column)
+        return best_column, alpha
+
+    def _negamax(self, position: int, mask: int, moves: int, depth: int, alpha: int, beta: int) -> int:
+        """Return the score of a position for the player to move within the window (alpha, beta)."""
+        self.nodes += 1
+        if self._max_nodes is not None and self.nodes > self._max_nodes:
+            raise _SearchAborted
+        # The batched leaves add several nodes at once, so the polls use a threshold instead of a multiple
+        if self.nodes >= self._next_check:
+            self._next_check = self.nodes + _CHECK_INTERVAL
+            if self._deadline is not None and time.perf_counter() > self._deadline:
+                raise _SearchAborted
+            if self._stop is not None and self._stop():
+                raise _SearchAborted
+
+        legal = [column for column in bitboard.CENTRE_ORDER if bitboard.can_play(mask, column)]
+        for column in legal:
+            if bitboard.is_winning_move(position, mask, column):
+                return WIN_SCORE - moves - 1
+        if not legal:
+            return 0
+        if depth == 0:
+            return evaluate(position, mask)
+
+        key = position + mask
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            flag, value = entry[1], entry[2]
+            if flag == EXACT:
+                return value
+            if flag == LOWER and value > alpha:
+                alpha = value
+            elif flag == UPPER and value < beta:
+                beta = value
+            if alpha >= beta:
+                return value
+
+        if depth == 1 and self.evaluator is not None:
+            best_score, best_column = self._evaluate_replies(position, mask, moves, legal)
+            self.table.store(key, depth, EXACT, best_score, best_column)
+            return best_score
+
+        alpha_start = alpha
+        best_score = -WIN_SCORE - 1
+        best_column = -1
+        for column in self._ordered(legal, entry):
+            child_position, child_mask = bitboard.play(position, mask, column)
+            score = -self._negamax(child_position, child_mask, moves + 1, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best_column = column
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha_start:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, best_score, best_column)
+        return best_score
+
+    def _evaluate_replies(self, position: int, mask: int, moves: int, legal: list[int]) -> tuple[int, int]:
+        """Score all moves of a position one ply above the horizon with one call of the evaluator.
+
+        The positions after the moves are the leaves of the search; those
+        which the opponent wins at once or which fill the board are scored
+        like in ``_negamax``, all others are queued for the evaluator. No move
+        is pruned, so the best score is exact.
+
+        Returns
+        -------
+        tuple[int, int]
+            Best score for the player to move and its column.
+        """
+        self.nodes += len(legal)
+        scores = {}
+        queued_columns = []
+        queued_positions = []
+        queued_masks = []
+        for column in legal:
+            child_position, child_mask = bitboard.play(position, mask, column)
+            playable = (child_mask + bitboard.BOTTOM_MASK) & bitboard.BOARD_MASK
+            if bitboard.winning_cells(child_position, child_mask) & playable:
+                scores[column] = -(WIN_SCORE - moves - 2)
+            elif child_mask == bitboard.BOARD_MASK:
+                scores[column] = 0
+            else:
+                queued_columns.append(column)
+                queued_positions.append(child_position)
+                queued_masks.append(child_mask)
+        if queued_columns:
+            for column, score in zip(queued_columns, self.evaluator(queued_positions, queued_masks)):
+                scores[column] = -score
+        best_column = max(legal, key=scores.__getitem__)
+        return scores[best_column], best_column
+
+    @staticmethod
+    def _ordered(legal: list[int], entry) -> list[int]:
+        """Move the best column of a transposition table entry to the front of the centre-first order."""
+        if entry is None or entry[3] not in legal:
+            return legal
+        best = entry[3]
+        return [best] + [column for column in legal if column != best]
@@ -0,0 +1,161 @@
+"""Static evaluation of positions for the bots.
+
+A position is scored by the lines each player can still complete:
+
+- open lines: winning lines holding only coins of one player, counted by the
+  number of coins (open twos and threes on the standard board); only
+  ``score_move`` scores them,
+- threats: empty cells which complete a line; a threat on a row of the
+  player's parity is worth more, as zugzwang at the end of the game forces
+  the opponent to give these cells up (the player who moved first wants
+  threats on odd rows counted from the bottom, the other player on even rows),
+- double threats: two threats which can be played at once, or two threats on
+  top of each other, cannot both be blocked and decide the game.
+
+``evaluate`` scores the bitboards of the search engine with a few shifts: the
+threats, their parity, double threats and the coins in the centre column,
+but no open lines, which would need a loop over the lines of the board.
+``score_move`` rates a move on a ``GameBoard`` of any size for ``SmartBot``;
+it scores the open lines by the change on the lines through the new coin.
+No counters are kept between calls, both functions work from the bitboards
+alone.
+
+Functions
+---------
+evaluate
+    Score a standard position for the player to move.
+score_move
+    Score a move of a player on a GameBoard.
+"""
+
+from . import bitboard
+from .game_board import GameBoard
+
+
+# Score per open line with all but one cell (three on the standard board) and all but two cells of a player
+THREE_WEIGHT = 8
+TWO_WEIGHT = 2
+
+# Score per threat, and the bonus of a threat on a row of the player's parity
+THREAT_WEIGHT = 4
+PARITY_WEIGHT = 6
+
+# Score of a double threat; far below the search engine's win scores, as it is not a proven win yet
+DOUBLE_THREAT_SCORE = 1000
+
+# Cells of the rows 1, 3 and 5 counted from the bottom (levels 0, 2 and 4) of the standard board
+_ODD_ROWS = bitboard.BOTTOM_MASK * 0b010101
+_EVEN_ROWS = bitboard.BOARD_MASK ^ _ODD_ROWS
+_CENTRE = bitboard.column_mask(bitboard.COLUMN_COUNT // 2)
+
+
+def _line_weight(coins: int, connect: int) -> int:
+    """Return the score of an open line holding ``coins`` coins of one player."""
+    if coins == connect - 1:
+        return THREE_WEIGHT
+    if coins == connect - 2 and coins > 0:
+        return TWO_WEIGHT
+    return 0
+
+
+def evaluate(position: int, mask: int) -> int:
+    """Return a heuristic score of a standard position for the player to move.
+
+    Threats are counted with the shifts of ``bitboard.winning_cells``; threats
+    on rows of the player's parity get a bonus. Open lines are not scored. If the opponent has two
+    threats the player cannot block both (unless winning at once, which the
+    search checks before), and two threats of a player on top of each other
+    win as well.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+
+    Returns
+    -------
+    int
+        Positive if the player to move stands better, negative otherwise.
+    """
+    opponent = position ^ mask
+    own_threats = bitboard.winning_cells(position, mask)
+    other_threats = bitboard.winning_cells(opponent, mask)
+    playable = (mask + bitboard.BOTTOM_MASK) & bitboard.BOARD_MASK
+
+    # The player to move has moved first if an even number of coins is on the board
+    own_rows, other_rows = (_ODD_ROWS, _EVEN_ROWS) if bitboard.popcount(mask) % 2 == 0 else (_EVEN_ROWS, _ODD_ROWS)
+
+    score = (THREAT_WEIGHT * (bitboard.popcount(own_threats) - bitboard.popcount(other_threats))
+             + PARITY_WEIGHT * (bitboard.popcount(own_threats & own_rows)
+                                - bitboard.popcount(other_threats & other_rows))
+             + bitboard.popcount(position & _CENTRE) - bitboard.popcount(opponent & _CENTRE))
+
+    other_playable = other_threats & playable
+    if other_playable & (other_playable - 1) or other_threats & (other_threats >> 1):
+        score -= DOUBLE_THREAT_SCORE
+    elif own_threats & (own_threats >> 1):
+        score += DOUBLE_THREAT_SCORE
+    return score
+
+
+def score_move(board: GameBoard, color: str, column: int) -> int:
+    """Score a move of a player on a board of any size.
+
+    Only the lines through the new coin change their open-line score, so the
+    open lines are scored by that change; threats are found with the shifts of
+    ``Geometry.winning_cells``. The scores of the moves of one position can be
+    compared with each other.
+
+    Parameters
+    ----------
+    board : GameBoard
+        Board before the move; it is not changed.
+    color : str
+        Color of the moving player.
+    column : int
+        Column of the move, must not be full.
+
+    Returns
+    -------
+    int
+        Score of the move for the moving player.
+    """
+    geometry = board.geometry
+    connect = geometry.connect
+    own = board.get_bitboard(color)
+    other = board.get_bitboard("yellow" if color == "red" else "red")
+    occupied = own | other
+    index = column * geometry.height + geometry.column_height(occupied, column)
+
+    # Open lines through the cell gain a coin, open lines of the opponent through it are closed
+    score = 0
+    for line in geometry.cell_lines[index]:
+        if not line & other:
+            coins = bitboard.popcount(line & own)
+            score += _line_weight(coins + 1, connect) - _line_weight(coins, connect)
+        elif not line & own:
+            score += _line_weight(bitboard.popcount(line & other), connect)
+
+    # The player to move has moved first if both players have the same number of coins
+    moved_first = bitboard.popcount(own) == bitboard.popcount(other)
+    own |= 1 << index
+    occupied |= 1 << index
+    own_threats = geometry.winning_cells(own, occupied)
+    other_threats = geometry.winning_cells(other, occupied)
+    playable = (occupied + geometry.bottom_mask) & geometry.board_mask
+    odd_rows = geometry.bottom_mask * sum(1 << level for level in range(0, geometry.rows, 2))
+    own_rows = odd_rows if moved_first else geometry.board_mask ^ odd_rows
+    other_rows = geometry.board_mask ^ own_rows
+    score += (THREAT_WEIGHT * (bitboard.popcount(own_threats) - bitboard.popcount(other_threats))
+              + PARITY_WEIGHT * (bitboard.popcount(own_threats & own_rows)
+                                 - bitboard.popcount(other_threats & other_rows)))
+
+    # The opponent moves next: a playable threat of the opponent loses, two playable own threats win
+    own_playable = own_threats & playable
+    if other_threats & playable:
+        score -= 2 * DOUBLE_THREAT_SCORE
+    elif own_playable & (own_playable - 1) or own_threats & (own_threats >> 1):
+        score += DOUBLE_THREAT_SCORE
+    return score
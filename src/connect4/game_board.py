@@ -1,3 +1,54 @@
+import struct
+
+from . import bitboard
+from .position import Position
+
+
+# Serialized standard board: bitboard of the red and of the yellow coins, see GameBoard.to_bytes()
+_SNAPSHOT = struct.Struct("<QQ")
+
+
+class _GridRow:
+    """
+    Single row of the grid view. Reading a cell returns the coin symbol, writing a cell updates the bitboards.
+    """
+
+    def __init__(self, board: "GameBoard", row: int):
+        self._game_board = board
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._game_board._COLUMN_COUNT
+
+    def __iter__(self):
+        return (self[column] for column in range(len(self)))
+
+    def __getitem__(self, column: int) -> str:
+        return self._game_board._get_cell(self._row, column)
+
+    def __setitem__(self, column: int, coin: str):
+        self._game_board._set_cell(self._row, column, coin)
+
+
+class _GridView:
+    """
+    Row/column view onto the bitboards of a GameBoard.
+
+    It keeps the ``_board[row][column]`` access of the former list based board working, so code and tests which read or
+    write single cells keep their behaviour. Row 0 is the top row.
+    """
+
+    def __init__(self, board: "GameBoard"):
+        self._rows = [_GridRow(board, row) for row in range(board._ROW_COUNT)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, row: int) -> _GridRow:
+        return self._rows[row]
 
 
 class GameBoard:
@@ -8,43 +59,70 @@ class GameBoard:
     The current state of the board during the game will be stored in the class.
     It provides also all necessary methods for printing the board to the command line, adding a new coin to the board + checking if the turn is valid,
     checking for winner or draw and resetting the board state if a new game is started.
+
+    The board is stored as two bitboards (one integer per color) plus the height of every column and a bitmask of the
+    full columns, see module ``bitboard``.
+    The coin symbols are only used for printing the board.
+
+    The standard board has 6 rows and 7 columns and four coins in a row win. Other sizes and connect lengths are set
+    when the board is created; all lookup tables of a size are shared, see ``bitboard.Geometry``.
     """
 
-    def __init__(self):
+    def __init__(self, rows: int = bitboard.ROW_COUNT, columns: int = bitboard.COLUMN_COUNT, connect: int = 4):
         """
         Initialises the class GameBoard, defines some constants and creates an empty game board.
+
+        Parameters
+        ----------
+        :param rows: int
+            Number of rows, 6 by default.
+        :param columns: int
+            Number of columns, 7 by default.
+        :param connect: int
+            Number of coins in a row needed to win, 4 by default.
         """
-        self._ROW_COUNT = 6
-        self._COLUMN_COUNT = 7
+        self._geometry = bitboard.geometry(rows, columns, connect)
+        self._ROW_COUNT = rows
+        self._COLUMN_COUNT = columns
         self._COIN_RED = "🔴"
         self._COIN_YELLOW = "🟡"
-        self._board = [
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-        ]
+        self._bitboards = {"red": 0, "yellow": 0}
+        self._heights = [0] * self._COLUMN_COUNT
+        self._full_columns = 0
+        self._moves = []
+        self._first = None
+        self._key = 0
+        self._mirror_key = 0
+        self._board = _GridView(self)
+
+    @property
+    def geometry(self) -> bitboard.Geometry:
+        """
+        bitboard.Geometry: Size, connect length and lookup tables of the board.
+        """
+
+        return self._geometry
 
     def print_board(self):
         """
-        Method for printing the current state of the game board which is stored in the protected attribut _board to the command line.
+        Method for printing the current state of the game board which is stored in the protected attribut _bitboards to the command line.
         """
 
-        print("\n     0    1    2    3    4    5    6   ", end="")
+        separator = "\n   +" + "----+" * self._COLUMN_COUNT
+        print("\n   " + "".join(f" {y:>2}  " for y in range(self._COLUMN_COUNT)) + " ", end="")
 
         for x in range(self._ROW_COUNT):
-            print("\n   +----+----+----+----+----+----+----+")
+            print(separator)
             print(x, " |", end="")
 
             for y in range(self._COLUMN_COUNT):
-                if self._board[x][y] == "":
-                    print(" ", self._board[x][y], end="  |")
+                coin = self._get_cell(x, y)
+                if coin == "":
+                    print(" ", coin, end="  |")
                 else:
-                    print("", self._board[x][y], end=" |")
+                    print("", coin, end=" |")
 
-        print("\n   +----+----+----+----+----+----+----+")
+        print(separator)
 
     def add_coin(self, color: str, column: int) -> bool | str:
         """
@@ -77,27 +155,100 @@ class GameBoard:
         if color not in ("red", "yellow"):
             return "Error, invalid color!"
 
-        # Check if the given column is already full
-        if self._board[0][column] != "":
-            return False
-        else:
-            # Add coin to the lowest possible row
-            for i in range(self._ROW_COUNT - 1, -1, -1):
-                if self._board[i][column] == "":
-                    if color == "red":
-                        self._board[i][column] = self._COIN_RED
-                        return True
-                    else:
-                        self._board[i][column] = self._COIN_YELLOW
-                        return True
+        # Check if the given column is already full, otherwise add coin to the lowest possible row
+        return self._drop(color, column)
 
-            return False
+    def play(self, column: int, color: str | None = None) -> bool:
+        """
+        Add a coin to a column without validating the input, to be undone later with undo().
+
+        This is the make/unmake move API for searching bots: both play() and undo() are O(1) and only update the
+        bitboards, the column heights and the move stack.
+
+        Parameters
+        ----------
+        :param column: int
+            Number of the column where the coin should be added, must be a valid column index.
+        :param color: str | None
+            Color of the coin, "red" or "yellow". Defaults to the color to move, see color_to_move().
+
+        Returns
+        -------
+        :return: bool
+            True if the coin was added, False if the column is already full.
+        """
+
+        return self._drop(color or self.color_to_move(), column)
+
+    def undo(self) -> int | None:
+        """
+        Remove the last added coin from the board.
+
+        Returns
+        -------
+        :return: int | None
+            Column of the removed coin or None if there is no coin to remove.
+        """
+
+        if not self._moves:
+            return None
+
+        index, color = self._moves.pop()
+        self._bitboards[color] ^= 1 << index
+        column = index // self._geometry.height
+        height = self._heights[column] - 1
+        self._heights[column] = height
+        self._full_columns &= ~(1 << column)
+
+        weight = 2 if color == "red" else 1
+        self._key -= weight << index
+        self._mirror_key -= weight << ((self._COLUMN_COUNT - 1 - column) * self._geometry.height + height)
+        if not self._key:
+            self._first = None
+        return column
+
+    def color_to_move(self) -> str:
+        """
+        Return the color which is to move next: the opposite color of the last added coin or "red" on an empty board.
+
+        Without a move history (e.g. after from_bytes() or writing cells directly) the color with fewer coins is to
+        move; if both colors have the same number of coins, the color of the first coin of the game is to move, see
+        first_color().
+
+        Returns
+        -------
+        :return: str
+            "red" or "yellow"
+        """
+
+        if self._moves:
+            return "yellow" if self._moves[-1][1] == "red" else "red"
+        red = bitboard.popcount(self._bitboards["red"])
+        yellow = bitboard.popcount(self._bitboards["yellow"])
+        if red != yellow:
+            return "yellow" if red > yellow else "red"
+        return self.first_color()
+
+    def first_color(self) -> str:
+        """
+        Return the color of the first coin added to the empty board, "red" if it is not known (e.g. on an empty board).
+
+        The color is kept when cells are written directly and passed on by from_bytes(), from_position() and pickling.
+
+        Returns
+        -------
+        :return: str
+            "red" or "yellow"
+        """
+
+        return self._first or "red"
 
     def check_for_winner(self, color: str) -> bool | str:
         """
         Check the board for winner with the provided coin.
 
-        Method will return True if the board already has 4 piece of the provided coin in row, column or diagonal.
+        Method will return True if the board already has 4 piece (or the connect length of the board) of the provided
+        coin in row, column or diagonal.
 
         Parameters
         ----------
@@ -112,40 +263,80 @@ class GameBoard:
             "Error, invalid color!" if the provided color is not valid.
         """
 
-        if color == "red":
-            coin = self._COIN_RED
-        elif color == "yellow":
-            coin = self._COIN_YELLOW
-        else:
+        if color not in ("red", "yellow"):
             return "Error, invalid color!"
 
-        # check for horizontal win
-        for r in range(self._ROW_COUNT):
-            for c in range(self._COLUMN_COUNT - 3):
-                if self._board[r][c] == coin and self._board[r][c + 1] == coin and self._board[r][c + 2] == coin and self._board[r][c + 3] == coin:
-                    return True
+        return self._geometry.has_won(self._bitboards[color])
+
+    def check_last_move_wins(self) -> bool:
+        """
+        Check if the coin added by the last call of add_coin() or play() has won the game.
+
+        Only the winning lines through the landing cell of the last coin are checked (see ``bitboard.Geometry.cell_lines``),
+        so this is cheaper than check_for_winner() when it is called after every move.
+
+        Returns
+        -------
+        :return: bool
+            True if the last added coin connects four (or the connect length of the board), False otherwise or if there
+            is no last move (empty move stack).
+        """
+
+        if not self._moves:
+            return False
 
+        index, color = self._moves[-1]
+        bits = self._bitboards[color]
+        for line in self._geometry.cell_lines[index]:
+            if bits & line == line:
+                return True
+        return False
 
-        # check for vertical win
-        for r in range(self._ROW_COUNT - 3):
-            for c in range(self._COLUMN_COUNT):
-                if self._board[r][c] == coin and self._board[r + 1][c] == coin and self._board[r + 2][c] == coin and self._board[r + 3][c] == coin:
-                    return True
+    def is_winning_move(self, color: str, column: int) -> bool:
+        """
+        Check if adding a coin of the provided color to a column would win, without changing the board.
 
-        # check for positive diagonal win
-        for r in range(self._ROW_COUNT - 3):
-            for c in range(self._COLUMN_COUNT - 3):
-                if self._board[r][c] == coin and self._board[r + 1][c + 1] == coin and self._board[r + 2][c + 2] == coin and self._board[r + 3][c + 3] == coin:
-                    return True
+        Parameters
+        ----------
+        :param color: str
+            Either "red" or "yellow".
+        :param column: int
+            Number of the column, must be a valid column index.
 
-        # check for negative diagonal win:
-        for r in range(3, self._ROW_COUNT):
-            for c in range(self._COLUMN_COUNT - 3):
-                if self._board[r][c] == coin and self._board[r - 1][c + 1] == coin and self._board[r - 2][c + 2] == coin and self._board[r - 3][c + 3] == coin:
-                    return True
+        Returns
+        -------
+        :return: bool
+            True if the coin would complete a winning line, False otherwise or if the column is full.
+        """
 
+        height = self._heights[column]
+        if height >= self._ROW_COUNT:
+            return False
+        index = column * self._geometry.height + height
+        bits = self._bitboards[color] | 1 << index
+        for line in self._geometry.cell_lines[index]:
+            if bits & line == line:
+                return True
         return False
 
+    def threats(self, color: str) -> int:
+        """
+        Return all empty cells which would complete a winning line for the provided color, reachable or not.
+
+        Parameters
+        ----------
+        :param color: str
+            Either "red" or "yellow".
+
+        Returns
+        -------
+        :return: int
+            Bitboard of the threat cells, see module ``bitboard`` for the bit layout.
+        """
+
+        own = self._bitboards[color]
+        return self._geometry.winning_cells(own, own | self._bitboards["yellow" if color == "red" else "red"])
+
     def check_for_draw(self) -> bool:
         """
         Method to check if the game board is already full. This would mean that the game ended with draw.
@@ -156,28 +347,322 @@ class GameBoard:
             True if draw otherwise False
         """
 
-        draw = True
+        return self.is_full()
+
+    def is_full(self) -> bool:
+        """
+        Check if every column is full. This is an O(1) lookup of the full-column bitmask.
+
+        Returns
+        -------
+        :return: bool
+            True if no coin can be added anymore, otherwise False.
+        """
+
+        return self._full_columns == self._geometry.all_columns
+
+    def legal_moves(self, centre_first: bool = False) -> tuple[int, ...]:
+        """
+        Return the columns which are not full.
+
+        The board keeps a bitmask of the full columns up to date with every added or removed coin; the columns are
+        looked up in the precomputed tables of its geometry, so no column is scanned.
+
+        Parameters
+        ----------
+        :param centre_first: bool
+            Order the columns from the centre to the edges instead of from left to right.
+
+        Returns
+        -------
+        :return: tuple[int, ...]
+            Indices of the columns where a coin can be added.
+        """
+
+        if centre_first:
+            return self._geometry.ordered_moves[self._full_columns]
+        return self._geometry.valid_moves[self._full_columns]
+
+    def landing_row(self, column: int) -> int | None:
+        """
+        Return the row where a coin added to a column would land. Row 0 is the top row, as in the printed board.
+
+        Parameters
+        ----------
+        :param column: int
+            Number of the column, must be a valid column index.
+
+        Returns
+        -------
+        :return: int | None
+            Row of the lowest empty cell of the column or None if the column is full.
+        """
+
+        height = self._heights[column]
+        if height >= self._ROW_COUNT:
+            return None
+        return self._ROW_COUNT - 1 - height
+
+    def get_bitboard(self, color: str) -> int:
+        """
+        Return the bitboard of all coins of the provided color, see module ``bitboard`` for the bit layout.
+
+        Parameters
+        ----------
+        :param color: str
+            Either "red" or "yellow".
+
+        Returns
+        -------
+        :return: int
+            Bitboard with one bit set per coin of the color.
+        """
+
+        return self._bitboards[color]
+
+    def position_key(self) -> int:
+        """
+        Return a key which identifies the current position, see bitboard.position_key().
+
+        The key is updated with every added or removed coin, so this is an O(1) lookup.
+
+        Returns
+        -------
+        :return: int
+            Unique key of the position (fits into 64 bits).
+        """
+
+        return self._key
+
+    def mirror_key(self) -> int:
+        """
+        Return the key of the position mirrored from left to right.
+
+        Returns
+        -------
+        :return: int
+            Unique key of the mirrored position.
+        """
+
+        return self._mirror_key
+
+    def canonical_key(self) -> int:
+        """
+        Return the same key for a position and its mirror image, as both positions have the same game value.
+
+        Returns
+        -------
+        :return: int
+            The smaller one of position_key() and mirror_key().
+        """
+
+        return min(self._key, self._mirror_key)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the position into 16 bytes: the red and the yellow bitboard as little endian 64 bit integers.
+
+        Boards with more than 64 bits per bitboard (e.g. 9 columns) use as many bytes per bitboard as needed. Only the
+        coins are stored, neither the size of the board, the color of the first coin (see first_color()) nor the move
+        history, so undo() is not possible on a board created by from_bytes().
+
+        Returns
+        -------
+        :return: bytes
+            Serialized position, see from_bytes().
+        """
+
+        if self._geometry.columns * self._geometry.height <= 64:
+            return _SNAPSHOT.pack(self._bitboards["red"], self._bitboards["yellow"])
+        size = (self._geometry.columns * self._geometry.height + 7) // 8
+        return self._bitboards["red"].to_bytes(size, "little") + self._bitboards["yellow"].to_bytes(size, "little")
+
+    @classmethod
+    def from_bytes(cls, data: bytes, rows: int = bitboard.ROW_COUNT, columns: int = bitboard.COLUMN_COUNT,
+                   connect: int = 4, first: str = "red") -> "GameBoard":
+        """
+        Create a board from a position serialized by to_bytes().
+
+        Parameters
+        ----------
+        :param data: bytes-like object
+            Bytes as returned by to_bytes(), e.g. a slice of a memory-mapped snapshot file.
+        :param rows: int
+            Number of rows of the serialized board.
+        :param columns: int
+            Number of columns of the serialized board.
+        :param connect: int
+            Number of coins in a row needed to win.
+        :param first: str
+            Color of the first coin of the game, see first_color(); it decides the color to move if both colors have
+            the same number of coins.
+
+        Returns
+        -------
+        :return: GameBoard
+            New board with the serialized coins and an empty move history.
+
+        Raises
+        ------
+        ValueError
+            If the data has the wrong size, sets bits outside of the board, puts two coins into one cell or a coin
+            above an empty cell.
+        """
+
+        board = cls(rows, columns, connect)
+        geometry = board._geometry
+        size = max(8, (geometry.columns * geometry.height + 7) // 8)
+        if len(data) != 2 * size:
+            raise ValueError(f"Serialized board must have {2 * size} bytes, got {len(data)}")
+        red = int.from_bytes(data[:size], "little")
+        yellow = int.from_bytes(data[size:], "little")
+        occupied = red | yellow
+        if occupied & ~geometry.board_mask or red & yellow or (occupied + geometry.bottom_mask) & occupied:
+            raise ValueError("Serialized board is not a valid position")
+
+        board._bitboards = {"red": red, "yellow": yellow}
+        board._first = first if occupied else None
+        board._heights = [geometry.column_height(occupied, column) for column in range(geometry.columns)]
+        board._full_columns = sum(1 << column for column, height in enumerate(board._heights) if height == geometry.rows)
+        board._key = bitboard.position_key(red, yellow)
+        board._mirror_key = bitboard.position_key(geometry.mirror(red), geometry.mirror(yellow))
+        return board
+
+    def to_position(self) -> Position:
+        """
+        Export the coins and the color to move (see color_to_move()) as an immutable Position.
+
+        Returns
+        -------
+        :return: Position
+            Position of the board; the move history is not kept.
+
+        Raises
+        ------
+        ValueError
+            If a coin written directly into a cell floats above an empty cell.
+        """
+
+        red_to_move = self.color_to_move() == "red"
+        own = self._bitboards["red" if red_to_move else "yellow"]
+        return Position(own, self._bitboards["red"] | self._bitboards["yellow"], red_to_move, self._geometry)
+
+    @classmethod
+    def from_position(cls, position: Position) -> "GameBoard":
+        """
+        Create a board from a Position, e.g. one exported by to_position().
+
+        Parameters
+        ----------
+        :param position: Position
+            Position to import; the board gets its size.
 
-        for i in range(0, self._COLUMN_COUNT):
-            if self._board[0][i] == "":
-                draw = False
+        Returns
+        -------
+        :return: GameBoard
+            New board with the coins of the position and an empty move history. Its color to move is the one of the
+            position, see color_to_move().
+        """
 
-        return draw
+        geometry = position.geometry
+        board = cls(geometry.rows, geometry.columns, geometry.connect)
+        red = position.get_bitboard("red")
+        yellow = position.get_bitboard("yellow")
+        board._bitboards = {"red": red, "yellow": yellow}
+        # With an even number of coins the color to move made the first move, otherwise the other color
+        if position.mask:
+            board._first = position.color_to_move if position.moves % 2 == 0 else \
+                ("yellow" if position.red_to_move else "red")
+        board._heights = [geometry.column_height(position.mask, column) for column in range(geometry.columns)]
+        board._full_columns = sum(1 << column for column, height in enumerate(board._heights) if height == geometry.rows)
+        board._key = bitboard.position_key(red, yellow)
+        board._mirror_key = bitboard.position_key(geometry.mirror(red), geometry.mirror(yellow))
+        return board
+
+    def __reduce__(self):
+        """
+        Pickle the board in its compact form (see to_bytes()) and the color of the first coin, the move history is
+        not kept.
+        """
 
+        return GameBoard.from_bytes, (self.to_bytes(), self._ROW_COUNT, self._COLUMN_COUNT, self._geometry.connect,
+                                      self.first_color())
 
     def reset_board(self):
         """
         Method for removing all coins from the game board for starting a new game.
         """
 
-        self._board = [
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", ""],
-        ]
+        self._bitboards = {"red": 0, "yellow": 0}
+        self._heights = [0] * self._COLUMN_COUNT
+        self._full_columns = 0
+        self._moves = []
+        self._first = None
+        self._key = 0
+        self._mirror_key = 0
+
+    def _drop(self, color: str, column: int) -> bool:
+        """
+        Add a coin to the lowest free cell of a column and push it onto the move stack. Returns False if the column is full.
+        """
+
+        height = self._heights[column]
+        if height >= self._ROW_COUNT:
+            return False
+
+        index = column * self._geometry.height + height
+        if not self._key:
+            self._first = color
+        self._bitboards[color] |= 1 << index
+        self._heights[column] = height + 1
+        if height + 1 == self._ROW_COUNT:
+            self._full_columns |= 1 << column
+        self._moves.append((index, color))
+
+        # A coin adds its bit once to the key for the occupied cells and once more if it is red
+        weight = 2 if color == "red" else 1
+        self._key += weight << index
+        self._mirror_key += weight << ((self._COLUMN_COUNT - 1 - column) * self._geometry.height + height)
+        return True
+
+    def _get_cell(self, row: int, column: int) -> str:
+        """
+        Return the coin symbol of a single cell or "" for an empty cell. Row 0 is the top row.
+        """
+
+        bit = self._geometry.cell_bit(row, column)
+        if self._bitboards["red"] & bit:
+            return self._COIN_RED
+        if self._bitboards["yellow"] & bit:
+            return self._COIN_YELLOW
+        return ""
+
+    def _set_cell(self, row: int, column: int, coin: str):
+        """
+        Write a coin symbol ("" for empty) directly into a single cell. Row 0 is the top row.
+
+        The height of the column is recalculated from its topmost coin afterwards. As the written cell is not part of
+        the move history, the move stack is cleared.
+        """
+
+        bit = self._geometry.cell_bit(row, column)
+        self._bitboards["red"] &= ~bit
+        self._bitboards["yellow"] &= ~bit
+        if coin == self._COIN_RED:
+            self._bitboards["red"] |= bit
+        elif coin == self._COIN_YELLOW:
+            self._bitboards["yellow"] |= bit
+        occupied = self._bitboards["red"] | self._bitboards["yellow"]
+        self._heights[column] = self._geometry.column_height(occupied, column)
+        if self._heights[column] == self._ROW_COUNT:
+            self._full_columns |= 1 << column
+        else:
+            self._full_columns &= ~(1 << column)
+        self._moves = []
+        self._key = bitboard.position_key(self._bitboards["red"], self._bitboards["yellow"])
+        if not self._key:
+            self._first = None
+        self._mirror_key = bitboard.position_key(self._geometry.mirror(self._bitboards["red"]), self._geometry.mirror(self._bitboards["yellow"]))
 
 
 if __name__ == "__main__":
@@ -5,8 +5,25 @@ interaction: selecting the number of players, selecting bot difficulty, creating
 player objects, and choosing a starting player.
 """
 
+import os
 import random
-from .players import HumanPlayer, Bot, SmartBot, Player
+from . import bitboard
+from .book import load_default_book
+from .game_board import GameBoard
+from .players import HumanPlayer, Bot, SmartBot, SearchBot, MCTSBot, Player
+
+
+# Most search processes of MegaHansi; Lazy SMP gains little beyond a few, and pondering keeps them busy all game
+MAX_SEARCH_WORKERS = 4
+
+
+def _load_network():
+    """Return the default value network, or None if it was not trained or NumPy is not installed."""
+    try:
+        from .network import load_default_network
+    except ImportError:
+        return None
+    return load_default_network()
 
 
 class GameSetup:
@@ -45,27 +62,49 @@ class GameSetup:
             print("Invalid input. Please enter 1 or 2.\n")
 
 
-    def choose_bot_difficulty(self) -> int:
+    def choose_bot_difficulty(self, standard_board: bool = True, learned: bool = False) -> int:
         """Ask the user to choose the bot difficulty.
 
+        Parameters
+        ----------
+        standard_board : bool
+            If False, only the bots which play on any board size (0 and 1)
+            are offered.
+        learned : bool
+            Offer the bot with the learned evaluation (4); only on the
+            standard board.
+
         Returns
         -------
         int
             Difficulty level:
             - 0: simple bot (Bot)
             - 1: smart bot (SmartBot)
+            - 2: search bot (SearchBot)
+            - 3: Monte Carlo bot (MCTSBot)
+            - 4: search bot with the learned evaluation (SearchBot with a ValueNetwork)
         """
+        choices = ["0", "1"]
+        if standard_board:
+            choices += ["2", "3"]
+            if learned:
+                choices.append("4")
         while True:
             print("\nChoose bot difficulty:")
             print("0 - play against Hansi")
             print("1 - play against SuperHansi")
+            if standard_board:
+                print("2 - play against MegaHansi")
+                print("3 - play against LuckyHansi")
+                if learned:
+                    print("4 - play against NeuroHansi")
             selection = input("> ").strip()
-            if selection in ("0", "1"):
+            if selection in choices:
                 return int(selection)
-            print("Invalid input. Please enter 0 or 1.\n")
+            print(f"Invalid input. Please enter {', '.join(choices[:-1])} or {choices[-1]}.\n")
     
     
-    def create_players(self, num_players: int) -> list[Player]:
+    def create_players(self, num_players: int, board: GameBoard | None = None) -> list[Player]:
         """Create player and bot instances based on setup choices.
 
         Parameters
@@ -73,22 +112,37 @@ class GameSetup:
         num_players : int
             Number of human players (1 or 2). If 1, a bot will be added as the
             second player.
+        board : GameBoard or None
+            Board the game is played on. The search bots are only offered for
+            the standard board (also if None), the bot with the learned
+            evaluation only if the default network was trained.
 
         Returns
         -------
         list[Player]
-            List of player objects (HumanPlayer plus optional Bot/SmartBot).
+            List of player objects (HumanPlayer plus optional bot). Call
+            ``close`` on them when no more games are played.
         """
         players = []
         for i in range(num_players):
             player = HumanPlayer(f"Player{i+1}")
             players.append(player)
         if num_players == 1:
-            difficulty = self.choose_bot_difficulty()
+            standard_board = board is None or board.geometry is bitboard.STANDARD
+            network = _load_network() if standard_board else None
+            difficulty = self.choose_bot_difficulty(standard_board, network is not None)
             if difficulty == 0:
                 players.append(Bot("Hansi"))
-            else:
+            elif difficulty == 1:
                 players.append(SmartBot("SuperHansi"))
+            elif difficulty == 2:
+                # MegaHansi searches on several CPU cores and on the human player's time
+                workers = min(os.cpu_count() or 1, MAX_SEARCH_WORKERS)
+                players.append(SearchBot("MegaHansi", book=load_default_book(), workers=workers, ponder=True))
+            elif difficulty == 3:
+                players.append(MCTSBot("LuckyHansi"))
+            else:
+                players.append(SearchBot("NeuroHansi", network=network))
         return players
 
     
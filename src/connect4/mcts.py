@@ -0,0 +1,186 @@
+"""Monte Carlo Tree Search for computer-controlled players.
+
+The tree is built on the bitboards of module ``bitboard``. Every node stores
+the position from the view of the player to move, children are selected by
+UCT (upper confidence bound applied to trees) and new nodes are evaluated by
+a random playout on plain integers. The tree below the move actually played
+is kept and reused for the next search.
+
+Classes
+-------
+MonteCarloTreeSearch
+    Search tree with a playout or wall-clock budget per move.
+"""
+
+import math
+import random
+import time
+
+from . import bitboard
+
+
+class _Node:
+    """Node of the search tree.
+
+    ``reward`` sums up the playout results from the view of the player who
+    made the move into this node (1 win, 0.5 draw, 0 loss).
+    """
+
+    __slots__ = ("position", "mask", "moves", "parent", "column", "children", "untried", "visits", "reward", "terminal")
+
+    def __init__(self, position: int, mask: int, moves: int, parent=None, column: int = -1, terminal: float | None = None):
+        self.position = position
+        self.mask = mask
+        self.moves = moves
+        self.parent = parent
+        self.column = column
+        self.children = []
+        self.visits = 0
+        self.reward = 0.0
+        # Result for the player to move if the game is over at this node, otherwise None
+        self.terminal = terminal
+        self.untried = [] if terminal is not None else [
+            column for column in reversed(bitboard.CENTRE_ORDER) if bitboard.can_play(mask, column)
+        ]
+
+    def expand(self, column: int) -> "_Node":
+        """Create the child reached by playing a column."""
+        terminal = None
+        if bitboard.is_winning_move(self.position, self.mask, column):
+            terminal = 0.0
+        elif self.moves + 1 == bitboard.CELL_COUNT:
+            terminal = 0.5
+        position, mask = bitboard.play(self.position, self.mask, column)
+        child = _Node(position, mask, self.moves + 1, self, column, terminal)
+        self.children.append(child)
+        return child
+
+
+class MonteCarloTreeSearch:
+    """Monte Carlo Tree Search with UCT selection and subtree reuse.
+
+    Attributes
+    ----------
+    exploration : float
+        Exploration constant of the UCT formula.
+    playouts : int
+        Number of playouts of the last search.
+    """
+
+    def __init__(self, exploration: float = math.sqrt(2), seed: int | None = None):
+        """Create an empty search tree.
+
+        Parameters
+        ----------
+        exploration : float
+            Exploration constant of the UCT formula.
+        seed : int or None
+            Seed for the random playouts.
+        """
+        self.exploration = exploration
+        self.playouts = 0
+        self._random = random.Random(seed)
+        self._root = None
+
+    def search(self, position: int, mask: int, max_playouts: int | None = 2000, max_time: float | None = None) -> int:
+        """Search the best column for the player to move.
+
+        The search stops when the playout count or the deadline is reached,
+        whichever comes first. At least one playout is made.
+
+        Parameters
+        ----------
+        position : int
+            Bitboard of the player to move.
+        mask : int
+            Bitboard of all coins on the board.
+        max_playouts : int or None
+            Maximum number of playouts, None for no limit.
+        max_time : float or None
+            Time budget in seconds, None for no limit.
+
+        Returns
+        -------
+        int
+            Most visited column.
+        """
+        if max_playouts is None and max_time is None:
+            raise ValueError("Either max_playouts or max_time is needed")
+
+        legal = [column for column in bitboard.CENTRE_ORDER if bitboard.can_play(mask, column)]
+        for column in legal:
+            if bitboard.is_winning_move(position, mask, column):
+                self._root = None
+                return column
+
+        root = self._reuse_root(position, mask)
+        deadline = None if max_time is None else time.perf_counter() + max_time
+        self.playouts = 0
+        while True:
+            self._playout(root)
+            self.playouts += 1
+            if max_playouts is not None and self.playouts >= max_playouts:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        # Keep the subtree of the chosen move for the next search
+        self._root = best
+        return best.column
+
+    def _reuse_root(self, position: int, mask: int) -> _Node:
+        """Return the stored node of a position (the chosen move or one reply below it) or a new root."""
+        candidates = []
+        if self._root is not None:
+            candidates.append(self._root)
+            candidates.extend(self._root.children)
+        for node in candidates:
+            if node.position == position and node.mask == mask:
+                node.parent = None
+                return node
+        return _Node(position, mask, bitboard.popcount(mask))
+
+    def _playout(self, root: _Node):
+        """Run one selection, expansion, simulation and backpropagation step."""
+        node = root
+        log = math.log
+        sqrt = math.sqrt
+        exploration = self.exploration
+
+        # Selection
+        while not node.untried and node.terminal is None:
+            log_visits = log(node.visits)
+            node = max(node.children,
+                       key=lambda child: child.reward / child.visits + exploration * sqrt(log_visits / child.visits))
+
+        # Expansion
+        if node.untried:
+            node = node.expand(node.untried.pop())
+
+        # Simulation, result from the view of the player to move at the node
+        if node.terminal is not None:
+            result = node.terminal
+        else:
+            result = self._rollout(node.position, node.mask, node.moves)
+
+        # Backpropagation
+        value = 1.0 - result
+        while node is not None:
+            node.visits += 1
+            node.reward += value
+            value = 1.0 - value
+            node = node.parent
+
+    def _rollout(self, position: int, mask: int, moves: int) -> float:
+        """Play random moves until the game ends and return the result for the player to move."""
+        choice = self._random.choice
+        result = 1.0
+        while moves < bitboard.CELL_COUNT:
+            column = choice([column for column in range(bitboard.COLUMN_COUNT) if bitboard.can_play(mask, column)])
+            if bitboard.is_winning_move(position, mask, column):
+                return result
+            position, mask = bitboard.play(position, mask, column)
+            moves += 1
+            result = 1.0 - result
+        return 0.5
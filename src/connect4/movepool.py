@@ -0,0 +1,276 @@
+"""Bot moves computed by a pool of worker processes.
+
+``MoveService`` keeps a ``ProcessPoolExecutor`` of warm search workers: every
+worker process creates its ``SearchEngine`` once and keeps the transposition
+table between requests. A request is a board snapshot (two integers) and
+returns a future, so a caller like the game server never blocks on a search.
+
+With ``shared_table`` all workers use one ``SharedTranspositionTable``, so a
+worker profits from what the others searched before, e.g. for the previous
+move of the same game. The workers return the table counts of every search
+with its result, so the statistics of the table in the parent cover all
+answered requests.
+
+Every request has a hard deadline. The worker searches until shortly before
+it and returns the best move of the deepest completed iteration; if the
+worker does not answer in time (e.g. because all workers are busy), the
+future is resolved with a quick heuristic move instead. Requests can be
+cancelled, e.g. when the game ends, which also stops a running search.
+
+Classes
+-------
+MoveRequest
+    Handle of a submitted request.
+MoveService
+    Worker pool answering move requests.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from . import bitboard
+from .engine import SearchEngine, SearchResult
+from .game_board import GameBoard
+from .shared_table import SharedTranspositionTable
+
+
+# Share of the deadline the worker may search; the rest is left for the transfer of the result
+_SEARCH_SHARE = 0.8
+
+# State of a worker process, set by _init_worker
+_engine = None
+_cancel_flags = None
+
+
+def _init_worker(cancel_flags, table_size: int, table: SharedTranspositionTable | None):
+    """Create the search engine of a worker process."""
+    global _engine, _cancel_flags
+    _engine = SearchEngine(table_size, table)
+    _cancel_flags = cancel_flags
+
+
+def _search(slot: int, position: int, mask: int, search_until: float,
+            max_depth: int | None) -> tuple[SearchResult, tuple[int, int, int] | None]:
+    """Search a move in a worker process until ``search_until`` (``time.time()``) or until the request is cancelled.
+
+    Returns the result and the counts of the shared table, None without one.
+    """
+    max_time = max(0.0, search_until - time.time())
+    result = _engine.search(position, mask, max_time, max_depth=max_depth, stop=lambda: _cancel_flags[slot] != 0)
+    table = _engine.table
+    return result, table.take_counts() if isinstance(table, SharedTranspositionTable) else None
+
+
+def quick_move(position: int, mask: int) -> int:
+    """Return a move without searching: win if possible, otherwise block, otherwise centre first.
+
+    Parameters
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+
+    Returns
+    -------
+    int
+        Column to play, -1 on a full board.
+    """
+    legal = [column for column in bitboard.CENTRE_ORDER if bitboard.can_play(mask, column)]
+    if not legal:
+        return -1
+    for column in legal:
+        if bitboard.is_winning_move(position, mask, column):
+            return column
+    for column in legal:
+        if bitboard.is_winning_move(position ^ mask, mask, column):
+            return column
+    return legal[0]
+
+
+class MoveRequest:
+    """Handle of a move request.
+
+    Attributes
+    ----------
+    future : concurrent.futures.Future
+        Resolved with a ``SearchResult``; ``depth`` 0 marks the fallback move
+        used when the worker missed the deadline.
+    """
+
+    def __init__(self, service: "MoveService", slot: int, position: int, mask: int):
+        self.future = Future()
+        self._service = service
+        self._slot = slot
+        self._position = position
+        self._mask = mask
+        self._worker_future = None
+        self._timer = None
+        self._released = False
+        self._lock = threading.Lock()
+
+    def result(self, timeout: float | None = None) -> SearchResult:
+        """Wait for the move, see ``concurrent.futures.Future.result``."""
+        return self.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """Cancel the request and stop its search.
+
+        Does nothing once the request is resolved.
+
+        Returns
+        -------
+        bool
+            True if the request was still pending and is now cancelled.
+        """
+        # The future is cancelled first, so the callbacks of the worker future cannot resolve it any more
+        with self._lock:
+            if self.future.done() or not self.future.cancel():
+                return False
+            self._stop_search()
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._worker_future is not None:
+            self._worker_future.cancel()
+        return True
+
+    def _worker_done(self, worker_future):
+        """Resolve the request with the result of the worker and free its slot."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if worker_future.cancelled():
+            # Cancelled before it started, by cancel() or by the shutdown of the pool
+            if not self.future.done():
+                self._fallback()
+        elif worker_future.exception() is None:
+            result, counts = worker_future.result()
+            if counts is not None:
+                self._service.table.add_counts(counts)
+            self._resolve(result)
+        else:
+            self._fallback()
+        with self._lock:
+            self._released = True
+        self._service._release(self._slot)
+
+    def _fallback(self):
+        """Resolve the request with a quick move and stop the search."""
+        with self._lock:
+            self._stop_search()
+        self._resolve(SearchResult(quick_move(self._position, self._mask), 0, 0, 0))
+
+    def _stop_search(self):
+        """Set the cancel flag of the slot unless another request may already use it; call with the lock held."""
+        if not self._released:
+            self._service._cancel_flags[self._slot] = 1
+
+    def _resolve(self, result: SearchResult):
+        """Set the result unless the request is already resolved or cancelled."""
+        with self._lock:
+            if not self.future.done():
+                self.future.set_result(result)
+
+
+class MoveService:
+    """Pool of worker processes answering move requests.
+
+    Use it as a context manager or call ``shutdown`` when done.
+
+    Attributes
+    ----------
+    table : SharedTranspositionTable or None
+        Transposition table shared by the workers, see its ``stats`` for the
+        hit rate and memory use. None if every worker has its own table.
+    """
+
+    def __init__(self, workers: int | None = None, table_size: int = 1 << 18, max_requests: int = 1024,
+                 shared_table: bool = False):
+        """Start the worker processes.
+
+        Parameters
+        ----------
+        workers : int or None
+            Number of worker processes, defaults to the number of CPU cores.
+        table_size : int
+            Slots of the transposition table of every worker, or of the
+            shared table.
+        max_requests : int
+            Maximum number of requests pending at the same time.
+        shared_table : bool
+            Let all workers use one transposition table in shared memory
+            instead of one table per worker.
+        """
+        self._cancel_flags = multiprocessing.Array("b", max_requests, lock=False)
+        self._free_slots = list(range(max_requests))
+        self._lock = threading.Lock()
+        self.table = SharedTranspositionTable(table_size) if shared_table else None
+        self._executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                             initargs=(self._cancel_flags, table_size, self.table))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, board: GameBoard, color: str, deadline: float, max_depth: int | None = None) -> MoveRequest:
+        """Request a move for a board.
+
+        Parameters
+        ----------
+        board : GameBoard
+            Board to search; only a snapshot of its bitboards is sent, so the
+            board may change afterwards.
+        color : str
+            Color to move, "red" or "yellow".
+        deadline : float
+            Seconds until the move is needed.
+        max_depth : int or None
+            Maximum search depth, None for no limit.
+
+        Returns
+        -------
+        MoveRequest
+            Handle with the future of the move.
+
+        Raises
+        ------
+        RuntimeError
+            If ``max_requests`` requests are already pending.
+        """
+        opponent_color = "yellow" if color == "red" else "red"
+        position = board.get_bitboard(color)
+        mask = position | board.get_bitboard(opponent_color)
+
+        with self._lock:
+            if not self._free_slots:
+                raise RuntimeError("Too many pending move requests")
+            slot = self._free_slots.pop()
+        self._cancel_flags[slot] = 0
+
+        request = MoveRequest(self, slot, position, mask)
+        request._timer = threading.Timer(deadline, request._fallback)
+        request._timer.daemon = True
+        request._timer.start()
+        # The search time counts from now, so time spent waiting for a free worker is included
+        search_until = time.time() + deadline * _SEARCH_SHARE
+        request._worker_future = self._executor.submit(_search, slot, position, mask, search_until, max_depth)
+        request._worker_future.add_done_callback(request._worker_done)
+        return request
+
+    def shutdown(self):
+        """Stop all searches and the worker processes."""
+        for slot in range(len(self._cancel_flags)):
+            self._cancel_flags[slot] = 1
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.table is not None:
+            self.table.close()
+            self.table.unlink()
+            self.table = None
+
+    def _release(self, slot: int):
+        """Return the slot of a finished request."""
+        with self._lock:
+            self._free_slots.append(slot)
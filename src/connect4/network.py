@@ -0,0 +1,318 @@
+"""Learned evaluation of positions with a small NumPy network.
+
+``ValueNetwork`` is a multilayer perceptron which scores positions of the
+standard board for the player to move. Its weights are stored in an ``.npz``
+file with the arrays ``w0, b0, w1, b1, ...`` of the dense layers; the hidden
+layers use ReLU and the single output unit tanh, so a value is between -1
+(lost) and 1 (won). Inference is a few matrix multiplications, so no machine
+learning framework is needed.
+
+A position is encoded into three feature planes of 6 x 7 cells, row 0 being
+the top row as in ``GameBoard``: the coins of the player to move, the coins of
+the opponent and the cells where the next coin of each column lands. The
+planes are flattened into the input vector of the network.
+
+``ValueNetwork.scores`` evaluates a whole batch of positions with one matrix
+multiplication per layer; the search engine passes it the leaves below a node
+together (see the ``evaluator`` of ``SearchEngine``). ``train`` fits a network
+to the records of ``selfplay`` with plain mini-batch gradient descent::
+
+    python -m connect4.network selfplay_data --epochs 5
+
+This module needs NumPy, which is an optional dependency of the package
+(``pip install .[numpy]``).
+
+Classes
+-------
+ValueNetwork
+    Multilayer perceptron scoring positions for the player to move.
+
+Functions
+---------
+encode
+    Encode positions into feature planes.
+encode_board
+    Encode the position of a GameBoard for the color to move.
+load_default_network
+    Load the network shipped with the package, if it was trained.
+train
+    Fit a network to self-play records.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from . import bitboard
+from .game_board import GameBoard
+
+
+DEFAULT_NETWORK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "value_network.npz")
+
+# Feature planes: own coins, opponent coins, landing cells
+PLANE_COUNT = 3
+FEATURE_COUNT = PLANE_COUNT * bitboard.ROW_COUNT * bitboard.COLUMN_COUNT
+
+# Search score of a value of 1; far below the search engine's win scores, like the static evaluation
+SCORE_SCALE = 1000
+
+# Bit index of every cell, row 0 being the top row
+_CELL_BITS = np.array([[column * bitboard.HEIGHT + bitboard.ROW_COUNT - 1 - row
+                        for column in range(bitboard.COLUMN_COUNT)] for row in range(bitboard.ROW_COUNT)],
+                      dtype=np.uint64)
+
+
+def encode(positions, masks):
+    """Encode positions of the standard board into feature planes.
+
+    Parameters
+    ----------
+    positions : sequence of int or numpy.ndarray
+        Bitboards of the players to move.
+    masks : sequence of int or numpy.ndarray
+        Bitboards of all coins.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``float32`` array of shape (N, PLANE_COUNT, 6, 7).
+    """
+    positions = np.asarray(positions, dtype=np.uint64)
+    masks = np.asarray(masks, dtype=np.uint64)
+    landing = (masks + np.uint64(bitboard.BOTTOM_MASK)) & np.uint64(bitboard.BOARD_MASK)
+    planes = np.stack([positions, positions ^ masks, landing], axis=1)
+    return ((planes[:, :, None, None] >> _CELL_BITS) & np.uint64(1)).astype(np.float32)
+
+
+def encode_board(board: GameBoard):
+    """Encode a standard board for the color to move, see ``encode``.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``float32`` array of shape (PLANE_COUNT, 6, 7).
+
+    Raises
+    ------
+    ValueError
+        If the board does not have the standard size.
+    """
+    if board.geometry is not bitboard.STANDARD:
+        raise ValueError("The value network only evaluates the standard 6x7 board")
+    position = board.to_position()
+    return encode([position.position], [position.mask])[0]
+
+
+class ValueNetwork:
+    """Multilayer perceptron scoring positions for the player to move.
+
+    Attributes
+    ----------
+    layers : list[tuple[numpy.ndarray, numpy.ndarray]]
+        Weight matrix of shape (inputs, outputs) and bias of every dense
+        layer, from the input to the output layer.
+    """
+
+    def __init__(self, layers: list):
+        """Create a network from its layers.
+
+        Parameters
+        ----------
+        layers : list[tuple[numpy.ndarray, numpy.ndarray]]
+            Weights and bias of every layer; the first layer takes
+            ``FEATURE_COUNT`` inputs and the last one has a single output.
+
+        Raises
+        ------
+        ValueError
+            If the shapes of the layers do not fit together.
+        """
+        self.layers = [(np.asarray(weights, dtype=np.float32), np.asarray(bias, dtype=np.float32))
+                       for weights, bias in layers]
+        inputs = FEATURE_COUNT
+        for weights, bias in self.layers:
+            if weights.ndim != 2 or weights.shape[0] != inputs or bias.shape != (weights.shape[1],):
+                raise ValueError(f"Layer of shape {weights.shape} does not take {inputs} inputs")
+            inputs = weights.shape[1]
+        if not self.layers or inputs != 1:
+            raise ValueError("The last layer of a value network needs a single output")
+
+    @classmethod
+    def random(cls, hidden: tuple[int, ...] = (64,), seed: int | None = None) -> "ValueNetwork":
+        """Create an untrained network with He-initialized weights and the given hidden layer sizes."""
+        rng = np.random.default_rng(seed)
+        sizes = (FEATURE_COUNT,) + tuple(hidden) + (1,)
+        return cls([(rng.normal(0.0, np.sqrt(2.0 / inputs), (inputs, outputs)), np.zeros(outputs))
+                    for inputs, outputs in zip(sizes, sizes[1:])])
+
+    @classmethod
+    def load(cls, path: str) -> "ValueNetwork":
+        """Load the weights of a network from an ``.npz`` file written by ``save``.
+
+        Raises
+        ------
+        ValueError
+            If the file does not hold the layers of a value network.
+        """
+        with np.load(path) as data:
+            count = len([name for name in data.files if name.startswith("w")])
+            try:
+                return cls([(data[f"w{index}"], data[f"b{index}"]) for index in range(count)])
+            except KeyError as error:
+                raise ValueError(f"{path} is not a value network: missing {error}") from None
+
+    def save(self, path: str):
+        """Write the weights to an ``.npz`` file."""
+        arrays = {}
+        for index, (weights, bias) in enumerate(self.layers):
+            arrays[f"w{index}"] = weights
+            arrays[f"b{index}"] = bias
+        with open(path, "wb") as file:
+            np.savez(file, **arrays)
+
+    def predict(self, features):
+        """Return the values of encoded positions, see ``encode``.
+
+        Parameters
+        ----------
+        features : numpy.ndarray
+            Feature planes of shape (N, PLANE_COUNT, 6, 7).
+
+        Returns
+        -------
+        numpy.ndarray
+            ``float32`` array of shape (N,) with values between -1 and 1.
+        """
+        activations = features.reshape(len(features), -1)
+        for weights, bias in self.layers[:-1]:
+            activations = np.maximum(activations @ weights + bias, 0.0)
+        weights, bias = self.layers[-1]
+        return np.tanh(activations @ weights + bias)[:, 0]
+
+    def evaluate(self, positions, masks):
+        """Return the values of positions for the players to move, between -1 and 1, see ``encode``."""
+        return self.predict(encode(positions, masks))
+
+    def scores(self, positions, masks) -> list[int]:
+        """Return search scores of positions for the players to move.
+
+        All positions are evaluated in one batch; this is the ``evaluator``
+        of ``SearchEngine``.
+
+        Returns
+        -------
+        list[int]
+            Values scaled by ``SCORE_SCALE``.
+        """
+        if not len(positions):
+            return []
+        return np.rint(self.evaluate(positions, masks) * SCORE_SCALE).astype(np.int64).tolist()
+
+    def evaluate_board(self, board: GameBoard) -> float:
+        """Return the value of a standard board for the color to move."""
+        return float(self.predict(encode_board(board)[None])[0])
+
+
+def load_default_network() -> ValueNetwork | None:
+    """Return the network at ``DEFAULT_NETWORK_PATH`` or None if it was not trained."""
+    if not os.path.exists(DEFAULT_NETWORK_PATH):
+        return None
+    return ValueNetwork.load(DEFAULT_NETWORK_PATH)
+
+
+def train(dataset, hidden: tuple[int, ...] = (64,), epochs: int = 1, batch_size: int = 256,
+          learning_rate: float = 0.01, momentum: float = 0.9, seed: int = 0, network: ValueNetwork | None = None,
+          progress=None) -> ValueNetwork:
+    """Fit a network to the outcomes of self-play records.
+
+    The network is trained on the mean squared error of its value against
+    the ``value`` of the records with mini-batch gradient descent with
+    momentum.
+
+    Parameters
+    ----------
+    dataset : selfplay.SelfPlayDataset
+        Records to train on, read in shuffled batches.
+    hidden : tuple[int, ...]
+        Sizes of the hidden layers of a new network.
+    epochs : int
+        Number of passes over the records.
+    batch_size : int
+        Records per gradient step.
+    learning_rate : float
+        Step size of gradient descent.
+    momentum : float
+        Share of the previous step added to the next one.
+    seed : int
+        Seed of the initial weights and the shuffling.
+    network : ValueNetwork or None
+        Network to train further instead of a new one; it is changed in place.
+    progress : callable or None
+        Called with the epoch and its mean loss after every epoch.
+
+    Returns
+    -------
+    ValueNetwork
+        The trained network.
+    """
+    if network is None:
+        network = ValueNetwork.random(hidden, seed)
+    velocities = [(np.zeros_like(weights), np.zeros_like(bias)) for weights, bias in network.layers]
+    for epoch in range(epochs):
+        losses = []
+        for batch in dataset.batches(batch_size, seed=seed + epoch):
+            inputs = [encode(batch["position"], batch["mask"]).reshape(len(batch), -1)]
+            for weights, bias in network.layers[:-1]:
+                inputs.append(np.maximum(inputs[-1] @ weights + bias, 0.0))
+            weights, bias = network.layers[-1]
+            values = np.tanh(inputs[-1] @ weights + bias)[:, 0]
+            errors = values - batch["value"]
+            losses.append(float(np.mean(errors ** 2)))
+
+            # Backpropagation of the mean squared error through tanh and the ReLU layers
+            delta = (2.0 / len(batch) * errors * (1.0 - values ** 2))[:, None].astype(np.float32)
+            for index in range(len(network.layers) - 1, -1, -1):
+                weights, bias = network.layers[index]
+                weight_step, bias_step = velocities[index]
+                gradient = inputs[index].T @ delta
+                bias_gradient = delta.sum(axis=0)
+                if index:
+                    delta = (delta @ weights.T) * (inputs[index] > 0)
+                weight_step *= momentum
+                weight_step -= learning_rate * gradient
+                bias_step *= momentum
+                bias_step -= learning_rate * bias_gradient
+                weights += weight_step
+                bias += bias_step
+        if progress is not None:
+            progress(epoch, sum(losses) / len(losses) if losses else 0.0)
+    return network
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.network --help``."""
+    from .selfplay import SelfPlayDataset
+
+    parser = argparse.ArgumentParser(description="Train the value network of the search bot on self-play data.")
+    parser.add_argument("directory", help="self-play data written by python -m connect4.selfplay")
+    parser.add_argument("--output", default=DEFAULT_NETWORK_PATH, help="network file to write")
+    parser.add_argument("--hidden", type=int, nargs="+", default=[64], help="sizes of the hidden layers")
+    parser.add_argument("--epochs", type=int, default=5, help="passes over the data")
+    parser.add_argument("--batch-size", type=int, default=256, help="records per gradient step")
+    parser.add_argument("--learning-rate", type=float, default=0.01, help="step size of gradient descent")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    def progress(epoch, loss):
+        print(f"epoch {epoch + 1}: loss {loss:.4f}", flush=True)
+
+    dataset = SelfPlayDataset(args.directory)
+    network = train(dataset, tuple(args.hidden), args.epochs, args.batch_size, args.learning_rate, seed=args.seed,
+                    progress=progress)
+    network.save(args.output)
+    print(f"network written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Search of a single move on all CPU cores.
+
+``ParallelSearch`` runs a Lazy SMP search: every worker process searches the
+whole position with iterative deepening, and all workers share one
+``SharedTranspositionTable``. Worker 0 runs the main search; the helpers
+start on other root moves (see ``root_shift`` of ``SearchEngine.search``), so
+they fill the table with results the main search needs for its next moves.
+
+All workers search until the time budget is used up or the main search ends,
+which stops the helpers. The result of the deepest completed iteration wins,
+on equal depth the one of the main search. A worker which misses the hard
+deadline is left out; if none answers in time, a quick heuristic move is
+played instead. The workers return the probe, hit and store counts of the
+shared table with their results, the parent adds them to its table.
+
+Classes
+-------
+ParallelSearch
+    Lazy SMP search with a pool of worker processes.
+"""
+
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable
+
+from .engine import SearchEngine, SearchResult
+from .movepool import _SEARCH_SHARE, quick_move
+from .shared_table import SharedTranspositionTable
+
+
+# Seconds between two polls of the stop callback while the main search runs
+_POLL_INTERVAL = 0.05
+
+# State of a worker process, set by _init_worker
+_engine = None
+_stop_flag = None
+
+
+def _init_worker(stop_flag, table: SharedTranspositionTable, evaluator):
+    """Create the search engine of a worker process on the shared table."""
+    global _engine, _stop_flag
+    _engine = SearchEngine(table=table, evaluator=evaluator)
+    _stop_flag = stop_flag
+
+
+def _search(worker: int, position: int, mask: int, search_until: float | None, max_nodes: int | None,
+            max_depth: int | None) -> tuple[SearchResult, tuple[int, int, int]]:
+    """Search in a worker process until ``search_until`` (``time.time()``) or until the search is stopped.
+
+    Returns the result and the table counts of the search, see ``SharedTranspositionTable.take_counts``.
+    """
+    max_time = None if search_until is None else max(0.0, search_until - time.time())
+    result = _engine.search(position, mask, max_time, max_nodes, max_depth, stop=lambda: _stop_flag.value != 0,
+                            root_shift=worker, age_table=False)
+    return result, _engine.table.take_counts()
+
+
+def _shutdown(executor: ProcessPoolExecutor, table: SharedTranspositionTable):
+    """Stop the worker processes and remove the shared table."""
+    executor.shutdown(wait=True, cancel_futures=True)
+    table.close()
+    table.unlink()
+
+
+class ParallelSearch:
+    """Lazy SMP search with a pool of worker processes.
+
+    ``search`` has the interface of ``SearchEngine.search``, so it can replace
+    the engine of a ``SearchBot``. Only one search may run at a time. Use it as
+    a context manager or call ``close`` when done.
+
+    Attributes
+    ----------
+    workers : int
+        Number of worker processes.
+    table : SharedTranspositionTable
+        Transposition table shared by the workers; its statistics count the
+        lookups of the workers which answered in time.
+    nodes : int
+        Number of positions searched by all workers in the last search.
+    """
+
+    def __init__(self, workers: int | None = None, table_size: int = 1 << 20, evaluator=None):
+        """Start the worker processes.
+
+        Parameters
+        ----------
+        workers : int or None
+            Number of worker processes, defaults to the number of CPU cores.
+        table_size : int
+            Number of entries of the shared transposition table.
+        evaluator : callable or None
+            Batch evaluator of the leaves, see ``SearchEngine``; it is pickled
+            into every worker process.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.table = SharedTranspositionTable(table_size)
+        self.nodes = 0
+        self._stop_flag = multiprocessing.Value("b", 0, lock=False)
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self._stop_flag, self.table, evaluator))
+        self._finalizer = weakref.finalize(self, _shutdown, self._executor, self.table)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, position: int, mask: int, max_time: float | None = 1.0,
+               max_nodes: int | None = None, max_depth: int | None = None,
+               stop: Callable[[], bool] | None = None, age_table: bool = True) -> SearchResult:
+        """Search the best column for the player to move on all workers.
+
+        Parameters
+        ----------
+        position : int
+            Bitboard of the player to move.
+        mask : int
+            Bitboard of all coins on the board.
+        max_time : float or None
+            Hard deadline in seconds, None for no limit.
+        max_nodes : int or None
+            Node budget of every worker, None for no limit.
+        max_depth : int or None
+            Maximum search depth in plies, None to search until the end of the game.
+        stop : callable or None
+            Polled while the search runs; all workers stop as soon as it
+            returns True.
+        age_table : bool
+            Start a new generation of the shared transposition table.
+
+        Returns
+        -------
+        SearchResult
+            Best column and score of the deepest completed iteration of all
+            workers; ``nodes`` counts the positions of all workers which
+            answered in time.
+        """
+        start = time.time()
+        deadline = None if max_time is None else start + max_time
+        search_until = None if max_time is None else start + max_time * _SEARCH_SHARE
+        self._stop_flag.value = 0
+        if age_table:
+            self.table.new_search()
+        futures = [self._executor.submit(_search, worker, position, mask, search_until, max_nodes, max_depth)
+                   for worker in range(self.workers)]
+
+        # The helpers only support the main search, they stop when it ends
+        while not futures[0].done():
+            timeout = _POLL_INTERVAL if deadline is None else min(_POLL_INTERVAL, deadline - time.time())
+            if timeout <= 0 or stop is not None and stop():
+                break
+            wait([futures[0]], timeout=timeout)
+        self._stop_flag.value = 1
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else deadline - time.time()
+            if timeout is not None and timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+        results = []
+        for future in futures:
+            if future.done() and future.exception() is None:
+                result, counts = future.result()
+                results.append(result)
+                self.table.add_counts(counts)
+        self.nodes = sum(result.nodes for result in results)
+        if not results:
+            return SearchResult(quick_move(position, mask), 0, 0, 0)
+        # max keeps the first of equal results, so the main search wins ties
+        best = max(results, key=lambda result: result.depth)
+        return SearchResult(best.column, best.score, best.depth, self.nodes)
+
+    def close(self):
+        """Stop the worker processes and remove the shared table."""
+        self._stop_flag.value = 1
+        self._finalizer()
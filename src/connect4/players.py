@@ -13,11 +13,29 @@ Bot
     Simple bot that chooses a random valid column.
 SmartBot
     Bot that tries to win, block the opponent, and prefers central columns.
+SearchBot
+    Bot that searches ahead with negamax and alpha-beta pruning.
+MCTSBot
+    Bot that picks moves by Monte Carlo Tree Search.
+PerfectBot
+    Bot that plays the proven best move of the solver.
 """
 
 from abc import ABC, abstractmethod
 import random
+import threading
+from typing import TYPE_CHECKING
+from . import bitboard
 from .game_board import GameBoard
+from .engine import SearchEngine
+from .evaluation import score_move
+from .mcts import MonteCarloTreeSearch
+from .parallel import ParallelSearch
+from .solver import Solver
+
+if TYPE_CHECKING:
+    from .book import OpeningBook
+    from .network import ValueNetwork
 
 
 
@@ -32,27 +50,36 @@ class Player(ABC):
     _next_player_number : int
         Class-level counter used to assign unique player numbers.
 
+    verbose : bool
+        If True, bots announce their moves on the command line.
+
     Notes
     -----
-    The color assignment is currently based on the order of creation:
-    player 1 gets "red", all others get "yellow".
+    Unless a color is given, the color assignment is based on the order of
+    creation: player 1 gets "red", all others get "yellow".
     """
 
     _next_player_number = 1
 
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, color: str | None = None):
         """Initialize a player.
 
         Parameters
         ----------
         name : str
             Display name of the player.
+        color : str or None
+            Playing color ("red" or "yellow"). If None, the color is assigned
+            by the order of creation.
         """
         self._player_number = Player._next_player_number
         Player._next_player_number += 1
         self._name = name
-        if self._player_number == 1:
+        self.verbose = True
+        if color is not None:
+            self._color = color
+        elif self._player_number == 1:
             self._color = "red"
         else:
             self._color = "yellow"
@@ -95,10 +122,39 @@ class Player(ABC):
         Returns
         -------
         int or None
-            The chosen column index (0-6). Returns None if the player forfeits.
+            The chosen column index (0-6 on the standard board). Returns None
+            if the player forfeits.
         """
         pass
 
+    def start_pondering(self, board: GameBoard):
+        """Think about the position while the opponent is choosing a move.
+
+        Called by ``GameSession`` before the opponent is asked for a move.
+        Players which do not ponder ignore it.
+
+        Parameters
+        ----------
+        board : GameBoard
+            Board with the opponent to move; only a snapshot of it may be
+            used, as it changes with the opponent's move.
+        """
+
+    def stop_pondering(self):
+        """Stop thinking on the opponent's time, see ``start_pondering``."""
+
+    def close(self):
+        """Release the resources of the player, e.g. search processes.
+
+        Called when no more games are played; players without such
+        resources ignore it.
+        """
+
+    def _announce(self, column: int):
+        """Print the chosen column if the player is verbose."""
+        if self.verbose:
+            print(f"{self.name} plays column {column}")
+
 
 
 
@@ -120,16 +176,17 @@ class HumanPlayer(Player):
         Parameters
         ----------
         board : GameBoard
-            Game board instance (currently not used for input validation).
+            Game board instance, only its number of columns is used for
+            input validation.
 
         Returns
         -------
         int or None
-            Selected column index (0-6) or None if the player surrenders.
+            Selected column index or None if the player surrenders.
         """
         while True:
             column = input(f"Player{self.player_number}, choose column: ")
-            if column in ("0", "1", "2", "3", "4", "5", "6"):
+            if column.isdecimal() and int(column) < board.geometry.columns:
                 return int(column)
             elif column == "I surrender!":
                 self.surrender()
@@ -148,15 +205,15 @@ class Bot(Player):
         Parameters
         ----------
         board : GameBoard
-            Game board instance (currently not used for move validation).
+            Game board instance, only its number of columns is used.
 
         Returns
         -------
         int
-            Randomly selected column index (0-6).
+            Randomly selected column index.
         """
-        column = random.randint(0, 6)
-        print(f"{self.name} plays column {column}")
+        column = random.randrange(board.geometry.columns)
+        self._announce(column)
         return column
 
 
@@ -168,8 +225,9 @@ class SmartBot(Player):
     --------
     1. Play a winning move if available.
     2. Block the opponent's winning move.
-    3. Prefer central columns for positional advantage.
-    4. Fallback to a random valid move.
+    3. Play the move with the best static evaluation (open lines, threats,
+       row parity and double threats, see module ``evaluation``); central
+       columns win ties.
     """
 
     def play_turn(self, board: GameBoard) -> int:
@@ -180,91 +238,303 @@ class SmartBot(Player):
         board : GameBoard
             Game board instance used to evaluate valid columns and winners.
             The board is expected to provide:
-            - a 2D list/array attribute ``_board`` with empty slots as ""
-            - a method ``check_for_winner(color: str) -> bool``
+            - the methods ``legal_moves``, ``is_winning_move`` and
+              ``get_bitboard``
 
         Returns
         -------
         int
             Selected column index.
         """
-        valid_columns = self._valid_columns(board)
+        valid_columns = board.legal_moves()
 
         # Play a winning move if available.
         for column in valid_columns:
             if self._would_win(board, self.color, column):
-                print(f"{self.name} plays column {column}")
+                self._announce(column)
                 return column
 
         # Block the opponent's winning move.
         opponent_color = "yellow" if self.color == "red" else "red"
         for column in valid_columns:
             if self._would_win(board, opponent_color, column):
-                print(f"{self.name} plays column {column}")
+                self._announce(column)
                 return column
 
-        # Prefer central columns for positional advantage.
-        preferred = [3, 2, 4, 1, 5, 0, 6]
-        for column in preferred:
-            if column in valid_columns:
-                print(f"{self.name} plays column {column}")
-                return column
-
-        # Fallback to a random valid move.
-        column = random.choice(valid_columns)
-        print(f"{self.name} plays column {column}")
+        # Play the best move by the static evaluation, central columns first on equal scores.
+        column = max(board.legal_moves(centre_first=True),
+                     key=lambda column: score_move(board, self.color, column))
+        self._announce(column)
         return column
 
 
-    def _valid_columns(self, board: GameBoard) -> list[int]:
-        """Return a list of columns that are not full.
+    def _would_win(self, board: GameBoard, color: str, column: int) -> bool:
+        """Check whether playing in a column would result in a win.
+
+        The board checks the precomputed winning lines through the landing
+        cell of the column without adding a coin.
 
         Parameters
         ----------
         board : GameBoard
-            Game board instance exposing ``_board`` with empty slots as "".
+            Game board instance providing ``is_winning_move``.
+        color : str
+            Color identifier ("red" or "yellow") to test the move for.
+        column : int
+            Column index to test.
 
         Returns
         -------
-        list[int]
-            List of valid column indices (0-6) where a piece can be dropped.
+        bool
+            True if the move would win the game for ``color``, otherwise False.
         """
-        return [c for c in range(7) if board._board[0][c] == ""]
+        return board.is_winning_move(color, column)
 
 
-    def _would_win(self, board: GameBoard, color: str, column: int) -> bool:
-        """Check whether playing in a column would result in a win.
 
-        This method temporarily places a coin in the target position, calls
-        the board's winner detection, and then undoes the move.
+def _check_standard_board(board: GameBoard, player: Player):
+    """Raise a ValueError if a bot which relies on the standard bitboard layout is used on another board."""
+    if board.geometry is not bitboard.STANDARD:
+        raise ValueError(f"{type(player).__name__} only plays on the standard 6x7 board with four in a row")
+
+
+
+class SearchBot(Player):
+    """Bot that searches the game tree to pick its move.
+
+    The bot uses a ``SearchEngine`` (negamax with alpha-beta pruning, a
+    transposition table and iterative deepening) and answers within the given
+    time or node budget. The transposition table is kept between turns.
+    Positions found in the opening book are played without searching. With
+    more than one worker the search runs on a ``ParallelSearch`` process pool.
+    With a ``ValueNetwork`` the leaves of the search are scored by the learned
+    evaluation in batches.
+
+    With pondering enabled the bot searches the opponent's position in a
+    background thread while the opponent is choosing a move. This fills the
+    transposition table with the positions after all likely replies, the
+    expected reply being searched deepest, so the search after the real move
+    starts from these results instead of from scratch.
+    """
+
+    def __init__(self, name: str, max_time: float | None = 1.0, max_nodes: int | None = None,
+                 max_depth: int | None = None, table_size: int = 1 << 20, color: str | None = None,
+                 book: "OpeningBook | None" = None, workers: int = 1, ponder: bool = False,
+                 network: "ValueNetwork | None" = None):
+        """Initialize the bot.
+
+        Parameters
+        ----------
+        name : str
+            Display name of the bot.
+        max_time : float or None
+            Time budget per move in seconds, None for no limit.
+        max_nodes : int or None
+            Node budget per move, None for no limit.
+        max_depth : int or None
+            Maximum search depth in plies, None for no limit.
+        table_size : int
+            Number of slots of the transposition table.
+        color : str or None
+            Playing color, see ``Player``.
+        book : OpeningBook or None
+            Opening book which is checked before searching.
+        workers : int
+            Number of processes searching every move; with more than one the
+            bot searches in parallel on a shared transposition table.
+        ponder : bool
+            Search on the opponent's time, see ``start_pondering``.
+        network : ValueNetwork or None
+            Learned evaluation which scores the leaves of the search in
+            batches instead of the static evaluation.
+        """
+        super().__init__(name, color)
+        self._book = book
+        self._max_time = max_time
+        self._max_nodes = max_nodes
+        self._max_depth = max_depth
+        evaluator = None if network is None else network.scores
+        if workers > 1:
+            self._engine = ParallelSearch(workers, table_size, evaluator)
+        else:
+            self._engine = SearchEngine(table_size, evaluator=evaluator)
+        self.ponder = ponder
+        self._ponder_thread = None
+        self._ponder_stop = threading.Event()
+        self._ponder_position = None
+
+    def play_turn(self, board: GameBoard) -> int:
+        """Search the best column for the current board.
 
         Parameters
         ----------
         board : GameBoard
-            Game board instance exposing ``_board`` and ``check_for_winner``.
-        color : str
-            Color identifier ("red" or "yellow") to test the move for.
-        column : int
-            Column index to test.
+            Game board instance providing the bitboards of both colors.
+
+        Returns
+        -------
+        int
+            Selected column index.
+        """
+        _check_standard_board(board, self)
+        self.stop_pondering()
+        opponent_color = "yellow" if self.color == "red" else "red"
+        position = board.get_bitboard(self.color)
+        mask = position | board.get_bitboard(opponent_color)
+        if self._book is not None:
+            entry = self._book.lookup(position, mask)
+            if entry is not None:
+                self._announce(entry[0])
+                return entry[0]
+        result = self._engine.search(position, mask, self._max_time, self._max_nodes, self._max_depth)
+        self._announce(result.column)
+        return result.column
+
+    def start_pondering(self, board: GameBoard):
+        """Search the opponent's position in the background until ``stop_pondering`` is called.
+
+        Does nothing if pondering is disabled, the board does not have the
+        standard size or the bot already ponders on the same position.
+
+        Parameters
+        ----------
+        board : GameBoard
+            Board with the opponent to move; its bitboards are copied.
+        """
+        if not self.ponder or board.geometry is not bitboard.STANDARD:
+            return
+        opponent_color = "yellow" if self.color == "red" else "red"
+        position = board.get_bitboard(opponent_color)
+        mask = position | board.get_bitboard(self.color)
+        if self._ponder_thread is not None and self._ponder_position == (position, mask):
+            return
+        self.stop_pondering()
+        if mask == bitboard.BOARD_MASK:
+            return
+        self._ponder_stop.clear()
+        self._ponder_position = (position, mask)
+        self._ponder_thread = threading.Thread(target=self._engine.search, args=(position, mask, None),
+                                               kwargs={"stop": self._ponder_stop.is_set}, daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self) -> bool:
+        """Stop the background search and wait for it to end.
 
         Returns
         -------
         bool
-            True if the move would win the game for ``color``, otherwise False.
+            True if the bot was pondering.
         """
-        target_row = None
-        for row in range(5, -1, -1):
-            if board._board[row][column] == "":
-                target_row = row
-                break
-        if target_row is None:
+        if self._ponder_thread is None:
             return False
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+        self._ponder_position = None
+        return True
+
+    def close(self):
+        """Stop pondering and the worker processes of a parallel search."""
+        self.stop_pondering()
+        if isinstance(self._engine, ParallelSearch):
+            self._engine.close()
+
+
+class MCTSBot(Player):
+    """Bot that selects moves by Monte Carlo Tree Search.
+
+    The strength is tuned by the number of random playouts per move and/or a
+    time budget. The search tree below the played move is reused in the next
+    turn.
+    """
+
+    def __init__(self, name: str, max_playouts: int | None = 2000, max_time: float | None = None,
+                 exploration: float = 1.41, color: str | None = None):
+        """Initialize the bot.
+
+        Parameters
+        ----------
+        name : str
+            Display name of the bot.
+        max_playouts : int or None
+            Playouts per move, None for no limit.
+        max_time : float or None
+            Time budget per move in seconds, None for no limit.
+        exploration : float
+            Exploration constant of the UCT formula.
+        color : str or None
+            Playing color, see ``Player``.
+        """
+        super().__init__(name, color)
+        self._max_playouts = max_playouts
+        self._max_time = max_time
+        self._tree = MonteCarloTreeSearch(exploration, seed=random.getrandbits(32))
+
+    def play_turn(self, board: GameBoard) -> int:
+        """Search the best column for the current board.
+
+        Parameters
+        ----------
+        board : GameBoard
+            Game board instance providing the bitboards of both colors.
+
+        Returns
+        -------
+        int
+            Selected column index.
+        """
+        _check_standard_board(board, self)
+        opponent_color = "yellow" if self.color == "red" else "red"
+        position = board.get_bitboard(self.color)
+        mask = position | board.get_bitboard(opponent_color)
+        column = self._tree.search(position, mask, self._max_playouts, self._max_time)
+        self._announce(column)
+        return column
+
+
+class PerfectBot(Player):
+    """Bot that always plays the proven best move.
+
+    Every move is taken from a ``Solver``: the bot wins as fast as possible,
+    and loses as late as possible. Solving positions early in the game takes
+    very long, so the bot is meant for analysis and endgames.
+    """
+
+    def __init__(self, name: str, table_size: int = 1 << 23, color: str | None = None):
+        """Initialize the bot.
+
+        Parameters
+        ----------
+        name : str
+            Display name of the bot.
+        table_size : int
+            Number of slots of the transposition table of the solver.
+        color : str or None
+            Playing color, see ``Player``.
+        """
+        super().__init__(name, color)
+        self._solver = Solver(table_size)
 
-        coin = "🔴" if color == "red" else "🟡"
-        board._board[target_row][column] = coin
-        won = board.check_for_winner(color)
-        board._board[target_row][column] = ""  # undo turn
-        return won
+    def play_turn(self, board: GameBoard) -> int:
+        """Solve the current board and return the best column.
+
+        Parameters
+        ----------
+        board : GameBoard
+            Game board instance providing the bitboards of both colors.
+
+        Returns
+        -------
+        int
+            Selected column index.
+        """
+        _check_standard_board(board, self)
+        opponent_color = "yellow" if self.color == "red" else "red"
+        position = board.get_bitboard(self.color)
+        mask = position | board.get_bitboard(opponent_color)
+        column = self._solver.best_move(position, mask).column
+        self._announce(column)
+        return column
 
 
 
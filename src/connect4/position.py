@@ -0,0 +1,184 @@
+"""Immutable positions for exploring variations.
+
+A ``Position`` is a snapshot of a board packed into two integers in the
+bitboard layout of module ``bitboard``: the coins of the player to move and
+all coins on the board. ``play`` returns a new position with a few integer
+operations instead of copying a grid, and positions are hashable, so search
+trees, caches and sets can hold many of them::
+
+    position = board.to_position()
+    for column in position.legal_moves():
+        child = position.play(column)
+        if child.is_won():
+            ...
+
+``GameBoard.to_position`` and ``GameBoard.from_position`` convert between a
+board and a position; like ``GameBoard.from_bytes`` the position keeps no
+move history.
+
+Classes
+-------
+Position
+    Immutable, hashable board position.
+"""
+
+from collections.abc import Iterable
+
+from . import bitboard
+
+
+class Position:
+    """Immutable, hashable board position.
+
+    Two positions are equal if they have the same coins, the same player to
+    move and the same board size. Positions are immutable: every move creates
+    a new one, and setting an attribute raises an AttributeError.
+
+    Attributes
+    ----------
+    position : int
+        Bitboard of the player to move.
+    mask : int
+        Bitboard of all coins on the board.
+    red_to_move : bool
+        True if red is to move.
+    geometry : bitboard.Geometry
+        Board size and connect length.
+    """
+
+    __slots__ = ("position", "mask", "red_to_move", "geometry")
+
+    def __init__(self, position: int = 0, mask: int = 0, red_to_move: bool = True,
+                 geometry: bitboard.Geometry = bitboard.STANDARD):
+        """Create a position, by default the empty standard board with red to move.
+
+        Parameters
+        ----------
+        position : int
+            Bitboard of the player to move.
+        mask : int
+            Bitboard of all coins on the board.
+        red_to_move : bool
+            True if red is to move.
+        geometry : bitboard.Geometry
+            Board size and connect length, see ``bitboard.geometry``.
+
+        Raises
+        ------
+        ValueError
+            If ``position`` has coins outside of ``mask``, or ``mask`` is not
+            a board of ``geometry`` with coins stacked from the bottom.
+        """
+        if position & ~mask or mask & ~geometry.board_mask or (mask + geometry.bottom_mask) & mask:
+            raise ValueError("Not a valid position")
+        _init(self, position, mask, red_to_move, geometry)
+
+    @classmethod
+    def from_moves(cls, moves: Iterable[int], geometry: bitboard.Geometry = bitboard.STANDARD) -> "Position":
+        """Return the position after playing columns from the empty board, red moving first.
+
+        Raises
+        ------
+        ValueError
+            If a column is full or out of range.
+        """
+        position = cls(geometry=geometry)
+        for column in moves:
+            position = position.play(column)
+        return position
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.position == other.position and self.mask == other.mask
+                and self.red_to_move == other.red_to_move and self.geometry is other.geometry)
+
+    def __hash__(self) -> int:
+        return hash((self.position + self.mask, self.red_to_move))
+
+    def __repr__(self) -> str:
+        return (f"Position(position={self.position:#x}, mask={self.mask:#x}, red_to_move={self.red_to_move}, "
+                f"geometry={self.geometry!r})")
+
+    def __reduce__(self):
+        return Position, (self.position, self.mask, self.red_to_move, self.geometry)
+
+    @property
+    def key(self) -> int:
+        """int: Unique key ``position + mask`` of the coins seen from the player to move; mirror images differ."""
+        return self.position + self.mask
+
+    @property
+    def color_to_move(self) -> str:
+        """str: "red" or "yellow"."""
+        return "red" if self.red_to_move else "yellow"
+
+    @property
+    def moves(self) -> int:
+        """int: Number of coins on the board."""
+        return bitboard.popcount(self.mask)
+
+    def get_bitboard(self, color: str) -> int:
+        """Return the bitboard of the coins of a color, see ``GameBoard.get_bitboard``."""
+        return self.position if (color == "red") == self.red_to_move else self.position ^ self.mask
+
+    def can_play(self, column: int) -> bool:
+        """Return True if a column is on the board and not full."""
+        geometry = self.geometry
+        return 0 <= column < geometry.columns and not self.mask >> (column * geometry.height + geometry.rows - 1) & 1
+
+    def legal_moves(self) -> tuple[int, ...]:
+        """Return the columns which are not full, from the centre to the edges."""
+        return tuple(column for column in self.geometry.centre_order if self.can_play(column))
+
+    def play(self, column: int) -> "Position":
+        """Return the position after the player to move drops a coin into a column.
+
+        The position itself is not changed.
+
+        Raises
+        ------
+        ValueError
+            If the column is full or out of range.
+        """
+        if not self.can_play(column):
+            raise ValueError(f"Cannot play column {column}")
+        child = object.__new__(Position)
+        mask = self.mask
+        _init(child, self.position ^ mask, mask | (mask + (1 << column * self.geometry.height)),
+              not self.red_to_move, self.geometry)
+        return child
+
+    def is_winning_move(self, column: int) -> bool:
+        """Return True if dropping a coin into a column wins for the player to move; the column must be playable."""
+        move = (self.mask + (1 << column * self.geometry.height)) & ~self.mask & self.geometry.board_mask
+        return self.geometry.has_won(self.position | move)
+
+    def is_won(self) -> bool:
+        """Return True if the player who moved last has connected enough coins."""
+        return self.geometry.has_won(self.position ^ self.mask)
+
+    def is_full(self) -> bool:
+        """Return True if every cell of the board is occupied."""
+        return self.mask == self.geometry.board_mask
+
+
+def _init(position: Position, bits: int, mask: int, red_to_move: bool, geometry: bitboard.Geometry):
+    """Set the slots of a new position, bypassing the immutability of ``Position.__setattr__``."""
+    _set_position(position, bits)
+    _set_mask(position, mask)
+    _set_red_to_move(position, red_to_move)
+    _set_geometry(position, geometry)
+
+
+# Slot setters which bypass Position.__setattr__
+_set_position = Position.position.__set__
+_set_mask = Position.mask.__set__
+_set_red_to_move = Position.red_to_move.__set__
+_set_geometry = Position.geometry.__set__
@@ -0,0 +1,292 @@
+"""Game records and the binary game log.
+
+Every finished game can be stored as a ``GameRecord``: the played columns,
+the color which started, the outcome and the seconds every move took. Records
+are appended to a log file of length-prefixed records, so the file can grow
+game by game and is read back as a stream::
+
+    header  : magic b"C4GR", version (uint16)
+    record  : payload length (uint32), payload                    little endian
+    payload : flags (uint8), rows, columns, connect length (uint8 each),
+              move count (uint16), played columns (uint8 per move),
+              move times in seconds (float32 per move)
+
+The flags hold the starting color (bit 0 set for yellow), the winner (bits 1-2:
+0 draw, 1 red, 2 yellow) and whether the loser surrendered (bit 3). The board
+size and connect length are stored with every record, so games of other sizes
+(``python main.py --rows 7 --columns 8``) are replayed on a board of their own.
+
+``read_records`` is a generator, so a log of any size is replayed or
+summarised record by record. ``replay`` plays a record again through
+``GameBoard.add_coin``, so the same rules apply as in the game itself.
+Show the statistics of a log with::
+
+    python -m connect4.records game_records.bin
+
+Classes
+-------
+GameRecord
+    Moves, outcome and move times of one game.
+GameLog
+    Appends records to a log file.
+
+Functions
+---------
+read_records
+    Stream the records of a log file.
+replay
+    Play a record move by move on a board.
+summarize
+    Count the outcomes, moves and move times of a log file.
+"""
+
+import argparse
+import os
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from . import bitboard
+from .game_board import GameBoard
+from .session import GameSession
+
+
+_HEADER = struct.Struct("<4sH")
+_LENGTH = struct.Struct("<I")
+_PAYLOAD_HEADER = struct.Struct("<BBBBH")
+_MAGIC = b"C4GR"
+_VERSION = 2
+
+_WINNERS = (None, "red", "yellow")
+_YELLOW_FIRST = 0b0001
+_SURRENDERED = 0b1000
+
+
+@dataclass
+class GameRecord:
+    """Record of one game.
+
+    Attributes
+    ----------
+    moves : list[int]
+        Played columns in order.
+    first : str
+        Color of the player who made the first move.
+    winner : str or None
+        Color of the winner, None for a draw.
+    surrendered : bool
+        True if the game ended because the loser surrendered.
+    move_times : list[float]
+        Seconds needed for every move, see ``GameSession.move_times``.
+    rows, columns, connect : int
+        Size and connect length of the board the game was played on.
+    """
+
+    moves: list[int]
+    first: str = "red"
+    winner: str | None = None
+    surrendered: bool = False
+    move_times: list[float] = field(default_factory=list)
+    rows: int = bitboard.ROW_COUNT
+    columns: int = bitboard.COLUMN_COUNT
+    connect: int = 4
+
+    @classmethod
+    def from_session(cls, session: GameSession) -> "GameRecord":
+        """Create the record of a finished game session."""
+        winner = session.winner.color if session.winner is not None else None
+        geometry = session.board.geometry
+        return cls(list(session.moves), session.first_player.color, winner, session.surrendered is not None,
+                   list(session.move_times), geometry.rows, geometry.columns, geometry.connect)
+
+    @property
+    def geometry(self) -> bitboard.Geometry:
+        """The ``bitboard.Geometry`` of the board the game was played on."""
+        return bitboard.geometry(self.rows, self.columns, self.connect)
+
+    def to_bytes(self) -> bytes:
+        """Return the payload of the record in the log format."""
+        flags = _WINNERS.index(self.winner) << 1
+        if self.first == "yellow":
+            flags |= _YELLOW_FIRST
+        if self.surrendered:
+            flags |= _SURRENDERED
+        times = self.move_times or [0.0] * len(self.moves)
+        return (_PAYLOAD_HEADER.pack(flags, self.rows, self.columns, self.connect, len(self.moves))
+                + bytes(self.moves)
+                + struct.pack(f"<{len(times)}f", *times))
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "GameRecord":
+        """Create a record from a payload of the log format.
+
+        Raises
+        ------
+        ValueError
+            If the payload is damaged.
+        """
+        if len(payload) < _PAYLOAD_HEADER.size:
+            raise ValueError("Game record is too short")
+        flags, rows, columns, connect, count = _PAYLOAD_HEADER.unpack_from(payload)
+        if len(payload) != _PAYLOAD_HEADER.size + 5 * count or flags >> 1 & 0b11 == 3:
+            raise ValueError("Game record is damaged")
+        start = _PAYLOAD_HEADER.size
+        moves = list(payload[start:start + count])
+        times = list(struct.unpack_from(f"<{count}f", payload, start + count))
+        return cls(moves, "yellow" if flags & _YELLOW_FIRST else "red", _WINNERS[flags >> 1 & 0b11],
+                   bool(flags & _SURRENDERED), times, rows, columns, connect)
+
+
+class GameLog:
+    """Log file to which game records are appended.
+
+    Every record is flushed when it is written, so records of an interrupted
+    program are kept. Use it as a context manager or call ``close`` when done.
+    """
+
+    def __init__(self, path: str):
+        """Open a log file for appending, it is created if it does not exist.
+
+        Raises
+        ------
+        ValueError
+            If the file exists and is not a game log.
+        """
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as file:
+                _check_header(file.read(_HEADER.size), path)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, record: GameRecord):
+        """Write a record to the end of the log."""
+        payload = record.to_bytes()
+        self._file.write(_LENGTH.pack(len(payload)) + payload)
+        self._file.flush()
+
+    def close(self):
+        """Close the log file."""
+        self._file.close()
+
+
+def _check_header(header: bytes, path: str):
+    """Raise a ValueError if a header is not the one of a game log of the supported version."""
+    if len(header) < _HEADER.size or _HEADER.unpack(header) != (_MAGIC, _VERSION):
+        raise ValueError(f"{path} is not a game log of version {_VERSION}")
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Yield the records of a log file one by one.
+
+    Only one record is held in memory at a time. A record which was cut off
+    at the end of the file (e.g. by a crash while writing) ends the stream.
+
+    Parameters
+    ----------
+    path : str
+        Path of the log file.
+
+    Yields
+    ------
+    GameRecord
+        Records in the order they were written.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a game log or a record is damaged.
+    """
+    with open(path, "rb") as file:
+        _check_header(file.read(_HEADER.size), path)
+        while True:
+            prefix = file.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            length = _LENGTH.unpack(prefix)[0]
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield GameRecord.from_bytes(payload)
+
+
+def replay(record: GameRecord, board: GameBoard | None = None) -> Iterator[GameBoard]:
+    """Play the moves of a record with ``GameBoard.add_coin``.
+
+    Parameters
+    ----------
+    record : GameRecord
+        Game to replay.
+    board : GameBoard or None
+        Board to play on, it is reset first. A new board of the size of the
+        record is created if None.
+
+    Yields
+    ------
+    GameBoard
+        The board after every move; the same board object is yielded every time.
+
+    Raises
+    ------
+    ValueError
+        If the board has another size than the record, a move of the record
+        is not valid or the outcome does not match.
+    """
+    if board is None:
+        board = GameBoard(record.rows, record.columns, record.connect)
+    elif board.geometry is not record.geometry:
+        raise ValueError(f"The record was played on a board of {record.rows}x{record.columns}, "
+                         f"connect {record.connect}")
+    board.reset_board()
+    color = record.first
+    for number, column in enumerate(record.moves, 1):
+        if board.add_coin(color, column) is not True:
+            raise ValueError(f"Move {number} (column {column}) of the record is not valid")
+        if board.check_last_move_wins() and (number != len(record.moves) or record.winner != color):
+            raise ValueError(f"Move {number} wins, which does not match the record")
+        yield board
+        color = "yellow" if color == "red" else "red"
+
+
+def summarize(path: str) -> dict:
+    """Return statistics of a log file.
+
+    Returns
+    -------
+    dict
+        Number of games, wins per color, draws, surrendered games, average
+        number of moves and average seconds per move.
+    """
+    stats = {"games": 0, "red": 0, "yellow": 0, "draws": 0, "surrendered": 0, "moves": 0, "seconds": 0.0}
+    for record in read_records(path):
+        stats["games"] += 1
+        stats[record.winner or "draws"] += 1
+        stats["surrendered"] += record.surrendered
+        stats["moves"] += len(record.moves)
+        stats["seconds"] += sum(record.move_times)
+    moves = stats.pop("moves")
+    seconds = stats.pop("seconds")
+    stats["average_moves"] = moves / stats["games"] if stats["games"] else 0.0
+    stats["average_move_seconds"] = seconds / moves if moves else 0.0
+    return stats
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.records --help``."""
+    parser = argparse.ArgumentParser(description="Show statistics of a Connect 4 game log.")
+    parser.add_argument("path", help="game log file")
+    args = parser.parse_args(argv)
+    for name, value in summarize(args.path).items():
+        print(f"{name:22} {value:.3f}" if isinstance(value, float) else f"{name:22} {value}")
+
+
+if __name__ == "__main__":
+    main()
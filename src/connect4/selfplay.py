@@ -0,0 +1,427 @@
+"""Self-play training data for a learned evaluation.
+
+``generate`` lets two bots play many games on all CPU cores (like
+``simulate``) and labels every position of a game with the move the bot
+played there and the outcome of the game for the player to move. The records
+are written into shards, one NumPy ``.npy`` file per chunk of games, with
+fixed-size records of ``RECORD_DTYPE``::
+
+    position   uint64  bitboard of the player to move, see module ``bitboard``
+    mask       uint64  bitboard of all coins
+    move       uint8   column the bot played (policy target)
+    value      int8    outcome for the player to move: 1 win, 0 draw, -1 loss
+    ply        uint8   number of coins on the board; red is to move on even plies
+    remaining  uint8   plies until the end of the game
+
+A worker writes its shard to a temporary file and renames it when the chunk
+is complete, so an interrupted run leaves only complete shards behind. Running
+``generate`` again on the same directory skips these shards and plays the
+missing ones; the settings of the first run are kept in ``selfplay.json`` and
+a run with other settings is rejected. The file also keeps the number of
+games of the last run, as the last shard of a run may hold fewer games than
+the others: it is played again if a run needs another number of games in it. Every shard seeds the random number
+generators of its worker with ``seed + shard index``.
+
+``SelfPlayDataset`` maps the shards into memory and yields shuffled batches:
+records are streamed shard by shard (in random order) through a shuffle
+buffer of bounded size, so a data set larger than the memory can be read::
+
+    python -m connect4.selfplay selfplay_data --games 10000 --player1 SearchBot --player2 SearchBot
+
+    dataset = SelfPlayDataset("selfplay_data")
+    for batch in dataset.batches(batch_size=256):
+        ...
+
+This module needs NumPy, which is an optional dependency of the package
+(``pip install .[numpy]``).
+
+Classes
+-------
+GenerationReport
+    Shards, games and records of a ``generate`` run.
+SelfPlayDataset
+    Batched, shuffled read access to the shards of a directory.
+
+Functions
+---------
+generate
+    Play self-play games in parallel and write them as shards.
+game_records
+    Label the positions of one game.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+
+from .position import Position
+from .session import GameSession
+from .simulate import BOTS, _create_player, bot_spec
+
+
+RECORD_DTYPE = np.dtype([("position", "<u8"), ("mask", "<u8"), ("move", "u1"), ("value", "i1"), ("ply", "u1"),
+                         ("remaining", "u1")])
+
+SHARD_PATTERN = "shard-{:05d}.npy"
+CONFIG_FILE = "selfplay.json"
+_VERSION = 1
+
+
+@dataclass
+class GenerationReport:
+    """Result of a ``generate`` run.
+
+    Attributes
+    ----------
+    shards : int
+        Shards written in this run.
+    skipped : int
+        Complete shards of an earlier run which were kept.
+    games : int
+        Games played in this run.
+    records : int
+        Positions written in this run.
+    seconds : float
+        Wall-clock time of the run.
+    """
+
+    shards: int = 0
+    skipped: int = 0
+    games: int = 0
+    records: int = 0
+    seconds: float = 0.0
+
+
+def game_records(moves: list[int], winner: str | None, random_moves: int = 0):
+    """Label the positions of one game, red moving first.
+
+    Parameters
+    ----------
+    moves : list[int]
+        Played columns in order.
+    winner : str or None
+        Color of the winner, None for a draw.
+    random_moves : int
+        Number of random opening moves; their positions are left out, as
+        their moves are no policy targets.
+
+    Returns
+    -------
+    numpy.ndarray
+        Records of ``RECORD_DTYPE``, one per position before a move.
+    """
+    records = np.zeros(max(0, len(moves) - random_moves), dtype=RECORD_DTYPE)
+    position = Position()
+    for ply, column in enumerate(moves):
+        if ply >= random_moves:
+            mover = "red" if ply % 2 == 0 else "yellow"
+            records[ply - random_moves] = (position.position, position.mask, column,
+                                           0 if winner is None else 1 if winner == mover else -1,
+                                           ply, len(moves) - ply)
+        position = position.play(column)
+    return records
+
+
+def _play_selfplay_game(first, second, rng: random.Random, random_moves: int) -> tuple[list[int], str | None]:
+    """Play one game after ``random_moves`` random opening moves; return the moves and the winning color."""
+    session = GameSession(first, second)
+    while not session.is_over and len(session.moves) < random_moves:
+        session.apply_move(rng.choice(session.board.legal_moves()))
+    while not session.is_over:
+        session.play_turn()
+    return session.moves, None if session.winner is None else session.winner.color
+
+
+def _play_shard(directory: str, shard: int, first_game: int, games: int, player1_spec, player2_spec,
+                seed: int, random_moves: int) -> tuple[int, int]:
+    """Play the games of one shard in a worker process and write the shard; return the games and records."""
+    random.seed(seed + shard)
+    rng = random.Random(seed + shard)
+    player1_red = (_create_player(player1_spec, "player1", "red"), _create_player(player2_spec, "player2", "yellow"))
+    player1_yellow = (_create_player(player2_spec, "player2", "red"), _create_player(player1_spec, "player1", "yellow"))
+    chunks = []
+    for game in range(first_game, first_game + games):
+        # Both players start equally often, counted over the whole run
+        first, second = player1_red if game % 2 == 0 else player1_yellow
+        moves, winner = _play_selfplay_game(first, second, rng, random_moves)
+        chunks.append(game_records(moves, winner, random_moves))
+    records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD_DTYPE)
+
+    path = os.path.join(directory, SHARD_PATTERN.format(shard))
+    with open(path + ".tmp", "wb") as file:
+        np.save(file, records)
+    os.replace(path + ".tmp", path)
+    return games, len(records)
+
+
+def _spec_config(spec) -> dict:
+    """Describe a player spec for the settings file."""
+    player_class, kwargs = spec if isinstance(spec, tuple) else (spec, {})
+    return {"class": player_class.__name__, "kwargs": {key: repr(value) for key, value in sorted(kwargs.items())}}
+
+
+def _shard_games(games: int, games_per_shard: int, shard: int) -> int:
+    """Return the number of games of a shard in a run of ``games`` games, 0 if the run has no such shard."""
+    return max(0, min(games_per_shard, games - shard * games_per_shard))
+
+
+def _check_config(directory: str, config: dict) -> int | None:
+    """Return the number of games of the last run on a directory, None if unknown.
+
+    Raises a ValueError if the directory holds shards of other settings.
+    """
+    path = os.path.join(directory, CONFIG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        stored = json.load(file)
+    games = stored.pop("games", None)
+    if stored != config:
+        raise ValueError(f"{directory} holds self-play data of other settings, see {CONFIG_FILE}")
+    return games
+
+
+def _write_config(directory: str, config: dict):
+    """Write the settings and the number of games of a run."""
+    with open(os.path.join(directory, CONFIG_FILE), "w") as file:
+        json.dump(config, file, indent=2)
+
+
+def generate(directory: str, player1, player2, games: int, workers: int | None = None, seed: int = 0,
+             games_per_shard: int = 100, random_moves: int = 4, progress=None) -> GenerationReport:
+    """Play self-play games on a process pool and write their positions as shards.
+
+    Parameters
+    ----------
+    directory : str
+        Output directory; it is created if needed. Complete shards of an
+        earlier run with the same settings are kept, except for a short last
+        shard which has to hold another number of games now.
+    player1 : type[Player] or tuple[type[Player], dict]
+        Player class (or class and keyword arguments), see ``simulate.simulate``.
+    player2 : type[Player] or tuple[type[Player], dict]
+        Opponent class (or class and keyword arguments); may be the same as
+        ``player1``. The players swap colors every game.
+    games : int
+        Total number of games in the directory, including earlier runs.
+    workers : int or None
+        Number of worker processes, defaults to the number of CPU cores.
+        With 1 worker the games are played in the calling process.
+    seed : int
+        Base seed for the random number generators of the workers.
+    games_per_shard : int
+        Games per shard; a shard is the unit of work of a worker.
+    random_moves : int
+        Random opening moves per game, so the bots do not play the same
+        games again and again.
+    progress : callable or None
+        Called with the report after every written shard.
+
+    Returns
+    -------
+    GenerationReport
+        Shards, games and records written by this run.
+
+    Raises
+    ------
+    ValueError
+        If the directory holds shards written with other settings.
+    """
+    os.makedirs(directory, exist_ok=True)
+    config = {
+        "version": _VERSION,
+        "player1": _spec_config(player1),
+        "player2": _spec_config(player2),
+        "seed": seed,
+        "games_per_shard": games_per_shard,
+        "random_moves": random_moves,
+    }
+    previous_games = _check_config(directory, config)
+    # Only the last shard of the previous run may be short; a shard is removed, and played again if it is still
+    # needed, when this run needs another number of games in it. Full shards behind the last one are kept.
+    shards_to_check = {games // games_per_shard}
+    if previous_games is not None:
+        shards_to_check.add(previous_games // games_per_shard)
+    for shard in shards_to_check:
+        held = games_per_shard
+        if previous_games is not None:
+            held = _shard_games(previous_games, games_per_shard, shard) or games_per_shard
+        needed = _shard_games(games, games_per_shard, shard)
+        path = os.path.join(directory, SHARD_PATTERN.format(shard))
+        if held != needed and (needed or held < games_per_shard) and os.path.exists(path):
+            os.remove(path)
+    # Written after the removal, so an interrupted run never records a count which a short shard does not match
+    _write_config(directory, {**config, "games": games})
+
+    workers = workers or os.cpu_count() or 1
+    report = GenerationReport()
+    tasks = []
+    for shard, first_game in enumerate(range(0, games, games_per_shard)):
+        if os.path.exists(os.path.join(directory, SHARD_PATTERN.format(shard))):
+            report.skipped += 1
+        else:
+            tasks.append((directory, shard, first_game, _shard_games(games, games_per_shard, shard), player1, player2,
+                          seed, random_moves))
+
+    def add(result: tuple[int, int]):
+        report.shards += 1
+        report.games += result[0]
+        report.records += result[1]
+        report.seconds = time.perf_counter() - start_time
+        if progress is not None:
+            progress(report)
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        for task in tasks:
+            add(_play_shard(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in as_completed([executor.submit(_play_shard, *task) for task in tasks]):
+                add(future.result())
+    report.seconds = time.perf_counter() - start_time
+    return report
+
+
+class _RecordStream:
+    """Reads records from a list of memory-mapped shards in order, across shard boundaries."""
+
+    def __init__(self, shards: list):
+        self._shards = iter(shards)
+        self._current = np.zeros(0, dtype=RECORD_DTYPE)
+        self._offset = 0
+
+    def read(self, count: int):
+        """Return the next ``count`` records as a new array, fewer at the end of the stream."""
+        parts = []
+        while count > 0:
+            if self._offset == len(self._current):
+                self._current = next(self._shards, None)
+                self._offset = 0
+                if self._current is None:
+                    break
+                continue
+            part = self._current[self._offset:self._offset + count]
+            self._offset += len(part)
+            count -= len(part)
+            parts.append(part)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+
+
+class SelfPlayDataset:
+    """Self-play records of the shards of a directory.
+
+    Shards are opened as read-only memory maps, so only the records of the
+    current batches and the shuffle buffer are held in memory.
+
+    Attributes
+    ----------
+    paths : list[str]
+        Paths of the complete shards, in shard order.
+    """
+
+    def __init__(self, directory: str):
+        """Open all complete shards of a directory.
+
+        Parameters
+        ----------
+        directory : str
+            Directory written by ``generate``.
+
+        Raises
+        ------
+        ValueError
+            If a shard does not hold records of ``RECORD_DTYPE``.
+        """
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.startswith("shard-") and name.endswith(".npy"))
+        self._shards = [np.load(path, mmap_mode="r") for path in self.paths]
+        for path, shard in zip(self.paths, self._shards):
+            if shard.dtype != RECORD_DTYPE:
+                raise ValueError(f"{path} is not a self-play shard")
+
+    def __len__(self) -> int:
+        """Return the number of records of all shards."""
+        return sum(len(shard) for shard in self._shards)
+
+    def records(self):
+        """Return all records in shard order as one array in memory."""
+        return np.concatenate(self._shards) if self._shards else np.zeros(0, dtype=RECORD_DTYPE)
+
+    def batches(self, batch_size: int = 256, buffer_size: int = 1 << 16, seed: int | None = None,
+                epochs: int = 1) -> Iterator:
+        """Yield shuffled batches of records.
+
+        The shards are read in random order into a shuffle buffer; every batch
+        takes random records out of the buffer, which are replaced by the next
+        records of the stream. When the stream ends the buffer is emptied in
+        random order. Every record is yielded once per epoch.
+
+        Parameters
+        ----------
+        batch_size : int
+            Records per batch; only the last batch of an epoch may be smaller.
+        buffer_size : int
+            Records held in the shuffle buffer; larger buffers mix records of
+            more games and shards.
+        seed : int or None
+            Seed of the shuffling, None for a random one.
+        epochs : int
+            Number of passes over all records.
+
+        Yields
+        ------
+        numpy.ndarray
+            Records of ``RECORD_DTYPE`` of one batch.
+        """
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            stream = _RecordStream([self._shards[index] for index in rng.permutation(len(self._shards))])
+            buffer = stream.read(buffer_size)
+            while len(buffer) == buffer_size:
+                incoming = stream.read(batch_size)
+                if len(incoming) < batch_size:
+                    # The stream has ended, the last records are shuffled with the buffer
+                    buffer = np.concatenate([buffer, incoming])
+                    break
+                slots = rng.choice(buffer_size, batch_size, replace=False)
+                batch = buffer[slots]
+                buffer[slots] = incoming
+                yield batch
+            order = rng.permutation(len(buffer))
+            for start in range(0, len(buffer), batch_size):
+                yield buffer[order[start:start + batch_size]]
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.selfplay --help``."""
+    parser = argparse.ArgumentParser(description="Generate Connect 4 training data by self-play of two bots.")
+    parser.add_argument("directory", help="output directory; an interrupted run is resumed")
+    parser.add_argument("--player1", choices=sorted(BOTS), default="SearchBot", help="first bot")
+    parser.add_argument("--player2", choices=sorted(BOTS), default="SearchBot", help="second bot")
+    parser.add_argument("--games", type=int, default=1000, help="total number of games")
+    parser.add_argument("--games-per-shard", type=int, default=100, help="games per shard file")
+    parser.add_argument("--random-moves", type=int, default=4, help="random opening moves per game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--max-time", type=float, default=0.05, help="time budget per move of SearchBot and MCTSBot in seconds")
+    args = parser.parse_args(argv)
+
+    def progress(report):
+        print(f"shards: {report.shards}  games: {report.games}  records: {report.records}  "
+              f"time: {report.seconds:.1f} s", flush=True)
+
+    report = generate(args.directory, bot_spec(args.player1, args.max_time), bot_spec(args.player2, args.max_time),
+                      args.games, args.workers, args.seed, args.games_per_shard, args.random_moves, progress)
+    print(f"written {report.shards} shards, kept {report.skipped} shards of an earlier run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Asyncio game server for many simultaneous games against the bots.
+
+Every TCP connection plays its own ``GameSession`` against a bot; all
+sessions run in one event loop. Bot moves are computed in worker processes,
+so a long search holds neither the event loop nor its GIL and does not stall
+the other games. Start the server with::
+
+    python -m connect4.server --port 4444
+
+Line protocol (one command or reply per line, UTF-8)::
+
+    client                         server
+    NEW <difficulty> [first|second] GAME you=<color> bot=<name>, BOT <column> if the bot starts, TURN
+    MOVE <column>                  OK <column>, BOT <column>, TURN; RESULT win|loss|draw instead of TURN at the end
+    SURRENDER                      RESULT loss
+    BOARD                          BOARD <rows from top to bottom, "." empty, "R" red, "Y" yellow, "/" between rows>
+    QUIT                           BYE
+                                   ERROR <message> for invalid commands or moves
+
+Difficulties are the ones of ``GameSetup.choose_bot_difficulty``. The bots
+live in the worker processes of a process pool, one instance per difficulty
+and color in every process; a session only keeps a ``ServerBot`` which names
+the bot. With ``--workers`` the moves of the search bot are computed by a
+``MoveService`` process pool with a hard deadline per move instead. A
+pending search is cancelled when the handler of its connection is cancelled,
+e.g. when the server shuts down. The handler only reads the next command
+after the bot has moved, so a client which disconnects while the bot is
+thinking is noticed after that move; the search still ends at its deadline.
+Lines which are not valid UTF-8 are answered with an ERROR.
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from .game_board import GameBoard
+from .movepool import MoveService
+from .players import Player, Bot, SmartBot, SearchBot, MCTSBot
+from .session import GameSession
+
+
+# Bot names and factories per difficulty. The bots are created in the worker
+# processes; the search bots get smaller caches than in the interactive game.
+BOT_NAMES = {0: "Hansi", 1: "SuperHansi", 2: "MegaHansi", 3: "LuckyHansi"}
+BOTS = {
+    0: lambda color: Bot(BOT_NAMES[0], color=color),
+    1: lambda color: SmartBot(BOT_NAMES[1], color=color),
+    2: lambda color: SearchBot(BOT_NAMES[2], max_time=0.5, table_size=1 << 16, color=color),
+    3: lambda color: MCTSBot(BOT_NAMES[3], max_playouts=None, max_time=0.5, color=color),
+}
+
+# Difficulty of the search bot, whose moves a MoveService computes if there is one
+SEARCH_DIFFICULTY = 2
+
+# Bots of a worker process per (difficulty, color), created on their first move
+_process_bots = {}
+
+
+def _play_in_process(difficulty: int, color: str, data: bytes) -> int:
+    """Return the move of a bot for a board serialized by ``GameBoard.to_bytes``, in a worker process."""
+    bot = _process_bots.get((difficulty, color))
+    if bot is None:
+        bot = BOTS[difficulty](color)
+        bot.verbose = False
+        _process_bots[difficulty, color] = bot
+    return bot.play_turn(GameBoard.from_bytes(data))
+
+
+class RemotePlayer(Player):
+    """Player whose moves are sent by a client of the server."""
+
+    def play_turn(self, board: GameBoard):
+        """Moves of remote players are applied by the server, they are never asked for."""
+        raise RuntimeError("Moves of remote players are sent by the client")
+
+
+class ServerBot(Player):
+    """Bot of a session whose moves are computed in a worker process.
+
+    Attributes
+    ----------
+    difficulty : int
+        Key of the bot in ``BOTS``.
+    """
+
+    def __init__(self, difficulty: int, color: str):
+        super().__init__(BOT_NAMES[difficulty], color)
+        self.difficulty = difficulty
+
+    def play_turn(self, board: GameBoard):
+        """Moves of server bots are computed in the worker processes, they are never asked for here."""
+        raise RuntimeError("Moves of server bots are computed in worker processes")
+
+
+class GameServer:
+    """TCP server running one game session per connection.
+
+    Attributes
+    ----------
+    sessions : int
+        Number of currently connected clients.
+    """
+
+    def __init__(self, executor: Executor | None = None, move_service: MoveService | None = None,
+                 move_deadline: float = 0.5):
+        """Create the server.
+
+        Parameters
+        ----------
+        executor : Executor or None
+            Process pool for the bot moves, by default a new
+            ``ProcessPoolExecutor`` with one process per CPU core which is
+            shut down by ``close``.
+        move_service : MoveService or None
+            Worker pool for the moves of the search bot; if None they are
+            computed in ``executor`` like the moves of the other bots.
+        move_deadline : float
+            Hard deadline per move of the search bot in seconds when
+            ``move_service`` is used.
+        """
+        self._owns_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor()
+        self._move_service = move_service
+        self._move_deadline = move_deadline
+        self.sessions = 0
+
+    def close(self):
+        """Shut down the process pool of the bot moves if the server created it."""
+        if self._owns_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 4444, backlog: int = 4096) -> asyncio.AbstractServer:
+        """Start listening and return the asyncio server (port 0 picks a free port).
+
+        The large default backlog lets thousands of clients connect at the same time.
+        """
+        return await asyncio.start_server(self.handle_client, host, port, backlog=backlog)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection until the client quits or disconnects.
+
+        A disconnect is noticed when the next command is read, i.e. after a
+        pending bot move was computed and sent.
+        """
+        self.sessions += 1
+        session = None
+
+        def send(line: str):
+            writer.write((line + "\n").encode())
+
+        try:
+            send("HELLO connect4")
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+                try:
+                    command, *arguments = data.decode().strip().split() or [""]
+                except UnicodeDecodeError:
+                    command, arguments = None, []
+                command = command.upper() if command is not None else None
+
+                if command is None:
+                    send("ERROR Commands must be UTF-8 text")
+                elif command == "QUIT":
+                    send("BYE")
+                    break
+                elif command == "NEW":
+                    session = self._new_session(arguments, send)
+                    if session is not None:
+                        if isinstance(session.current_player, RemotePlayer):
+                            send("TURN")
+                        else:
+                            await self._bot_move(session, send)
+                elif session is None or session.is_over:
+                    send("ERROR No game running, send NEW <difficulty> [first|second]")
+                elif command == "MOVE":
+                    await self._human_move(session, arguments, send)
+                elif command == "SURRENDER":
+                    session.apply_move(None)
+                    send("RESULT loss")
+                elif command == "BOARD":
+                    send("BOARD " + _board_line(session.board))
+                else:
+                    send(f"ERROR Unknown command {command}")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _new_session(self, arguments: list[str], send) -> GameSession | None:
+        """Start a game against a bot as requested by a NEW command."""
+        if not arguments or not arguments[0].isdecimal() or int(arguments[0]) not in BOTS:
+            send(f"ERROR Unknown difficulty, choose one of {sorted(BOTS)}")
+            return None
+        order = arguments[1].lower() if len(arguments) > 1 else "first"
+        if order not in ("first", "second"):
+            send("ERROR Choose first or second")
+            return None
+
+        human = RemotePlayer("client", color="red" if order == "first" else "yellow")
+        bot = ServerBot(int(arguments[0]), "yellow" if order == "first" else "red")
+        session = GameSession(human, bot) if order == "first" else GameSession(bot, human)
+        send(f"GAME you={human.color} bot={bot.name}")
+        return session
+
+    async def _human_move(self, session: GameSession, arguments: list[str], send):
+        """Apply a MOVE of the client and answer with the bot move."""
+        if not arguments or not arguments[0].lstrip("-").isdecimal():
+            send("ERROR Send MOVE <column>")
+            return
+        column = int(arguments[0])
+        result = session.apply_move(column)
+        if result is not True:
+            send("ERROR " + (result if type(result) == str else "Error, column is full!"))
+            return
+        send(f"OK {column}")
+        if session.is_over:
+            send("RESULT " + ("draw" if session.winner is None else "win"))
+            return
+        await self._bot_move(session, send)
+
+    async def _bot_move(self, session: GameSession, send):
+        """Compute the bot move in a worker process (or the move service) and apply it."""
+        loop = asyncio.get_running_loop()
+        bot = session.current_player
+        while True:
+            if self._move_service is not None and bot.difficulty == SEARCH_DIFFICULTY:
+                request = self._move_service.submit(session.board, bot.color, self._move_deadline)
+                try:
+                    column = (await asyncio.wrap_future(request.future)).column
+                except asyncio.CancelledError:
+                    request.cancel()
+                    raise
+            else:
+                column = await loop.run_in_executor(self._executor, _play_in_process, bot.difficulty, bot.color,
+                                                    session.board.to_bytes())
+            if session.apply_move(column) is True:
+                break
+        send(f"BOT {column}")
+        if session.is_over:
+            send("RESULT " + ("draw" if session.winner is None else "loss"))
+        else:
+            send("TURN")
+
+
+def _board_line(board: GameBoard) -> str:
+    """Return the board as one line, rows from top to bottom separated by "/"."""
+    symbols = {"": ".", board._COIN_RED: "R", board._COIN_YELLOW: "Y"}
+    return "/".join("".join(symbols[cell] for cell in row) for row in board._board)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 4444, executor: Executor | None = None,
+                move_service: MoveService | None = None, move_deadline: float = 0.5):
+    """Run a game server until it is cancelled, see ``GameServer`` for the parameters."""
+    game_server = GameServer(executor, move_service, move_deadline)
+    try:
+        server = await game_server.start(host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.server --help``."""
+    parser = argparse.ArgumentParser(description="Run a Connect 4 server for games against the bots.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=4444, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes with a hard deadline for the search bot (default: search in the bot process pool)")
+    parser.add_argument("--deadline", type=float, default=0.5, help="hard deadline per search bot move in seconds")
+    parser.add_argument("--shared-table", action="store_true",
+                        help="let the worker processes share one transposition table")
+    args = parser.parse_args(argv)
+    move_service = MoveService(args.workers, shared_table=args.shared_table) if args.workers > 0 else None
+    try:
+        asyncio.run(serve(args.host, args.port, move_service=move_service, move_deadline=args.deadline))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if move_service is not None:
+            move_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Game session for a single game between two players.
+
+``GameSession`` holds the board and whose turn it is and applies one move at
+a time, so the same turn logic drives the interactive game in ``main.py``,
+the headless simulation and the asyncio server, where moves of remote
+players arrive over the network.
+
+While a player is asked for a move, the waiting player may ponder, i.e.
+think on the opponent's time (see ``Player.start_pondering``); pondering
+ends with the player's next move or the end of the game.
+"""
+
+import time
+
+from .game_board import GameBoard
+from .players import Player
+
+
+class GameSession:
+    """State of one game between two players.
+
+    Attributes
+    ----------
+    board : GameBoard
+        Board the game is played on.
+    winner : Player or None
+        Winner once the game is over, None while running or for a draw.
+    surrendered : Player or None
+        Player who surrendered, if any.
+    is_over : bool
+        True once the game is won, drawn or surrendered.
+    moves : list[int]
+        Played columns in order.
+    move_times : list[float]
+        Seconds the players needed for each move in ``moves``, including
+        invalid attempts before it. Moves applied with ``apply_move`` instead
+        of ``play_turn`` count as 0.
+    """
+
+    def __init__(self, first: Player, second: Player, board: GameBoard | None = None):
+        """Start a game on an empty board.
+
+        Parameters
+        ----------
+        first : Player
+            Player who makes the first move.
+        second : Player
+            Opponent of ``first``; the players need different colors.
+        board : GameBoard or None
+            Board to play on, it is reset before the game. A new board is
+            created if None.
+        """
+        self.board = board if board is not None else GameBoard()
+        self.board.reset_board()
+        self._players = (first, second)
+        self._turn = 0
+        self.winner = None
+        self.surrendered = None
+        self.is_over = False
+        self.moves = []
+        self.move_times = []
+        self._thinking_time = 0.0
+
+    @property
+    def first_player(self) -> Player:
+        """Player: Player who made the first move."""
+        return self._players[0]
+
+    @property
+    def current_player(self) -> Player:
+        """Player: Player whose turn it is."""
+        return self._players[self._turn]
+
+    @property
+    def waiting_player(self) -> Player:
+        """Player: Opponent of the current player."""
+        return self._players[1 - self._turn]
+
+    def apply_move(self, move: int | None) -> bool | str:
+        """Apply a move of the current player.
+
+        Parameters
+        ----------
+        move : int or None
+            Column of the move or None if the current player surrenders.
+
+        Returns
+        -------
+        bool | str
+            True if the move was played (or the player surrendered), otherwise
+            the result of ``GameBoard.add_coin``: False for a full column or an
+            error message. The current player stays the same for invalid moves.
+        """
+        if self.is_over:
+            return "Error, game is over!"
+
+        player = self.current_player
+        if move is None:
+            self.surrendered = player
+            self.winner = self.waiting_player
+            self._end()
+            return True
+
+        result = self.board.add_coin(player.color, move)
+        if result is not True:
+            return result
+
+        self.moves.append(move)
+        self.move_times.append(self._thinking_time)
+        self._thinking_time = 0.0
+        if self.board.check_last_move_wins():
+            self.winner = player
+            self._end()
+        elif self.board.check_for_draw():
+            self._end()
+        else:
+            self._turn = 1 - self._turn
+        return True
+
+    def play_turn(self) -> bool | str:
+        """Ask the current player for a move and apply it, see ``apply_move``.
+
+        The waiting player may ponder while the current player is choosing.
+        """
+        self.waiting_player.start_pondering(self.board)
+        start = time.perf_counter()
+        move = self.current_player.play_turn(self.board)
+        self._thinking_time += time.perf_counter() - start
+        return self.apply_move(move)
+
+    def _end(self):
+        """Mark the game as over and stop the pondering of both players."""
+        self.is_over = True
+        for player in self._players:
+            player.stop_pondering()
+
+    def result_message(self) -> str:
+        """Return the message announcing the end of the game, or "" while it is running."""
+        if not self.is_over:
+            return ""
+        if self.surrendered is not None:
+            return f"{self.winner.name} has won the game! {self.surrendered.name} surrendered."
+        if self.winner is not None:
+            return f"{self.winner.name} has won the game!"
+        return "Game has ended with a draw."
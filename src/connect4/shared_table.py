@@ -0,0 +1,224 @@
+"""Transposition table in shared memory for search worker processes.
+
+``SharedTranspositionTable`` has the same interface as
+``engine.TranspositionTable``, but its entries live in a
+``multiprocessing.shared_memory`` block, so search processes working on the
+same game (e.g. the workers of a ``MoveService``) reuse each other's results.
+
+The table is split into buckets of ``BUCKET_SIZE`` entries; a key is stored
+in the bucket picked by the same hash as the slot of
+``engine.TranspositionTable``. An entry is two unsigned 64 bit words::
+
+    word 0 : key XOR data
+    word 1 : data = move + 1 (4 bits) | flag (2 bits) | depth (6 bits) | generation (8 bits) | value + 2**31 (32 bits)
+
+Writes take no locks: if two processes write the same entry at the same time
+and the words of both end up mixed, the key check of ``key XOR data`` fails
+and the entry is simply not found. The generation is kept in the header of
+the block, so ``new_search`` ages the entries of all processes. The probe,
+hit and store counters are plain attributes of every process instead, as
+counters written by all processes in the shared block would move one cache
+line between the cores on every lookup; a process hands its counts to
+another with ``take_counts`` and ``add_counts``, e.g. the workers of a
+``ParallelSearch`` to its parent after every search. A new entry
+replaces the key itself unless that was searched deeper, an empty entry, or
+the entry of the bucket which was searched least deep, where entries of older
+searches count as less deep than any entry of the current search.
+
+Classes
+-------
+SharedTranspositionTable
+    Transposition table in a shared memory block.
+"""
+
+from multiprocessing import resource_tracker, shared_memory
+
+from .engine import _HASH_MULTIPLIER
+
+
+# Entries per bucket; four entries of 16 bytes fill one 64 byte cache line
+BUCKET_SIZE = 4
+
+# Header words: generation; the rest of the cache line is left free so the entries start on a new line
+_HEADER_WORDS = 8
+_GENERATION = 0
+_VALUE_OFFSET = 1 << 31
+
+
+class SharedTranspositionTable:
+    """Transposition table in a shared memory block.
+
+    The process creating the table owns the block and has to call ``unlink``
+    when the table is no longer needed; other processes attach to it by name,
+    which also happens when the table is pickled, e.g. as an argument of a
+    process pool initializer. Statistics are counted per process.
+
+    Attributes
+    ----------
+    size : int
+        Number of entries of the table.
+    name : str
+        Name of the shared memory block.
+    probes : int
+        Number of lookups of this process and of the counts added to it.
+    hits : int
+        Number of lookups which found the position.
+    stores : int
+        Number of stored results.
+    """
+
+    def __init__(self, size: int = 1 << 20, name: str | None = None):
+        """Create a table or attach to an existing one.
+
+        Parameters
+        ----------
+        size : int
+            Number of entries, rounded up to whole buckets. Ignored when
+            attaching.
+        name : str or None
+            Name of an existing table to attach to, None to create a new one.
+        """
+        if name is None:
+            buckets = max(1, -(-size // BUCKET_SIZE))
+            self._memory = shared_memory.SharedMemory(create=True, size=8 * (_HEADER_WORDS + 2 * BUCKET_SIZE * buckets))
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            # Only the owner removes the block; without this the resource tracker would remove it when an attached
+            # process exits
+            resource_tracker.unregister(self._memory._name, "shared_memory")
+            self._owner = False
+        self.name = self._memory.name
+        self._words = self._memory.buf.cast("Q")
+        self._buckets = (len(self._words) - _HEADER_WORDS) // (2 * BUCKET_SIZE)
+        self.size = self._buckets * BUCKET_SIZE
+        self.probes = self.hits = self.stores = 0
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (self.size, self.name)
+
+    @property
+    def memory_bytes(self) -> int:
+        """int: Size of the shared memory block in bytes."""
+        return self._memory.size
+
+    def take_counts(self) -> tuple[int, int, int]:
+        """Return the probes, hits and stores counted so far and reset the counters."""
+        counts = (self.probes, self.hits, self.stores)
+        self.probes = self.hits = self.stores = 0
+        return counts
+
+    def add_counts(self, counts: tuple[int, int, int]):
+        """Add probes, hits and stores returned by ``take_counts`` of another process."""
+        probes, hits, stores = counts
+        self.probes += probes
+        self.hits += hits
+        self.stores += stores
+
+    def new_search(self):
+        """Mark all stored entries as belonging to an older search."""
+        self._words[_GENERATION] = (self._words[_GENERATION] + 1) & 0xFF
+
+    def clear(self):
+        """Remove all entries."""
+        words = self._words
+        for index in range(_HEADER_WORDS, len(words)):
+            words[index] = 0
+
+    def get(self, key: int):
+        """Look up a position, see ``TranspositionTable.get``.
+
+        Returns
+        -------
+        tuple or None
+            ``(depth, flag, value, move)`` of the stored entry or None if the
+            position is not in the table.
+        """
+        self.probes += 1
+        words = self._words
+        start = _HEADER_WORDS + 2 * BUCKET_SIZE * ((key * _HASH_MULTIPLIER >> 32) % self._buckets)
+        for index in range(start, start + 2 * BUCKET_SIZE, 2):
+            data = words[index + 1]
+            if data and words[index] ^ data == key:
+                self.hits += 1
+                return (data >> 6 & 0x3F, data >> 4 & 0x3, (data >> 20) - _VALUE_OFFSET, (data & 0xF) - 1)
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move: int):
+        """Store the result of a search, see ``TranspositionTable.store``."""
+        self.stores += 1
+        words = self._words
+        generation = words[_GENERATION]
+        start = _HEADER_WORDS + 2 * BUCKET_SIZE * ((key * _HASH_MULTIPLIER >> 32) % self._buckets)
+        victim = start
+        victim_rank = None
+        for index in range(start, start + 2 * BUCKET_SIZE, 2):
+            data = words[index + 1]
+            if not data:
+                victim = index
+                break
+            if words[index] ^ data == key:
+                if data >> 6 & 0x3F > depth:
+                    return
+                victim = index
+                break
+            # Entries of older searches are replaced first, then the least deep ones
+            rank = (data >> 12 & 0xFF == generation, data >> 6 & 0x3F)
+            if victim_rank is None or rank < victim_rank:
+                victim = index
+                victim_rank = rank
+        data = (move + 1) | flag << 4 | depth << 6 | generation << 12 | (value + _VALUE_OFFSET) << 20
+        words[victim] = key ^ data
+        words[victim + 1] = data
+
+    def stats(self) -> dict:
+        """Return the statistics and the fill level of the table.
+
+        The entries are counted on a NumPy view of the block if NumPy is
+        installed, otherwise in a loop over all entries.
+
+        Returns
+        -------
+        dict
+            ``probes``, ``hits``, ``hit_rate`` and ``stores`` of this process
+            including the added counts, ``used`` entries and ``fill`` ratio of
+            the table, ``current`` entries stored in the current search and
+            ``memory_bytes``.
+        """
+        generation = self._words[_GENERATION]
+        try:
+            import numpy as np
+        except ImportError:
+            used = current = 0
+            for data in self._words[_HEADER_WORDS + 1::2]:
+                if data:
+                    used += 1
+                    current += data >> 12 & 0xFF == generation
+        else:
+            data = np.frombuffer(self._words, dtype=np.uint64)[_HEADER_WORDS + 1::2]
+            used = int(np.count_nonzero(data))
+            current = int(np.count_nonzero((data != 0) & ((data >> np.uint64(12)) & np.uint64(0xFF) == generation)))
+            # The view exports the block, which could not be closed while it is alive
+            del data
+        probes, hits = self.probes, self.hits
+        return {
+            "probes": probes,
+            "hits": hits,
+            "hit_rate": hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "used": used,
+            "current": current,
+            "fill": used / self.size,
+            "memory_bytes": self.memory_bytes,
+        }
+
+    def close(self):
+        """Detach from the shared memory block."""
+        self._words.release()
+        self._memory.close()
+
+    def unlink(self):
+        """Remove the shared memory block; only the process which created the table may call this."""
+        if not self._owner:
+            raise RuntimeError("Only the process which created the table can unlink it")
+        self._memory.unlink()
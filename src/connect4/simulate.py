@@ -0,0 +1,289 @@
+"""Headless bot-vs-bot game simulation.
+
+This module plays many games between two computer players without any
+terminal interaction and spreads them over all CPU cores with a
+``ProcessPoolExecutor``. It is meant for evaluating bot changes, e.g.::
+
+    python -m connect4.simulate --player1 SearchBot --player2 SmartBot --games 1000
+
+Players are passed as a class (or a ``(class, kwargs)`` tuple) instead of an
+instance, so that every worker process can create its own players. Human
+players cannot be simulated.
+
+Functions
+---------
+play_game
+    Play one game between two player instances without printing.
+simulate
+    Play many games in parallel and return a ``SimulationReport``.
+bot_spec
+    Player spec of a bot selectable on the command line.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from .game_board import GameBoard
+from .session import GameSession
+from . import players as players_module
+
+
+@dataclass
+class GameResult:
+    """Outcome of a single game.
+
+    Attributes
+    ----------
+    winner : str or None
+        Color of the winner, None for a draw.
+    moves : list[int]
+        Played columns in order.
+    move_times : dict[str, list[float]]
+        Seconds each color needed per move.
+    """
+
+    winner: str | None
+    moves: list[int]
+    move_times: dict[str, list[float]]
+
+
+@dataclass
+class SimulationReport:
+    """Aggregated results of a simulation, counted from the view of player 1.
+
+    Attributes
+    ----------
+    games : int
+        Number of played games.
+    wins : int
+        Games won by player 1.
+    draws : int
+        Games ended with a draw.
+    losses : int
+        Games won by player 2.
+    seconds : float
+        Wall-clock time of the whole simulation.
+    move_times : dict[str, list[float]]
+        Seconds per move of "player1" and "player2".
+    """
+
+    games: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    seconds: float = 0.0
+    move_times: dict[str, list[float]] = field(default_factory=lambda: {"player1": [], "player2": []})
+
+    @property
+    def games_per_second(self) -> float:
+        """float: Played games per wall-clock second."""
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def latency(self, player: str) -> dict[str, float]:
+        """Return move latency statistics of one player.
+
+        Parameters
+        ----------
+        player : str
+            "player1" or "player2".
+
+        Returns
+        -------
+        dict[str, float]
+            Mean, median, 95th percentile and maximum move time in milliseconds.
+        """
+        times = sorted(self.move_times[player])
+        if not times:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "mean": 1000 * sum(times) / len(times),
+            "p50": 1000 * times[len(times) // 2],
+            "p95": 1000 * times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max": 1000 * times[-1],
+        }
+
+    def merge(self, other: "SimulationReport"):
+        """Add the counts and move times of another report to this one."""
+        self.games += other.games
+        self.wins += other.wins
+        self.draws += other.draws
+        self.losses += other.losses
+        for player, times in other.move_times.items():
+            self.move_times[player].extend(times)
+
+    def summary(self) -> str:
+        """Return a readable multi-line summary of the report."""
+        lines = [
+            f"games: {self.games}  wins: {self.wins}  draws: {self.draws}  losses: {self.losses}",
+            f"time: {self.seconds:.2f} s  games per second: {self.games_per_second:.1f}",
+        ]
+        for player in ("player1", "player2"):
+            stats = self.latency(player)
+            lines.append(f"{player} move latency [ms]: mean {stats['mean']:.3f}  p50 {stats['p50']:.3f}"
+                         f"  p95 {stats['p95']:.3f}  max {stats['max']:.3f}")
+        return "\n".join(lines)
+
+
+def play_game(first: players_module.Player, second: players_module.Player, board: GameBoard | None = None) -> GameResult:
+    """Play one game between two players without printing the board.
+
+    The players need different colors. Invalid moves (full or invalid columns)
+    are asked again like in the interactive game; a player who surrenders by
+    returning None loses.
+
+    Parameters
+    ----------
+    first : Player
+        Player who makes the first move.
+    second : Player
+        Opponent of ``first``.
+    board : GameBoard or None
+        Empty board to play on; a new board is created if None.
+
+    Returns
+    -------
+    GameResult
+        Winner, moves and move times of the game.
+    """
+    session = GameSession(first, second, board)
+    result = GameResult(None, session.moves, {first.color: [], second.color: []})
+    while not session.is_over:
+        player = session.current_player
+        start = time.perf_counter()
+        move = player.play_turn(session.board)
+        result.move_times[player.color].append(time.perf_counter() - start)
+        session.apply_move(move)
+    if session.winner is not None:
+        result.winner = session.winner.color
+    return result
+
+
+def _create_player(spec, name: str, color: str) -> players_module.Player:
+    """Create a silent player from a class or a ``(class, kwargs)`` tuple."""
+    if isinstance(spec, tuple):
+        player_class, kwargs = spec
+    else:
+        player_class, kwargs = spec, {}
+    player = player_class(name, color=color, **kwargs)
+    player.verbose = False
+    return player
+
+
+def _play_chunk(player1_spec, player2_spec, first_game: int, games: int, seed: int) -> SimulationReport:
+    """Play a chunk of games in a worker process.
+
+    Player 1 plays red in even games and yellow in odd games (counted over the
+    whole simulation); red always starts, so both players start equally often.
+    """
+    random.seed(seed)
+    player1_red = (_create_player(player1_spec, "player1", "red"), _create_player(player2_spec, "player2", "yellow"))
+    player1_yellow = (_create_player(player1_spec, "player1", "yellow"), _create_player(player2_spec, "player2", "red"))
+    report = SimulationReport()
+    board = GameBoard()
+    for game in range(first_game, first_game + games):
+        player1, player2 = player1_red if game % 2 == 0 else player1_yellow
+        first, second = (player1, player2) if player1.color == "red" else (player2, player1)
+        board.reset_board()
+        result = play_game(first, second, board)
+        report.games += 1
+        if result.winner is None:
+            report.draws += 1
+        elif result.winner == player1.color:
+            report.wins += 1
+        else:
+            report.losses += 1
+        report.move_times["player1"].extend(result.move_times[player1.color])
+        report.move_times["player2"].extend(result.move_times[player2.color])
+    return report
+
+
+def simulate(player1, player2, games: int, workers: int | None = None, seed: int = 0,
+             chunk_size: int | None = None) -> SimulationReport:
+    """Play many games between two player types on a process pool.
+
+    The games are split into chunks; every chunk seeds the ``random`` module
+    of its worker with ``seed + chunk index``, so that a simulation with the
+    same seed and chunk size is reproducible regardless of the worker count.
+
+    Parameters
+    ----------
+    player1 : type[Player] or tuple[type[Player], dict]
+        Player class (or class and keyword arguments) the results are counted for.
+    player2 : type[Player] or tuple[type[Player], dict]
+        Opponent class (or class and keyword arguments).
+    games : int
+        Number of games to play.
+    workers : int or None
+        Number of worker processes, defaults to the number of CPU cores.
+        With 1 worker the games are played in the calling process.
+    seed : int
+        Base seed for the random number generators of the workers.
+    chunk_size : int or None
+        Games per chunk, by default the games are split into four chunks per worker.
+
+    Returns
+    -------
+    SimulationReport
+        Win/draw/loss counts, games per second and move latencies.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-games // (4 * workers)))
+    chunks = [(start, min(chunk_size, games - start)) for start in range(0, games, chunk_size)]
+
+    report = SimulationReport()
+    start_time = time.perf_counter()
+    if workers == 1:
+        for index, (first_game, count) in enumerate(chunks):
+            report.merge(_play_chunk(player1, player2, first_game, count, seed + index))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_play_chunk, player1, player2, first_game, count, seed + index)
+                       for index, (first_game, count) in enumerate(chunks)]
+            for future in futures:
+                report.merge(future.result())
+    report.seconds = time.perf_counter() - start_time
+    return report
+
+
+# Bots which can be selected on the command line
+BOTS = {
+    "Bot": players_module.Bot,
+    "SmartBot": players_module.SmartBot,
+    "SearchBot": players_module.SearchBot,
+    "MCTSBot": players_module.MCTSBot,
+}
+
+
+def bot_spec(name: str, max_time: float):
+    """Return the player spec of a bot in ``BOTS``; searching bots get a time budget per move in seconds."""
+    if name == "SearchBot":
+        return BOTS[name], {"max_time": max_time}
+    if name == "MCTSBot":
+        return BOTS[name], {"max_playouts": None, "max_time": max_time}
+    return BOTS[name]
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.simulate --help``."""
+    parser = argparse.ArgumentParser(description="Play Connect 4 games between two bots without terminal interaction.")
+    parser.add_argument("--player1", choices=sorted(BOTS), default="SmartBot", help="bot the results are counted for")
+    parser.add_argument("--player2", choices=sorted(BOTS), default="Bot", help="opponent bot")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--max-time", type=float, default=0.1, help="time budget per move of SearchBot and MCTSBot in seconds")
+    args = parser.parse_args(argv)
+
+    report = simulate(bot_spec(args.player1, args.max_time), bot_spec(args.player2, args.max_time), args.games,
+                      args.workers, args.seed)
+    print(f"{args.player1} vs {args.player2}")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Snapshot files with many board positions.
+
+Analysis jobs and worker processes exchange positions in bulk, so boards are
+written in the compact form of ``GameBoard.to_bytes`` plus the color which
+started the game: a short header followed by fixed-size records::
+
+    header  : magic b"C4PS", version (uint16), record size (uint16)
+    record  : red bitboard (uint64), yellow bitboard (uint64),
+              starter (uint8, 0 red, 1 yellow)                   little endian, 17 bytes
+
+The number of records follows from the file size, so positions can be
+appended to an existing file. ``SnapshotFile`` maps a file into memory and
+reads records without copying the file: single boards, a stream of
+bitboard pairs or, with NumPy installed, a structured array viewing the
+mapped file. Streams read one record at a time, so they do not keep the
+mapping exported and the file can be closed while an iterator is alive.
+
+Write and read a snapshot with::
+
+    write_snapshot("positions.c4ps", boards)
+    with SnapshotFile("positions.c4ps") as snapshot:
+        for red, yellow in snapshot.iter_bitboards():
+            ...
+
+Classes
+-------
+SnapshotFile
+    Memory-mapped read access to a snapshot file.
+
+Functions
+---------
+write_snapshot
+    Write or append boards to a snapshot file.
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+
+from . import bitboard
+from .game_board import GameBoard, _SNAPSHOT
+
+
+_HEADER = struct.Struct("<4sHH")
+_RECORD = struct.Struct("<QQB")
+_MAGIC = b"C4PS"
+_VERSION = 2
+_STARTERS = ("red", "yellow")
+
+
+def write_snapshot(path: str, boards: Iterable[GameBoard], append: bool = False) -> int:
+    """Write boards to a snapshot file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the snapshot file.
+    boards : iterable of GameBoard
+        Standard boards to write; only their coins and the color which
+        started are stored, see ``GameBoard.to_bytes``.
+    append : bool
+        Append to an existing snapshot file instead of replacing it. A new
+        file is created if it does not exist.
+
+    Returns
+    -------
+    int
+        Number of boards written.
+
+    Raises
+    ------
+    ValueError
+        If ``append`` is set and the existing file is not a snapshot file, or
+        if a board does not have the standard size.
+    """
+    if append and os.path.exists(path):
+        with open(path, "rb") as file:
+            _check_header(file.read(_HEADER.size), path)
+        mode = "ab"
+    else:
+        mode = "wb"
+
+    count = 0
+    with open(path, mode) as file:
+        if mode == "wb":
+            file.write(_HEADER.pack(_MAGIC, _VERSION, _RECORD.size))
+        for board in boards:
+            if board.geometry is not bitboard.STANDARD:
+                raise ValueError("Snapshot files only store boards of the standard size")
+            file.write(board.to_bytes() + bytes((_STARTERS.index(board.first_color()),)))
+            count += 1
+    return count
+
+
+def _check_header(header: bytes, path: str):
+    """Raise a ValueError if a header is not the one of a snapshot file of the supported version."""
+    if len(header) < _HEADER.size or _HEADER.unpack_from(header) != (_MAGIC, _VERSION, _RECORD.size):
+        raise ValueError(f"{path} is not a snapshot file of version {_VERSION}")
+
+
+class SnapshotFile:
+    """Memory-mapped snapshot file.
+
+    Records are read directly from the mapped file. Arrays returned by
+    ``to_numpy`` view the mapping, so they have to be released before the
+    file is closed; boards, bitboards and iterators do not.
+    """
+
+    def __init__(self, path: str):
+        """Open a snapshot file.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a snapshot file of a supported version or ends
+            with an incomplete record.
+        """
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            _check_header(file.read(_HEADER.size), path)
+            if (size - _HEADER.size) % _RECORD.size:
+                raise ValueError(f"{path} ends with an incomplete record")
+            self._count = (size - _HEADER.size) // _RECORD.size
+            # An empty file region cannot be mapped, the header alone is treated as an empty snapshot
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self._count else None
+        self._records = memoryview(self._data)[_HEADER.size:] if self._count else memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of positions in the file."""
+        return self._count
+
+    def __getitem__(self, index: int) -> GameBoard:
+        """Return the position with the given index as a new board."""
+        red, yellow, starter = _RECORD.unpack_from(self._records, self._offset(index))
+        return GameBoard.from_bytes(_SNAPSHOT.pack(red, yellow), first=_STARTERS[starter])
+
+    def bitboards(self, index: int) -> tuple[int, int]:
+        """Return the red and the yellow bitboard of the position with the given index."""
+        return _RECORD.unpack_from(self._records, self._offset(index))[:2]
+
+    def iter_bitboards(self) -> Iterator[tuple[int, int]]:
+        """Yield the red and the yellow bitboard of every position in file order."""
+        # unpack_from() only holds the buffer during the call, unlike iter_unpack() which exports it until exhausted
+        for offset in range(0, self._count * _RECORD.size, _RECORD.size):
+            yield _RECORD.unpack_from(self._records, offset)[:2]
+
+    def to_numpy(self):
+        """Return all positions as a NumPy structured array viewing the mapped file.
+
+        Returns
+        -------
+        numpy.ndarray
+            Read-only array of shape ``(len(self),)`` with the uint64 fields
+            ``red`` and ``yellow`` and the uint8 field ``first`` (0 red, 1
+            yellow).
+
+        Raises
+        ------
+        ImportError
+            If NumPy is not installed, see ``pip install connect4[numpy]``.
+        """
+        import numpy as np
+
+        dtype = np.dtype([("red", "<u8"), ("yellow", "<u8"), ("first", "u1")])
+        return np.frombuffer(self._records, dtype=dtype)
+
+    def close(self):
+        """Release the memory map."""
+        self._records.release()
+        if self._data is not None:
+            self._data.close()
+
+    def _offset(self, index: int) -> int:
+        """Return the byte offset of a record, negative indices count from the end."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return index * _RECORD.size
@@ -0,0 +1,522 @@
+"""Perfect-play solver for the standard board.
+
+``Solver`` computes the exact game-theoretic value of a position: whether the
+player to move wins, loses or draws with perfect play of both sides and how
+many plies the game lasts. Scores follow the usual convention of Connect 4
+solvers::
+
+    score > 0 : the player to move wins with the score-th last coin of theirs
+                (a win with the next move on an empty board scores 21),
+    score = 0 : draw,
+    score < 0 : the opponent wins, the faster the lower.
+
+The search is a negamax with alpha-beta pruning which is called with null
+windows (``beta = alpha + 1``) until the bounds of the score meet. Moves
+which let the opponent win at once are never searched, the remaining moves
+are tried by the number of threats they create. Bounds are cached in a large
+transposition table under the mirror-canonical key of ``bitboard``, so both
+mirror images of a position share their results.
+
+Positions with few empty cells are looked up in an endgame table if one is
+installed next to this module. The file is opened and memory-mapped by the
+first call of ``Solver.solve`` and holds exact scores sorted by canonical
+key::
+
+    header  : magic b"C4EG", version (uint16), maximum empty cells (uint16), record count (uint32)
+    record  : key (uint64), score (int8)                           little endian, 9 bytes
+
+Enumerating all positions with a few empty cells is far too large, so the
+table is built from the positions of played games, see ``build_endgame_table``.
+Solve a position or build the table with::
+
+    python -m connect4.solver 3323
+    python -m connect4.solver --build game_records.bin --empty 12
+
+Classes
+-------
+Solution
+    Value, distance and best move of a solved position.
+EndgameTable
+    Memory-mapped read access to an endgame table file.
+Solver
+    Null-window negamax solver with a transposition table.
+
+Functions
+---------
+solve
+    Solve the position of a GameBoard.
+build_endgame_table
+    Solve the endgame positions of a game log and write an endgame table.
+load_default_endgame_table
+    Open the endgame table installed next to this module, if there is one.
+"""
+
+import argparse
+import functools
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+
+from . import bitboard
+from .engine import LOWER, UPPER, TranspositionTable
+from .game_board import GameBoard
+
+
+_HEADER = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<Qb")
+_KEY = struct.Struct("<Q")
+_MAGIC = b"C4EG"
+_VERSION = 1
+
+# Endgame table which the solver uses if it exists
+DEFAULT_ENDGAME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame_table.bin")
+
+# Highest and lowest possible score
+MAX_SCORE = (bitboard.CELL_COUNT + 1) // 2
+MIN_SCORE = -(bitboard.CELL_COUNT // 2)
+
+
+@dataclass
+class Solution:
+    """Exact value of a position.
+
+    Attributes
+    ----------
+    score : int
+        Score for the player to move, see the module description.
+    result : str
+        "win", "loss" or "draw" for the player to move.
+    distance : int
+        Number of plies until the game ends with perfect play, including the
+        winning move; the winner plays as fast and the loser as slow as
+        possible.
+    column : int
+        Best column for the player to move, -1 if none was asked for.
+    """
+
+    score: int
+    result: str
+    distance: int
+    column: int = -1
+
+    @classmethod
+    def from_score(cls, score: int, moves: int, column: int = -1) -> "Solution":
+        """Create the solution of a position with ``moves`` coins from its score."""
+        if score == 0:
+            return cls(0, "draw", bitboard.CELL_COUNT - moves, column)
+        # The winner's coin count before the winning move has the parity of the winner's moves
+        winner_parity = moves % 2 if score > 0 else (moves + 1) % 2
+        last = bitboard.CELL_COUNT + 1 - 2 * abs(score)
+        if last % 2 != winner_parity:
+            last -= 1
+        return cls(score, "win" if score > 0 else "loss", last - moves + 1, column)
+
+
+def _non_losing_moves(position: int, mask: int) -> int:
+    """Return the bottom cells of all playable columns which do not let the opponent win at once.
+
+    The cells below a threat of the opponent must not be played; if the
+    opponent has a playable threat it has to be blocked, and with two such
+    threats no move is left.
+    """
+    possible = (mask + bitboard.BOTTOM_MASK) & bitboard.BOARD_MASK
+    opponent_wins = bitboard.winning_cells(position ^ mask, mask)
+    forced = possible & opponent_wins
+    if forced:
+        if forced & (forced - 1):
+            return 0
+        possible = forced
+    return possible & ~(opponent_wins >> 1)
+
+
+class EndgameTable:
+    """Memory-mapped endgame table file.
+
+    Attributes
+    ----------
+    max_empty : int
+        Positions with at most this many empty cells may be in the table.
+    """
+
+    def __init__(self, path: str):
+        """Open an endgame table file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not an endgame table of a supported version.
+        """
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not an endgame table")
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_empty, self._count = _HEADER.unpack_from(self._data, 0)
+        if magic != _MAGIC or version != _VERSION or size != _HEADER.size + self._count * _RECORD.size:
+            self._data.close()
+            raise ValueError(f"{path} is not an endgame table of version {_VERSION}")
+
+    def __len__(self) -> int:
+        """Return the number of positions in the table."""
+        return self._count
+
+    def close(self):
+        """Release the memory map."""
+        self._data.close()
+
+    def lookup(self, key: int) -> int | None:
+        """Return the score of a position by its canonical key, or None if it is not in the table."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = _HEADER.size + middle * _RECORD.size
+            found = _KEY.unpack_from(self._data, offset)[0]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return _RECORD.unpack_from(self._data, offset)[1]
+        return None
+
+
+def load_default_endgame_table() -> EndgameTable | None:
+    """Return the table at ``DEFAULT_ENDGAME_PATH`` or None if it was not built."""
+    if not os.path.exists(DEFAULT_ENDGAME_PATH):
+        return None
+    return EndgameTable(DEFAULT_ENDGAME_PATH)
+
+
+class Solver:
+    """Perfect-play solver for positions of the standard board.
+
+    The transposition table is kept between calls, so solving the positions
+    of one game one after the other gets faster towards the end.
+
+    Attributes
+    ----------
+    nodes : int
+        Number of searched positions since the solver was created.
+    """
+
+    def __init__(self, table_size: int = 1 << 23, endgame: EndgameTable | str | None = DEFAULT_ENDGAME_PATH):
+        """Create a solver.
+
+        Parameters
+        ----------
+        table_size : int
+            Number of slots of the transposition table.
+        endgame : EndgameTable, str or None
+            Endgame table or the path of one, which is opened by the first
+            call of ``solve``; a missing file is ignored. None to solve
+            without a table.
+        """
+        self.table = TranspositionTable(table_size)
+        self.nodes = 0
+        self._endgame = endgame
+        self._endgame_empty = -1
+
+    def solve(self, position: int, mask: int) -> int:
+        """Return the score of a position.
+
+        Parameters
+        ----------
+        position : int
+            Bitboard of the player to move.
+        mask : int
+            Bitboard of all coins on the board; the game must not be over.
+
+        Returns
+        -------
+        int
+            Score for the player to move, see the module description.
+        """
+        self._open_endgame()
+        moves = bitboard.popcount(mask)
+        if bitboard.winning_cells(position, mask) & (mask + bitboard.BOTTOM_MASK):
+            return (bitboard.CELL_COUNT + 1 - moves) // 2
+        low = -((bitboard.CELL_COUNT - moves) // 2)
+        high = (bitboard.CELL_COUNT + 1 - moves) // 2
+        while low < high:
+            # Null-window probes near 0 first, as most scores are small
+            middle = low + (high - low) // 2
+            if middle <= 0 and low // 2 < middle:
+                middle = low // 2
+            elif middle >= 0 and high // 2 > middle:
+                middle = high // 2
+            score = self._negamax(position, mask, moves, middle, middle + 1)
+            if score <= middle:
+                high = score
+            else:
+                low = score
+        return low
+
+    def analyze(self, position: int, mask: int) -> dict[int, int]:
+        """Return the score of every playable column for the player to move.
+
+        Returns
+        -------
+        dict[int, int]
+            Score of the position for the player to move after playing the
+            column, i.e. the negated score of the opponent.
+        """
+        moves = bitboard.popcount(mask)
+        scores = {}
+        for column in range(bitboard.COLUMN_COUNT):
+            if not bitboard.can_play(mask, column):
+                continue
+            if bitboard.is_winning_move(position, mask, column):
+                scores[column] = (bitboard.CELL_COUNT + 1 - moves) // 2
+            elif moves + 1 == bitboard.CELL_COUNT:
+                scores[column] = 0
+            else:
+                scores[column] = -self.solve(*bitboard.play(position, mask, column))
+        return scores
+
+    def best_move(self, position: int, mask: int) -> Solution:
+        """Solve a position and find a column which keeps its score.
+
+        Only one null-window search per column is needed once the score is
+        known; columns are tried from the centre to the edges.
+
+        Returns
+        -------
+        Solution
+            Score, result, distance and best column of the position.
+        """
+        moves = bitboard.popcount(mask)
+        score = self.solve(position, mask)
+        legal = [column for column in bitboard.CENTRE_ORDER if bitboard.can_play(mask, column)]
+        # If every column lets the opponent win at once, any of them is as good as the others
+        possible = _non_losing_moves(position, mask)
+        best = legal[0]
+        for column in legal:
+            if bitboard.is_winning_move(position, mask, column) or moves + 1 == bitboard.CELL_COUNT:
+                best = column
+                break
+            if not possible & bitboard.column_mask(column):
+                continue
+            # The column keeps the score if the opponent cannot get more than -score after it
+            child_position, child_mask = bitboard.play(position, mask, column)
+            if -self._negamax(child_position, child_mask, moves + 1, -score, -score + 1) >= score:
+                best = column
+                break
+        return Solution.from_score(score, moves, best)
+
+    def _open_endgame(self):
+        """Open the endgame table if only its path is known yet; called at the start of every ``solve``."""
+        if isinstance(self._endgame, str):
+            path = self._endgame
+            self._endgame = EndgameTable(path) if os.path.exists(path) else None
+        if self._endgame is not None:
+            self._endgame_empty = self._endgame.max_empty
+
+    def _negamax(self, position: int, mask: int, moves: int, alpha: int, beta: int) -> int:
+        """Return the score of a position within the window (alpha, beta).
+
+        The player to move must not be able to win at once. Scores outside the
+        window are bounds: at most alpha if the result is at most alpha, at
+        least beta if it is at least beta.
+        """
+        self.nodes += 1
+        possible = _non_losing_moves(position, mask)
+        if possible == 0:
+            return -((bitboard.CELL_COUNT - moves) // 2)
+        if moves >= bitboard.CELL_COUNT - 2:
+            return 0
+
+        # The opponent cannot win with the next move, the player not with the move after it
+        lowest = -((bitboard.CELL_COUNT - 2 - moves) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+        highest = (bitboard.CELL_COUNT - 1 - moves) // 2
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        key, _ = bitboard.canonical_key(position, mask)
+        entry = self.table.get(key)
+        if entry is not None:
+            value = entry[2]
+            if entry[1] == UPPER:
+                if value < beta:
+                    beta = value
+                    if alpha >= beta:
+                        return beta
+            elif value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    return alpha
+        elif bitboard.CELL_COUNT - moves <= self._endgame_empty:
+            value = self._endgame.lookup(key)
+            if value is not None:
+                return value
+
+        # Moves creating the most threats first, centre first for equal counts
+        candidates = []
+        for column in bitboard.CENTRE_ORDER:
+            move = possible & bitboard.column_mask(column)
+            if move:
+                threats = bitboard.popcount(bitboard.winning_cells(position | move, mask))
+                candidates.append((-threats, len(candidates), move))
+        candidates.sort()
+
+        for _, _, move in candidates:
+            score = -self._negamax(position ^ mask, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self.table.store(key, 0, LOWER, score, -1)
+                return score
+            if score > alpha:
+                alpha = score
+        self.table.store(key, 0, UPPER, alpha, -1)
+        return alpha
+
+
+def solve(board: GameBoard, table_size: int = 1 << 23) -> Solution:
+    """Solve the position of a board for the color to move.
+
+    Parameters
+    ----------
+    board : GameBoard
+        Board of the standard size on which the game is not over.
+    table_size : int
+        Number of slots of the transposition table. The solver is kept
+        for the next call with the same size, which reuses its table.
+
+    Returns
+    -------
+    Solution
+        Score, result, distance and best column for ``board.color_to_move()``.
+
+    Raises
+    ------
+    ValueError
+        If the board does not have the standard size or the game is over.
+    """
+    position, mask = _board_position(board)
+    return _solver(table_size).best_move(position, mask)
+
+
+@functools.lru_cache(maxsize=1)
+def _solver(table_size: int) -> Solver:
+    """Return the solver of solve(); only the one of the last table size is kept, as a table is large."""
+    return Solver(table_size)
+
+
+def _board_position(board: GameBoard) -> tuple[int, int]:
+    """Return position and mask of a board for the color to move, checking that it can be solved."""
+    if board.geometry is not bitboard.STANDARD:
+        raise ValueError("The solver only supports boards of the standard size")
+    red, yellow = board.get_bitboard("red"), board.get_bitboard("yellow")
+    if bitboard.has_four(red) or bitboard.has_four(yellow) or red | yellow == bitboard.BOARD_MASK:
+        raise ValueError("The game is over")
+    return (red if board.color_to_move() == "red" else yellow), red | yellow
+
+
+def build_endgame_table(path: str, log_path: str, max_empty: int = 12, table_size: int = 1 << 23,
+                        progress=None) -> int:
+    """Solve the endgame positions of the games in a log and write an endgame table.
+
+    Every position of a logged game with at most ``max_empty`` empty cells is
+    solved, together with all positions one move away from it. Games played
+on boards of another size are skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path of the table file to write.
+    log_path : str
+        Game log to take the positions from, see ``connect4.records``.
+    max_empty : int
+        Maximum number of empty cells of the positions in the table.
+    table_size : int
+        Number of slots of the transposition table of the solver.
+    progress : callable or None
+        Called with the number of solved positions after every game.
+
+    Returns
+    -------
+    int
+        Number of positions written.
+    """
+    from .records import read_records
+
+    solver = Solver(table_size, endgame=None)
+    scores = {}
+
+    def add(position, mask):
+        key, _ = bitboard.canonical_key(position, mask)
+        if key not in scores:
+            scores[key] = solver.solve(position, mask)
+
+    for record in read_records(log_path):
+        if record.geometry is not bitboard.STANDARD:
+            continue
+        position = mask = 0
+        for column in record.moves:
+            if not bitboard.can_play(mask, column) or bitboard.is_winning_move(position, mask, column):
+                break
+            position, mask = bitboard.play(position, mask, column)
+            if mask == bitboard.BOARD_MASK or bitboard.CELL_COUNT - bitboard.popcount(mask) > max_empty:
+                continue
+            add(position, mask)
+            for reply in range(bitboard.COLUMN_COUNT):
+                if bitboard.can_play(mask, reply) and not bitboard.is_winning_move(position, mask, reply):
+                    child = bitboard.play(position, mask, reply)
+                    if child[1] != bitboard.BOARD_MASK:
+                        add(*child)
+        if progress is not None:
+            progress(len(scores))
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, max_empty, len(scores)))
+        for key in sorted(scores):
+            file.write(_RECORD.pack(key, scores[key]))
+    return len(scores)
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point, see ``python -m connect4.solver --help``."""
+    parser = argparse.ArgumentParser(description="Solve Connect 4 positions with perfect play.")
+    parser.add_argument("moves", nargs="?", default="",
+                        help="played columns (0-6) from the start of the game, e.g. 3323")
+    parser.add_argument("--analyze", action="store_true", help="show the score of every column")
+    parser.add_argument("--build", metavar="LOG", help="build an endgame table from the games of a game log")
+    parser.add_argument("--empty", type=int, default=12, help="maximum empty cells of the endgame table positions")
+    parser.add_argument("--output", default=DEFAULT_ENDGAME_PATH, help="endgame table file to write")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        def progress(count):
+            print(f"\r{count} positions", end="", flush=True)
+
+        count = build_endgame_table(args.output, args.build, args.empty, progress=progress)
+        print(f"\n{count} positions written to {args.output}")
+        return
+
+    board = GameBoard()
+    for column in args.moves:
+        if not column.isdigit() or int(column) >= bitboard.COLUMN_COUNT or board.play(int(column)) is not True:
+            parser.error(f"invalid move {column} in {args.moves}")
+    try:
+        position, mask = _board_position(board)
+    except ValueError as error:
+        parser.error(str(error))
+    solver = Solver()
+    solution = solver.best_move(position, mask)
+    print(f"score    {solution.score}")
+    plies = "ply" if solution.distance == 1 else "plies"
+    print(f"result   {solution.result} for {board.color_to_move()} in {solution.distance} {plies}")
+    print(f"best     {solution.column}")
+    if args.analyze:
+        for column, score in sorted(solver.analyze(position, mask).items()):
+            print(f"column {column}: {score}")
+    print(f"nodes    {solver.nodes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import importlib.util
+import random
+import unittest
+
+from connect4 import GameBoard
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAS_NUMPY:
+    import numpy as np
+    from connect4.batch_board import BatchGameBoard, RED, YELLOW, EMPTY
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestBatchGameBoard(unittest.TestCase):
+    """
+    Test suite for the BatchGameBoard.
+
+    Tests cover:
+    - Coins fall to the bottom and colors alternate per board
+    - Full, invalid and skipped columns are rejected per board
+    - Winners and draws agree with GameBoard for random games
+    - Copies into a GameBoard keep the color to move and the legal moves
+    """
+
+    def test_add_coin_per_board(self):
+        """Every board should get its own column and the color to move should alternate."""
+        batch = BatchGameBoard(3)
+        placed = batch.add_coin([0, 3, -1])
+        self.assertEqual(placed.tolist(), [True, True, False])
+        self.assertEqual(batch.cells[0, 5, 0], RED)
+        self.assertEqual(batch.cells[1, 5, 3], RED)
+        self.assertTrue((batch.cells[2] == EMPTY).all())
+        self.assertEqual(batch.to_move.tolist(), [YELLOW, YELLOW, RED])
+
+    def test_full_and_invalid_columns(self):
+        """A full or invalid column should be rejected and leave the board unchanged."""
+        batch = BatchGameBoard(2)
+        for _ in range(6):
+            batch.add_coin([1, 1])
+        self.assertFalse(batch.valid_moves_mask()[:, 1].any())
+        before = batch.cells.copy()
+        self.assertEqual(batch.add_coin([1, 7]).tolist(), [False, False])
+        self.assertTrue((batch.cells == before).all())
+
+    def test_random_games_match_game_board(self):
+        """Winners and draws of random games should agree with GameBoard after every move."""
+        rng = random.Random(1)
+        count = 64
+        batch = BatchGameBoard(count)
+        boards = [GameBoard() for _ in range(count)]
+        finished = np.zeros(count, dtype=bool)
+        for _ in range(42):
+            columns = []
+            for index, board in enumerate(boards):
+                legal = [c for c in range(7) if board._board[0][c] == ""]
+                columns.append(-1 if finished[index] else rng.choice(legal))
+            batch.add_coin(columns)
+            winners = batch.winners()
+            draws = batch.is_draw()
+            for index, board in enumerate(boards):
+                if columns[index] >= 0:
+                    board.add_coin(board.color_to_move(), columns[index])
+                expected = RED if board.check_for_winner("red") else YELLOW if board.check_for_winner("yellow") else EMPTY
+                self.assertEqual(winners[index], expected)
+                self.assertEqual(draws[index], board.check_for_draw())
+                self.assertEqual(batch.to_game_board(index).position_key(), board.position_key())
+            finished |= (winners != EMPTY) | draws
+
+    def test_to_game_board(self):
+        """A copied board should have the color to move and legal moves of a GameBoard played move by move."""
+        rng = random.Random(2)
+        for first in (RED, YELLOW):
+            batch = BatchGameBoard(1)
+            batch.to_move[:] = first
+            board = GameBoard()
+            color = "red" if first == RED else "yellow"
+            for _ in range(30):
+                column = rng.choice(board.legal_moves())
+                batch.add_coin([column])
+                board.add_coin(color, column)
+                color = "yellow" if color == "red" else "red"
+                copy = batch.to_game_board(0)
+                self.assertEqual(copy.color_to_move(), board.color_to_move())
+                self.assertEqual(copy.legal_moves(), board.legal_moves())
+                self.assertEqual(copy.position_key(), board.position_key())
+
+        # Red 0, yellow 0, red 1: yellow is to move
+        batch = BatchGameBoard(1)
+        for column in (0, 0, 1):
+            batch.add_coin([column])
+        self.assertEqual(batch.to_game_board(0).color_to_move(), "yellow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from benchmarks.run import compare, make_positions
+
+
+def results(**values):
+    """Build a results dict; names ending with _rate are higher-is-better."""
+    return {"results": {name: {"value": value, "unit": "x", "higher_is_better": name.endswith("_rate")}
+                        for name, value in values.items()}}
+
+
+class TestCompare(unittest.TestCase):
+    """
+    Test suite for the baseline comparison of the benchmark suite.
+
+    Tests cover:
+    - Slower times and lower rates above the threshold are regressions
+    - Changes within the threshold, improvements and new benchmarks are not
+    """
+
+    def test_regressions(self):
+        """Only changes for the worse above the threshold should be reported."""
+        baseline = results(add_time=100.0, games_rate=50.0, check_time=10.0)
+        current = results(add_time=130.0, games_rate=35.0, check_time=11.0, new_time=5.0)
+        messages = compare(current, baseline, threshold=0.2)
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith("add_time"))
+        self.assertTrue(messages[1].startswith("games_rate"))
+
+    def test_improvements(self):
+        """Faster times and higher rates should never be reported."""
+        baseline = results(add_time=100.0, games_rate=50.0)
+        current = results(add_time=10.0, games_rate=500.0)
+        self.assertEqual(compare(current, baseline, threshold=0.0), [])
+
+
+class TestPositions(unittest.TestCase):
+    """Test suite for the fixed benchmark positions."""
+
+    def test_fixed_positions(self):
+        """The position set should be the same for every run."""
+        self.assertEqual(make_positions(20), make_positions(20))
+        self.assertEqual(len(make_positions(20)), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
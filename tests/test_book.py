@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from connect4 import GameBoard, SearchBot
+from connect4.book import OpeningBook, generate_book
+
+
+def board_position(board, color):
+    """Return (position, mask) of a GameBoard seen from the player with the given color."""
+    other = "yellow" if color == "red" else "red"
+    position = board.get_bitboard(color)
+    return position, position | board.get_bitboard(other)
+
+
+class TestOpeningBook(unittest.TestCase):
+    """
+    Test suite for generate_book() and OpeningBook.
+
+    Tests cover:
+    - All positions up to the book depth are found, deeper ones are not
+    - Mirrored positions get mirrored moves
+    - SearchBot plays the book move
+    - Files which are no book are rejected
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a small book once for all tests."""
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "book.bin")
+        cls.count = generate_book(cls.path, depth=2, max_time=None, max_depth=4, table_size=1 << 16)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+
+    def test_lookup_depth(self):
+        """Positions with up to two coins are in the book, positions with three coins are not."""
+        self.assertEqual(len(self.book), self.count)
+        board = GameBoard()
+        self.assertIsNotNone(self.book.lookup(*board_position(board, "red")))
+        for column in range(7):
+            board.play(column)
+            for reply in range(7):
+                board.play(reply)
+                self.assertIsNotNone(self.book.lookup(*board_position(board, "red")))
+                board.play(3)
+                self.assertIsNone(self.book.lookup(*board_position(board, "yellow")))
+                board.undo()
+                board.undo()
+            board.undo()
+
+    def test_mirrored_move(self):
+        """The book move of a mirrored position should be the mirrored book move."""
+        board = GameBoard()
+        board.play(1)
+        mirrored = GameBoard()
+        mirrored.play(5)
+        column = self.book.lookup(*board_position(board, "yellow"))[0]
+        self.assertEqual(self.book.lookup(*board_position(mirrored, "yellow"))[0], 6 - column)
+
+    def test_search_bot_uses_book(self):
+        """SearchBot should play the book move without searching."""
+        bot = SearchBot("bot", max_nodes=1, color="red", book=self.book)
+        bot.verbose = False
+        board = GameBoard()
+        self.assertEqual(bot.play_turn(board), self.book.lookup(0, 0)[0])
+
+    def test_invalid_file(self):
+        """Opening a file which is not a book should raise ValueError."""
+        path = os.path.join(self.directory.name, "invalid.bin")
+        with open(path, "wb") as file:
+            file.write(b"not a book file")
+        with self.assertRaises(ValueError):
+            OpeningBook(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
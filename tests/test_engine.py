@@ -0,0 +1,129 @@
+import time
+import unittest
+
+from connect4 import GameBoard, bitboard
+from connect4.engine import _HASH_MULTIPLIER, SearchEngine, TranspositionTable, EXACT, LOWER, WIN_SCORE
+from connect4.evaluation import evaluate
+
+
+def board_position(board, color):
+    """Return (position, mask) of a GameBoard seen from the player with the given color."""
+    other = "yellow" if color == "red" else "red"
+    position = board.get_bitboard(color)
+    return position, position | board.get_bitboard(other)
+
+
+class TestSearchEngine(unittest.TestCase):
+    """
+    Test suite for the SearchEngine.
+
+    Tests cover:
+    - Playing an immediate win
+    - Blocking an immediate win of the opponent
+    - Finding a forced win (double threat) a few moves ahead
+    - Respecting the node budget
+    - Stopping on the stop callback and the deadline, also with a batch evaluator
+    - A full board has no move
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard and SearchEngine before each test."""
+        self.board = GameBoard()
+        self.engine = SearchEngine(table_size=1 << 16)
+
+    def test_plays_winning_move(self):
+        """With three red coins in the bottom row, red should complete the row."""
+        for col in (0, 1, 2):
+            self.board.add_coin("red", col)
+            self.board.add_coin("yellow", col)
+        result = self.engine.search(*board_position(self.board, "red"), max_time=None, max_depth=4)
+        self.assertEqual(result.column, 3)
+        self.assertGreater(result.score, WIN_SCORE - 42)
+
+    def test_blocks_opponent(self):
+        """Yellow has to block the vertical three of red."""
+        for _ in range(3):
+            self.board.add_coin("red", 5)
+        self.board.add_coin("yellow", 0)
+        self.board.add_coin("yellow", 6)
+        result = self.engine.search(*board_position(self.board, "yellow"), max_time=None, max_depth=4)
+        self.assertEqual(result.column, 5)
+
+    def test_finds_double_threat(self):
+        """Red with two coins in the middle of an open bottom row wins by building an open three."""
+        self.board.add_coin("red", 2)
+        self.board.add_coin("yellow", 2)
+        self.board.add_coin("red", 3)
+        self.board.add_coin("yellow", 3)
+        result = self.engine.search(*board_position(self.board, "red"), max_time=None, max_depth=5)
+        self.assertIn(result.column, (1, 4))
+        self.assertGreater(result.score, WIN_SCORE - 42)
+
+    def test_node_budget(self):
+        """The search should stop shortly after the node budget and still return a legal column."""
+        result = self.engine.search(0, 0, max_time=None, max_nodes=2000)
+        self.assertLessEqual(result.nodes, 2001)
+        self.assertIn(result.column, range(7))
+
+    def test_stop_with_evaluator(self):
+        """A search with a batch evaluator should poll the stop callback and the deadline."""
+        def evaluator(positions, masks):
+            return [evaluate(position, mask) for position, mask in zip(positions, masks)]
+
+        engine = SearchEngine(1 << 16, evaluator=evaluator)
+        # The node budget only ends the search if the polls are skipped
+        result = engine.search(0, 0, max_time=None, max_nodes=200_000, stop=lambda: True)
+        self.assertLess(result.nodes, 1000)
+        self.assertIn(result.column, range(7))
+        start = time.perf_counter()
+        engine.search(0, 0, max_time=0.05, max_nodes=200_000)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_full_board(self):
+        """A full board is a draw without a column to play, also for helper searches with a root shift."""
+        result = self.engine.search(0, bitboard.BOARD_MASK, max_time=None, root_shift=3)
+        self.assertEqual((result.column, result.score), (-1, 0))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """
+    Test suite for the TranspositionTable.
+
+    Tests cover:
+    - Storing and reading an entry
+    - Depth-preferred replacement within one search and aging between searches
+    - Deeper entries of the same position are kept
+    """
+
+    def test_store_and_get(self):
+        """A stored entry should be returned for its key only."""
+        table = TranspositionTable(size=16)
+        table.store(5, 3, EXACT, 10, 2)
+        self.assertEqual(table.get(5), (3, EXACT, 10, 2))
+        self.assertIsNone(table.get(21))
+
+    def test_replacement(self):
+        """A shallower entry must not replace a deeper one of the same search, but it may after new_search()."""
+        table = TranspositionTable(size=16)
+        first, second = [key for key in range(1, 1000) if (key * _HASH_MULTIPLIER >> 32) % 16 == 5][:2]
+        table.store(first, 6, EXACT, 10, 2)
+        table.store(second, 2, EXACT, 3, 1)
+        self.assertIsNotNone(table.get(first))
+        table.new_search()
+        table.store(second, 2, EXACT, 3, 1)
+        self.assertIsNone(table.get(first))
+        self.assertEqual(table.get(second), (2, EXACT, 3, 1))
+
+    def test_keep_deeper_entry(self):
+        """A shallower result must not replace a deeper one of the same position, also from an older search."""
+        table = TranspositionTable(size=16)
+        table.store(5, 6, LOWER, 10, 2)
+        table.new_search()
+        table.store(5, 2, EXACT, 3, 1)
+        self.assertEqual(table.get(5), (6, LOWER, 10, 2))
+        table.store(5, 6, EXACT, 3, 1)
+        self.assertEqual(table.get(5), (6, EXACT, 3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import random
+import unittest
+
+from connect4 import GameBoard, SmartBot
+from connect4.evaluation import (DOUBLE_THREAT_SCORE, PARITY_WEIGHT, THREAT_WEIGHT, THREE_WEIGHT, TWO_WEIGHT,
+                                 evaluate, score_move)
+
+
+def full_scan_score(board, color, moved_first):
+    """Score the open lines, threats and parity of a color against its opponent with a full scan of all lines."""
+    other_color = "yellow" if color == "red" else "red"
+    geometry = board.geometry
+    connect = geometry.connect
+    odd_rows = sum(geometry.bottom_mask << level for level in range(0, geometry.rows, 2))
+    own_rows = odd_rows if moved_first else geometry.board_mask ^ odd_rows
+    weights = {connect - 1: THREE_WEIGHT, connect - 2: TWO_WEIGHT if connect > 2 else 0}
+    score = 0
+    for sign, own, other, rows in ((1, color, other_color, own_rows),
+                                   (-1, other_color, color, geometry.board_mask ^ own_rows)):
+        own_bits, other_bits = board.get_bitboard(own), board.get_bitboard(other)
+        threats = 0
+        for line in geometry.lines:
+            if not line & other_bits:
+                score += sign * weights.get(bin(line & own_bits).count("1"), 0)
+                empty = line & ~own_bits
+                if bin(empty).count("1") == 1:
+                    threats |= empty
+        score += sign * (THREAT_WEIGHT * bin(threats).count("1") + PARITY_WEIGHT * bin(threats & rows).count("1"))
+    return score
+
+
+def position_of(board):
+    """Return (position, mask) of a board for the player to move."""
+    color = board.color_to_move()
+    position = board.get_bitboard(color)
+    return position, position | board.get_bitboard("yellow" if color == "red" else "red")
+
+
+class TestScoreMove(unittest.TestCase):
+    """
+    Test suite for the open lines and threats of score_move().
+
+    Tests cover:
+    - Scores of the moves of a position differ like full scans of all lines
+    - Boards with other sizes and connect lengths
+    """
+
+    def test_against_full_scan(self):
+        """score_move() should rank moves like a full scan of the open lines and threats after the move."""
+        rng = random.Random(4)
+        for rows, columns, connect in ((6, 7, 4), (7, 9, 5), (6, 7, 3)):
+            board = GameBoard(rows, columns, connect)
+            for _ in range(30):
+                board.reset_board()
+                for _ in range(rng.randrange(rows * columns // 2)):
+                    board.play(rng.choice(board.legal_moves()))
+                    if board.check_last_move_wins():
+                        board.undo()
+                        break
+                color = board.color_to_move()
+                moved_first = len(board._moves) % 2 == 0
+                key = board.position_key()
+                differences = set()
+                for column in board.legal_moves():
+                    score = score_move(board, color, column)
+                    self.assertEqual(board.position_key(), key)
+                    board.play(column, color)
+                    reference = full_scan_score(board, color, moved_first)
+                    board.undo()
+                    # Double threats are left out of the reference
+                    differences.add((score - reference) % DOUBLE_THREAT_SCORE)
+                self.assertLessEqual(len(differences), 1)
+
+
+class TestEvaluation(unittest.TestCase):
+    """
+    Test suite for evaluate() and score_move().
+
+    Tests cover:
+    - Two playable threats of the opponent are scored as lost
+    - Threats on the row parity of the player count more
+    - score_move() leaves the board unchanged and sees double threats
+    - SmartBot sets up a double threat
+    """
+
+    def test_double_threat(self):
+        """Red with an open three on the bottom row has two playable threats."""
+        board = GameBoard()
+        for col in (2, 2, 3, 3, 4):
+            board.play(col)
+        # Yellow is to move and cannot block both ends
+        self.assertLess(evaluate(*position_of(board)), -DOUBLE_THREAT_SCORE // 2)
+
+    def test_parity(self):
+        """A threat of the first player on an odd row (counted from the bottom) should score higher than on an even row."""
+        # Red, who moved first and is to move, has three coins on top of each other in column 0: with a
+        # yellow coin below them the threat is on row 5 (odd), without it on row 4 (even)
+        scores = {}
+        for row, columns in ((4, (0, 5, 0, 5, 0, 4, 6, 1)), (5, (6, 0, 0, 5, 0, 5, 0, 4))):
+            board = GameBoard()
+            for column in columns:
+                board.play(column)
+            scores[row] = evaluate(*position_of(board))
+        self.assertEqual(scores[5] - scores[4], PARITY_WEIGHT)
+
+    def test_score_move(self):
+        """score_move() should restore the board and prefer the move creating a double threat."""
+        board = GameBoard()
+        for col in (2, 2, 3, 3):
+            board.play(col)
+        key = board.position_key()
+        scores = {col: score_move(board, "red", col) for col in range(7)}
+        self.assertEqual(board.position_key(), key)
+        self.assertGreater(scores[4], DOUBLE_THREAT_SCORE // 2)
+        self.assertGreater(scores[1], DOUBLE_THREAT_SCORE // 2)
+
+        bot = SmartBot("bot", color="red")
+        bot.verbose = False
+        self.assertIn(bot.play_turn(board), (1, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import sys
 import unittest
 
@@ -214,6 +215,558 @@ class TestDrawCheck(unittest.TestCase):
             for _ in range(6):
                 self.board.add_coin("red" if col % 2 == 0 else "yellow", col)
         self.assertTrue(self.board.check_for_draw())
-        
+
+
+
+class TestLegalMoves(unittest.TestCase):
+    """
+    Test suite for the legal_moves(), landing_row() and is_full() methods.
+
+    Tests cover:
+    - All columns are legal on an empty board
+    - Full columns are left out, also after undo() and direct cell writes
+    - Landing rows agree with the cells written by add_coin()
+    - Centre-first order
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_empty_board(self):
+        """All columns should be legal on an empty board, in centre-first order on request."""
+        self.assertEqual(self.board.legal_moves(), (0, 1, 2, 3, 4, 5, 6))
+        self.assertEqual(self.board.legal_moves(centre_first=True), (3, 2, 4, 1, 5, 0, 6))
+        self.assertEqual(self.board.landing_row(0), 5)
+        self.assertFalse(self.board.is_full())
+
+    def test_full_column(self):
+        """A full column should not be legal, also after undo() and a direct cell write."""
+        for _ in range(6):
+            self.board.play(2)
+        self.assertEqual(self.board.legal_moves(), (0, 1, 3, 4, 5, 6))
+        self.assertIsNone(self.board.landing_row(2))
+        self.board.undo()
+        self.assertIn(2, self.board.legal_moves())
+        self.assertEqual(self.board.landing_row(2), 0)
+        self.board._board[0][2] = COIN_RED
+        self.assertNotIn(2, self.board.legal_moves())
+
+    def test_landing_row_matches_add_coin(self):
+        """landing_row() should name the cell filled by add_coin() until the board is full."""
+        rng = random.Random(0)
+        while not self.board.is_full():
+            column = rng.choice(self.board.legal_moves())
+            row = self.board.landing_row(column)
+            self.assertEqual(self.board._board[row][column], "")
+            self.board.add_coin("red", column)
+            self.assertEqual(self.board._board[row][column], COIN_RED)
+            self.assertEqual(self.board.legal_moves(),
+                             tuple(column for column in range(7) if self.board._board[0][column] == ""))
+        self.assertEqual(self.board.legal_moves(), ())
+        self.assertTrue(self.board.check_for_draw())
+
+
+def scan_for_winner(grid, coin):
+    """Reference win check which scans all 69 windows of a 6x7 grid of coin symbols."""
+    for r in range(6):
+        for c in range(7):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + i * dr, c + i * dc) for i in range(4)]
+                if all(0 <= rr < 6 and 0 <= cc < 7 and grid[rr][cc] == coin for rr, cc in cells):
+                    return True
+    return False
+
+
+class TestBitboard(unittest.TestCase):
+    """
+    Test suite for the bitboard representation behind GameBoard.
+
+    Tests cover:
+    - Coins of neighbouring columns are not connected across the column border
+    - Win and draw detection agree with a plain scan of the grid for random games
+    - reset_board() removes all coins
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_no_vertical_win_across_columns(self):
+        """Two coins on top of column 0 and two at the bottom of column 1 are not four in a row."""
+        for _ in range(4):
+            self.board.add_coin("yellow", 0)
+        self.board._board[2][0] = ""
+        self.board._board[3][0] = ""
+        self.board.add_coin("red", 0)
+        self.board.add_coin("red", 0)
+        self.board.add_coin("red", 1)
+        self.board.add_coin("red", 1)
+        self.assertFalse(self.board.check_for_winner("red"))
+
+    def test_random_games_match_grid_scan(self):
+        """The bitboard win check should agree with a scan of all windows after every move."""
+        rng = random.Random(4)
+        for _ in range(50):
+            self.board.reset_board()
+            color = "red"
+            while not self.board.check_for_draw():
+                self.board.add_coin(color, rng.choice([c for c in range(7) if self.board._board[0][c] == ""]))
+                grid = [list(row) for row in self.board._board]
+                self.assertEqual(self.board.check_for_winner("red"), scan_for_winner(grid, COIN_RED))
+                self.assertEqual(self.board.check_for_winner("yellow"), scan_for_winner(grid, COIN_YELLOW))
+                color = "yellow" if color == "red" else "red"
+
+    def test_reset_board_removes_all_coins(self):
+        """After reset_board() every cell is empty and coins land in the bottom row again."""
+        for col in range(7):
+            self.board.add_coin("red", col)
+        self.board.reset_board()
+        self.assertTrue(all(cell == "" for row in self.board._board for cell in row))
+        self.assertTrue(self.board.add_coin("yellow", 2))
+        self.assertEqual(self.board._board[5][2], COIN_YELLOW)
+
+
+class TestLastMoveWinCheck(unittest.TestCase):
+    """
+    Test suite for the check_last_move_wins() method.
+
+    Tests cover:
+    - No last move on an empty or reset board
+    - Wins through the last coin in every direction, also when it lands in the middle of a line
+    - Agreement with check_for_winner() for random games
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_no_last_move_on_empty_board(self):
+        """Without any coin there is no winning last move."""
+        self.assertFalse(self.board.check_last_move_wins())
+        self.board.add_coin("red", 3)
+        self.board.reset_board()
+        self.assertFalse(self.board.check_last_move_wins())
+
+    def test_horizontal_win_by_middle_coin(self):
+        """A coin closing the gap of a horizontal line should win."""
+        for col in (0, 1, 3):
+            self.board.add_coin("red", col)
+        self.assertFalse(self.board.check_last_move_wins())
+        self.board.add_coin("red", 2)
+        self.assertTrue(self.board.check_last_move_wins())
+
+    def test_vertical_win(self):
+        """The fourth coin on top of a column should win."""
+        for _ in range(3):
+            self.board.add_coin("yellow", 6)
+            self.assertFalse(self.board.check_last_move_wins())
+        self.board.add_coin("yellow", 6)
+        self.assertTrue(self.board.check_last_move_wins())
+
+    def test_diagonal_wins(self):
+        """The last coin of a rising and of a falling diagonal should win."""
+        for col, height in ((0, 0), (1, 1), (2, 2)):
+            for _ in range(height):
+                self.board.add_coin("yellow", col)
+            self.board.add_coin("red", col)
+        for _ in range(3):
+            self.board.add_coin("yellow", 3)
+        self.board.add_coin("red", 3)
+        self.assertTrue(self.board.check_last_move_wins())
+
+        self.board.reset_board()
+        for col, height in ((6, 0), (5, 1), (4, 2), (3, 3)):
+            for _ in range(height):
+                self.board.add_coin("red", col)
+        for col in (6, 4, 3):
+            self.board.add_coin("yellow", col)
+        self.board.add_coin("yellow", 5)
+        self.assertTrue(self.board.check_last_move_wins())
+
+    def test_random_games_match_full_check(self):
+        """check_last_move_wins() should agree with check_for_winner() for the color of the last move."""
+        rng = random.Random(2)
+        for _ in range(50):
+            self.board.reset_board()
+            color = "red"
+            while not self.board.check_for_draw():
+                self.board.add_coin(color, rng.choice([c for c in range(7) if self.board._board[0][c] == ""]))
+                won = self.board.check_for_winner(color)
+                self.assertEqual(self.board.check_last_move_wins(), won)
+                if won:
+                    break
+                color = "yellow" if color == "red" else "red"
+
+
+class TestPlayUndo(unittest.TestCase):
+    """
+    Test suite for the play() and undo() methods.
+
+    Tests cover:
+    - play() alternates colors starting with red and fills a column bottom up
+    - play() rejects a full column
+    - undo() restores the previous board, also after add_coin()
+    - undo() on an empty board
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_play_alternates_colors(self):
+        """Without a color, play() should alternate between red and yellow."""
+        self.assertTrue(self.board.play(3))
+        self.assertTrue(self.board.play(3))
+        self.assertEqual(self.board._board[5][3], COIN_RED)
+        self.assertEqual(self.board._board[4][3], COIN_YELLOW)
+        self.assertEqual(self.board.color_to_move(), "red")
+
+    def test_play_full_column(self):
+        """play() should return False for a full column and leave the board unchanged."""
+        for _ in range(6):
+            self.assertTrue(self.board.play(0))
+        self.assertFalse(self.board.play(0))
+        self.assertEqual(self.board.undo(), 0)
+        self.assertTrue(self.board.play(0, "red"))
+
+    def test_undo_restores_board(self):
+        """Playing and undoing random moves should lead back to the same board and win state."""
+        rng = random.Random(7)
+        for col in (3, 3, 2, 4):
+            self.board.add_coin(self.board.color_to_move(), col)
+        before = [list(row) for row in self.board._board]
+        played = 0
+        for _ in range(20):
+            if self.board.play(rng.randrange(7)):
+                played += 1
+        for _ in range(played):
+            self.assertIsNotNone(self.board.undo())
+        self.assertEqual([list(row) for row in self.board._board], before)
+        self.assertFalse(self.board.check_for_winner("red"))
+        self.assertFalse(self.board.check_for_winner("yellow"))
+        self.assertTrue(self.board.add_coin("red", 3))
+        self.assertEqual(self.board._board[3][3], COIN_RED)
+
+    def test_undo_on_empty_board(self):
+        """undo() should return None if no coin was added."""
+        self.assertIsNone(self.board.undo())
+
+
+class TestPositionKey(unittest.TestCase):
+    """
+    Test suite for position_key(), mirror_key() and canonical_key().
+
+    Tests cover:
+    - Empty board has key 0
+    - Same position reached by different move orders has the same key
+    - Different colorings of the same cells have different keys
+    - Mirrored positions share the canonical key
+    - Keys are restored by undo() and reset_board()
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_empty_board(self):
+        """An empty board should have key 0."""
+        self.assertEqual(self.board.position_key(), 0)
+        self.assertEqual(self.board.canonical_key(), 0)
+
+    def test_transposition(self):
+        """The key should only depend on the position, not on the move order."""
+        for col in (3, 2, 4):
+            self.board.play(col)
+        other = GameBoard()
+        for col in (4, 2, 3):
+            other.play(col)
+        self.assertEqual(self.board.position_key(), other.position_key())
+
+    def test_colors_give_different_keys(self):
+        """Swapping the colors of the coins should change the key."""
+        self.board.add_coin("red", 0)
+        self.board.add_coin("yellow", 1)
+        other = GameBoard()
+        other.add_coin("yellow", 0)
+        other.add_coin("red", 1)
+        self.assertNotEqual(self.board.position_key(), other.position_key())
+
+    def test_mirror(self):
+        """A position and its mirror image should share the canonical key."""
+        for col in (0, 1, 1, 5):
+            self.board.play(col)
+        other = GameBoard()
+        for col in (6, 5, 5, 1):
+            other.play(col)
+        self.assertEqual(self.board.mirror_key(), other.position_key())
+        self.assertEqual(self.board.canonical_key(), other.canonical_key())
+        self.assertNotEqual(self.board.position_key(), other.position_key())
+
+    def test_keys_follow_undo_and_reset(self):
+        """Keys should be restored when moves are undone and cleared by reset_board()."""
+        rng = random.Random(11)
+        seen = {}
+        for _ in range(30):
+            if self.board.play(rng.randrange(7)):
+                seen[len(self.board._moves)] = (self.board.position_key(), self.board.mirror_key())
+        while self.board._moves:
+            self.assertEqual((self.board.position_key(), self.board.mirror_key()), seen[len(self.board._moves)])
+            self.board.undo()
+        self.board.play(3)
+        self.board.reset_board()
+        self.assertEqual(self.board.position_key(), 0)
+        self.assertEqual(self.board.mirror_key(), 0)
+
+
+class TestSerialization(unittest.TestCase):
+    """
+    Test suite for to_bytes(), from_bytes() and pickling.
+
+    Tests cover:
+    - Round trip of random positions keeps coins, keys, heights and the color to move
+    - Invalid data is rejected, also coins above an empty cell
+    - Pickled boards are restored from the compact form
+    - The color to move of games started by yellow
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_round_trip(self):
+        """A board restored from its bytes should equal the original position."""
+        rng = random.Random(5)
+        for _ in range(20):
+            self.board.reset_board()
+            for _ in range(rng.randrange(30)):
+                self.board.play(rng.randrange(7))
+            data = self.board.to_bytes()
+            self.assertEqual(len(data), 16)
+            other = GameBoard.from_bytes(data)
+            self.assertEqual([list(row) for row in other._board], [list(row) for row in self.board._board])
+            self.assertEqual(other.position_key(), self.board.position_key())
+            self.assertEqual(other.mirror_key(), self.board.mirror_key())
+            self.assertEqual(other.color_to_move(), self.board.color_to_move())
+            for col in range(7):
+                self.assertEqual(other.play(col), self.board.play(col))
+
+    def test_invalid_data(self):
+        """Data of the wrong size or with overlapping coins should raise a ValueError."""
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes(b"\x00" * 15)
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes((1).to_bytes(8, "little") * 2)
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes((1 << 6).to_bytes(8, "little") + bytes(8))
+
+    def test_floating_coins(self):
+        """A coin above an empty cell should raise a ValueError."""
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes((1 << 1).to_bytes(8, "little") + bytes(8))
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes((1 << 0).to_bytes(8, "little") + (1 << 2).to_bytes(8, "little"))
+        self.assertEqual(GameBoard.from_bytes((1 << 0).to_bytes(8, "little") + (1 << 1).to_bytes(8, "little"))
+                         .landing_row(0), 3)
+
+    def test_yellow_first(self):
+        """After yellow made the first move, the exported and restored boards should keep the color to move."""
+        import pickle
+
+        self.board.add_coin("yellow", 3)
+        self.board.add_coin("red", 3)
+        self.assertEqual(self.board.first_color(), "yellow")
+        self.assertEqual(self.board.color_to_move(), "yellow")
+        self.assertFalse(self.board.to_position().red_to_move)
+        self.assertEqual(GameBoard.from_position(self.board.to_position()).color_to_move(), "yellow")
+        self.assertEqual(GameBoard.from_bytes(self.board.to_bytes(), first="yellow").color_to_move(), "yellow")
+        self.assertEqual(GameBoard.from_bytes(self.board.to_bytes()).color_to_move(), "red")
+        self.assertEqual(pickle.loads(pickle.dumps(self.board)).color_to_move(), "yellow")
+
+        # Without a move history the first color is kept, with an odd number of coins it does not matter
+        self.board._set_cell(0, 0, "")
+        self.assertEqual(self.board.color_to_move(), "yellow")
+        self.board.add_coin("yellow", 0)
+        self.assertEqual(self.board.color_to_move(), "red")
+        self.assertEqual(GameBoard.from_position(self.board.to_position()).first_color(), "yellow")
+
+    def test_pickle(self):
+        """Pickling should keep the position."""
+        import pickle
+
+        for col in (3, 3, 4, 2):
+            self.board.play(col)
+        other = pickle.loads(pickle.dumps(self.board))
+        self.assertEqual(other.position_key(), self.board.position_key())
+        self.assertEqual(other._board[4][3], COIN_YELLOW)
+
+
+class TestWinningLines(unittest.TestCase):
+    """
+    Test suite for the winning-line index and the board methods using it.
+
+    Tests cover:
+    - Number of winning lines and lines through a cell of the standard board
+    - is_winning_move() agrees with playing the move and checking the board
+    - threats() agrees with the bitboard shifts of bitboard.winning_cells()
+    - threats() agrees with a scan of all lines on other sizes and connect lengths
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard before each test."""
+        self.board = GameBoard()
+
+    def test_index(self):
+        """The standard board has 69 lines, a corner cell lies on three, a centre cell on thirteen."""
+        from connect4 import bitboard
+
+        self.assertEqual(len(bitboard.LINES), 69)
+        self.assertEqual(len(bitboard.CELL_LINES[0]), 3)
+        self.assertEqual(len(bitboard.CELL_LINES[3 * bitboard.HEIGHT + 2]), 13)
+        self.assertEqual(bitboard.CELL_LINES[bitboard.ROW_COUNT], ())
+        self.assertEqual(len(GameBoard(7, 8, 5).geometry.lines), 4 * 7 + 3 * 8 + 2 * 4 * 3)
+
+    def test_random_positions(self):
+        """is_winning_move() and threats() should match playing the moves and the bitboard shifts."""
+        from connect4 import bitboard
+
+        rng = random.Random(9)
+        for _ in range(200):
+            self.board.reset_board()
+            for _ in range(rng.randrange(30)):
+                self.board.play(rng.randrange(7))
+                if self.board.check_last_move_wins():
+                    self.board.undo()
+                    break
+            for color in ("red", "yellow"):
+                own = self.board.get_bitboard(color)
+                mask = own | self.board.get_bitboard("yellow" if color == "red" else "red")
+                self.assertEqual(self.board.threats(color), bitboard.winning_cells(own, mask))
+                for col in range(7):
+                    expected = False
+                    if self.board.play(col, color):
+                        expected = self.board.check_for_winner(color)
+                        self.board.undo()
+                    self.assertEqual(self.board.is_winning_move(color, col), expected)
+
+
+    def test_threats_on_other_sizes(self):
+        """threats() should find the same cells as a scan of all winning lines on other board sizes."""
+        rng = random.Random(10)
+        for rows, columns, connect in ((7, 9, 5), (6, 7, 3), (5, 12, 4)):
+            board = GameBoard(rows, columns, connect)
+            for _ in range(20):
+                board.reset_board()
+                for _ in range(rng.randrange(rows * columns)):
+                    if board.check_for_draw():
+                        break
+                    board.play(rng.choice(board.legal_moves()))
+                for color in ("red", "yellow"):
+                    own = board.get_bitboard(color)
+                    occupied = own | board.get_bitboard("yellow" if color == "red" else "red")
+                    expected = 0
+                    for line in board.geometry.lines:
+                        empty = line & ~occupied
+                        if empty and empty & (empty - 1) == 0 and line & own == line ^ empty:
+                            expected |= empty
+                    self.assertEqual(board.threats(color), expected)
+
+
+class TestGeometry(unittest.TestCase):
+    """
+    Test suite for boards with other sizes and connect lengths.
+
+    Tests cover:
+    - Coins can be added to every column of wider and higher boards
+    - Win checks use the connect length of the board
+    - The tables of a geometry are shared and match the board
+    - Serialization of boards with more than 64 bits per color
+    - Invalid sizes are rejected
+    """
+
+    def test_larger_board(self):
+        """A 7x9 board should accept seven coins per column and nine columns."""
+        board = GameBoard(7, 9)
+        for col in range(9):
+            for _ in range(7):
+                self.assertTrue(board.add_coin(board.color_to_move(), col))
+            self.assertFalse(board.add_coin("red", col))
+        self.assertEqual(board.add_coin("red", 9), "Error, invalid column!")
+        self.assertTrue(board.check_for_draw())
+        self.assertEqual(len(board._board), 7)
+        self.assertEqual(len(board._board[0]), 9)
+
+    def test_connect_length(self):
+        """With connect 5, four in a row should not win but five should."""
+        board = GameBoard(7, 8, 5)
+        for col in range(4, 8):
+            board.add_coin("red", col)
+        self.assertFalse(board.check_for_winner("red"))
+        self.assertFalse(board.check_last_move_wins())
+        board.add_coin("red", 3)
+        self.assertTrue(board.check_for_winner("red"))
+        self.assertTrue(board.check_last_move_wins())
+
+    def test_random_games_agree(self):
+        """Full and last-move win checks should agree on random games on several sizes."""
+        rng = random.Random(3)
+        for rows, columns, connect in ((7, 8, 4), (7, 9, 4), (6, 7, 3), (7, 9, 5)):
+            board = GameBoard(rows, columns, connect)
+            for _ in range(20):
+                board.reset_board()
+                while not board.check_for_draw():
+                    color = board.color_to_move()
+                    board.play(rng.choice(board.geometry.valid_moves[board._full_columns]))
+                    won = board.check_for_winner(color)
+                    self.assertEqual(board.check_last_move_wins(), won)
+                    if won:
+                        break
+
+    def test_shared_tables(self):
+        """Boards of the same size should share one geometry with matching tables."""
+        board = GameBoard(7, 9)
+        self.assertIs(board.geometry, GameBoard(7, 9).geometry)
+        self.assertIsNot(board.geometry, GameBoard().geometry)
+        self.assertEqual(board.geometry.centre_order[:3], (4, 3, 5))
+        for _ in range(7):
+            board.play(4)
+        self.assertEqual(board.geometry.valid_moves[board._full_columns], (0, 1, 2, 3, 5, 6, 7, 8))
+        self.assertEqual(board.geometry.ordered_moves[board._full_columns][0], 3)
+
+    def test_serialization(self):
+        """Boards with more than 64 bits per color should survive a round trip and pickling."""
+        import pickle
+
+        board = GameBoard(7, 9)
+        for col in (8, 8, 0, 4):
+            board.play(col)
+        data = board.to_bytes()
+        self.assertEqual(len(data), 18)
+        other = GameBoard.from_bytes(data, 7, 9)
+        self.assertEqual(other.position_key(), board.position_key())
+        self.assertEqual(pickle.loads(pickle.dumps(board)).position_key(), board.position_key())
+        with self.assertRaises(ValueError):
+            GameBoard.from_bytes(data)
+
+    def test_bots(self):
+        """SmartBot should block on a larger board; the search bots only play on the standard board."""
+        from connect4 import SmartBot, SearchBot
+
+        board = GameBoard(7, 9)
+        for col in (6, 7, 8):
+            board.add_coin("red", col)
+        bot = SmartBot("bot", color="yellow")
+        bot.verbose = False
+        self.assertEqual(bot.play_turn(board), 5)
+        with self.assertRaises(ValueError):
+            SearchBot("bot", max_depth=1, color="yellow").play_turn(board)
+
+    def test_invalid_size(self):
+        """Empty boards and impossible connect lengths should raise a ValueError."""
+        for size in ((0, 7, 4), (6, 0, 4), (6, 13, 4), (3, 3, 4), (6, 7, 1)):
+            with self.assertRaises(ValueError):
+                GameBoard(*size)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from connect4 import GameBoard
+from connect4.mcts import MonteCarloTreeSearch
+
+
+def board_position(board, color):
+    """Return (position, mask) of a GameBoard seen from the player with the given color."""
+    other = "yellow" if color == "red" else "red"
+    position = board.get_bitboard(color)
+    return position, position | board.get_bitboard(other)
+
+
+class TestMonteCarloTreeSearch(unittest.TestCase):
+    """
+    Test suite for MonteCarloTreeSearch.
+
+    Tests cover:
+    - Playing an immediate win
+    - Blocking an immediate win of the opponent
+    - Playout budget and reuse of the subtree of the played move
+    """
+
+    def setUp(self):
+        """Create a fresh GameBoard and search tree before each test."""
+        self.board = GameBoard()
+        self.tree = MonteCarloTreeSearch(seed=1)
+
+    def test_plays_winning_move(self):
+        """Red should complete the vertical four."""
+        for _ in range(3):
+            self.board.add_coin("red", 2)
+            self.board.add_coin("yellow", 5)
+        self.assertEqual(self.tree.search(*board_position(self.board, "red"), max_playouts=50), 2)
+
+    def test_blocks_opponent(self):
+        """Yellow should block the open bottom row of red."""
+        for col in (1, 2, 3):
+            self.board.add_coin("red", col)
+        self.board.add_coin("yellow", 1)
+        self.board.add_coin("yellow", 2)
+        self.assertIn(self.tree.search(*board_position(self.board, "yellow"), max_playouts=3000), (0, 4))
+
+    def test_playout_budget_and_reuse(self):
+        """The search should stop at the playout budget and keep the tree of the reply for the next search."""
+        column = self.tree.search(0, 0, max_playouts=500)
+        self.assertEqual(self.tree.playouts, 500)
+        self.board.play(column)
+        self.board.play(3)
+        kept = [child for child in self.tree._root.children if child.column == 3][0]
+        visits = kept.visits
+        self.tree.search(*board_position(self.board, "red"), max_playouts=100)
+        self.assertEqual(self.tree._root.parent.visits, visits + 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import time
+import unittest
+
+from connect4 import GameBoard, bitboard
+from connect4.movepool import MoveService, quick_move
+
+
+class TestQuickMove(unittest.TestCase):
+    """
+    Test suite for quick_move().
+
+    Tests cover:
+    - Winning has priority over blocking, blocking over the centre
+    - A full board has no move
+    """
+
+    def test_priorities(self):
+        """The fallback move should win, otherwise block, otherwise play the centre."""
+        self.assertEqual(quick_move(0, 0), 3)
+        board = GameBoard()
+        for _ in range(3):
+            board.add_coin("red", 0)
+        red = board.get_bitboard("red")
+        self.assertEqual(quick_move(0, red), 0)
+        for _ in range(3):
+            board.add_coin("yellow", 6)
+        yellow = board.get_bitboard("yellow")
+        self.assertEqual(quick_move(yellow, red | yellow), 6)
+
+    def test_full_board(self):
+        """On a full board there should be no move to play."""
+        self.assertEqual(quick_move(0, bitboard.BOARD_MASK), -1)
+
+
+class TestMoveService(unittest.TestCase):
+    """
+    Test suite for MoveService.
+
+    Tests cover:
+    - Requests are answered by the workers within the deadline
+    - A request missing its deadline gets the fallback move
+    - Cancelled requests do not block the workers
+    - A request can be cancelled before it starts, but not once it is resolved
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = MoveService(workers=1, table_size=1 << 12, max_requests=16)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+    def test_search_within_deadline(self):
+        """The worker should answer with a searched move before the deadline."""
+        board = GameBoard()
+        for _ in range(3):
+            board.add_coin("yellow", 4)
+        board.add_coin("red", 0)
+        board.add_coin("red", 1)
+        start = time.perf_counter()
+        result = self.service.submit(board, "red", deadline=2.0).result(timeout=5)
+        self.assertLess(time.perf_counter() - start, 2.5)
+        self.assertEqual(result.column, 4)
+        self.assertGreater(result.depth, 0)
+
+    def test_deadline_and_cancel(self):
+        """With the only worker busy, a second request should get the fallback move at its deadline."""
+        board = GameBoard()
+        busy = self.service.submit(board, "red", deadline=3.0)
+        start = time.perf_counter()
+        result = self.service.submit(board, "red", deadline=0.3).result(timeout=5)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual((result.column, result.depth), (3, 0))
+        self.assertTrue(busy.cancel())
+        self.assertTrue(busy.future.cancelled())
+        start = time.perf_counter()
+        self.service.submit(board, "red", deadline=0.5).result(timeout=5)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_cancel_queued(self):
+        """A request waiting for the busy worker should cancel instead of resolving with the fallback move."""
+        board = GameBoard()
+        busy = self.service.submit(board, "red", deadline=3.0)
+        queued = self.service.submit(board, "red", deadline=3.0)
+        self.assertTrue(queued.cancel())
+        self.assertTrue(queued.future.cancelled())
+        self.assertFalse(queued.cancel())
+        self.assertTrue(busy.cancel())
+        self.assertFalse(busy.cancel())
+        start = time.perf_counter()
+        self.service.submit(board, "red", deadline=0.5).result(timeout=5)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class TestServerWithMoveService(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the game server using a MoveService for the search bot.
+
+    Tests cover:
+    - The search bot answers within its deadline through the worker pool
+    """
+
+    async def test_search_bot_move(self):
+        """The first move of the search bot should arrive within the deadline."""
+        import asyncio
+        from connect4.server import GameServer
+
+        with MoveService(workers=1, table_size=1 << 12) as service:
+            game_server = GameServer(move_service=service, move_deadline=0.3)
+            server = await game_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await reader.readline()
+            start = time.perf_counter()
+            writer.write(b"NEW 2 second\n")
+            self.assertTrue((await reader.readline()).startswith(b"GAME you=yellow"))
+            self.assertTrue((await reader.readline()).startswith(b"BOT "))
+            self.assertLess(time.perf_counter() - start, 1.0)
+            writer.write(b"QUIT\n")
+            await reader.readline()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            game_server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
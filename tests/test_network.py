@@ -0,0 +1,155 @@
+import importlib.util
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from connect4 import Bot, GameBoard, SearchBot, SmartBot
+from connect4.engine import SearchEngine
+from connect4.evaluation import evaluate
+from connect4.game_setup import GameSetup
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAS_NUMPY:
+    import numpy as np
+    from connect4.network import FEATURE_COUNT, ValueNetwork, encode, encode_board, train
+    from connect4.selfplay import SelfPlayDataset, generate
+
+
+def random_board(rng, moves):
+    """Return a board after random moves which do not end the game."""
+    board = GameBoard()
+    for _ in range(moves):
+        column = rng.choice(board.legal_moves())
+        if board.is_winning_move(board.color_to_move(), column):
+            break
+        board.play(column)
+    return board
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestValueNetwork(unittest.TestCase):
+    """
+    Test suite for the feature planes and ValueNetwork.
+
+    Tests cover:
+    - Feature planes agree with the cells of the board
+    - Weights are saved and loaded, layers of wrong shape are rejected
+    - Batched scores agree with single evaluations
+    - Training lowers the loss on self-play records
+    """
+
+    def test_encode_board(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            board = random_board(rng, rng.randrange(30))
+            planes = encode_board(board)
+            own, other = board.color_to_move(), "yellow" if board.color_to_move() == "red" else "red"
+            coins = {own: board._COIN_RED if own == "red" else board._COIN_YELLOW,
+                     other: board._COIN_RED if other == "red" else board._COIN_YELLOW}
+            for row in range(6):
+                for column in range(7):
+                    self.assertEqual(planes[0, row, column], board._board[row][column] == coins[own])
+                    self.assertEqual(planes[1, row, column], board._board[row][column] == coins[other])
+                    self.assertEqual(planes[2, row, column], board.landing_row(column) == row)
+
+    def test_encode_rejects_other_board_size(self):
+        with self.assertRaises(ValueError):
+            encode_board(GameBoard(columns=9))
+
+    def test_save_and_load(self):
+        network = ValueNetwork.random((16, 8), seed=0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "network.npz")
+            network.save(path)
+            loaded = ValueNetwork.load(path)
+        board = random_board(random.Random(1), 10)
+        self.assertEqual(loaded.evaluate_board(board), network.evaluate_board(board))
+        self.assertEqual([weights.shape for weights, _ in loaded.layers], [(FEATURE_COUNT, 16), (16, 8), (8, 1)])
+
+    def test_wrong_shapes(self):
+        with self.assertRaises(ValueError):
+            ValueNetwork([(np.zeros((10, 1)), np.zeros(1))])
+        with self.assertRaises(ValueError):
+            ValueNetwork([(np.zeros((FEATURE_COUNT, 4)), np.zeros(4))])
+
+    def test_batched_scores(self):
+        network = ValueNetwork.random(seed=2)
+        rng = random.Random(2)
+        boards = [random_board(rng, rng.randrange(30)) for _ in range(16)]
+        positions = [board.to_position() for board in boards]
+        scores = network.scores([position.position for position in positions],
+                                [position.mask for position in positions])
+        self.assertEqual(len(scores), 16)
+        for board, score in zip(boards, scores):
+            self.assertAlmostEqual(score, round(1000 * network.evaluate_board(board)), delta=1)
+        self.assertEqual(network.scores([], []), [])
+        self.assertEqual(encode([0], [0]).shape, (1, 3, 6, 7))
+
+    def test_training_lowers_loss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, SmartBot, Bot, games=20, workers=1, games_per_shard=10)
+            dataset = SelfPlayDataset(directory)
+            losses = []
+            train(dataset, (32,), epochs=10, batch_size=32, progress=lambda epoch, loss: losses.append(loss))
+        self.assertEqual(len(losses), 10)
+        self.assertLess(losses[-1], losses[0])
+
+
+class TestBatchedSearch(unittest.TestCase):
+    """
+    Test suite for the search with a batch evaluator.
+
+    Tests cover:
+    - Batched leaf evaluation gives the same scores as evaluating leaf by leaf
+    - Leaves are evaluated in batches
+    - SearchBot plays with a value network
+    - The learned bot is offered in the setup only with a trained network
+    """
+
+    def test_same_scores_as_single_evaluation(self):
+        batches = []
+
+        def evaluator(positions, masks):
+            batches.append(len(positions))
+            return [evaluate(position, mask) for position, mask in zip(positions, masks)]
+
+        rng = random.Random(3)
+        for _ in range(10):
+            board = random_board(rng, rng.randrange(12))
+            position = board.to_position()
+            for depth in (1, 2, 3, 4):
+                single = SearchEngine(1 << 16).search(position.position, position.mask, None, max_depth=depth)
+                batched = SearchEngine(1 << 16, evaluator=evaluator).search(position.position, position.mask,
+                                                                             None, max_depth=depth)
+                self.assertEqual(batched.score, single.score)
+        self.assertGreater(max(batches), 1)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_search_bot_with_network(self):
+        bot = SearchBot("bot", max_depth=4, color="red", network=ValueNetwork.random(seed=0))
+        bot.verbose = False
+        board = GameBoard()
+        for column in (1, 2, 0, 3, 6, 4):
+            board.play(column)
+        # Red has to block the three of yellow on the bottom row
+        self.assertEqual(bot.play_turn(board), 5)
+
+    def test_setup_offers_learned_bot(self):
+        setup = GameSetup()
+        with mock.patch("connect4.game_setup._load_network", return_value=None), \
+                mock.patch("builtins.input", side_effect=["4", "3"]), mock.patch("builtins.print"):
+            players = setup.create_players(1)
+        self.assertEqual(players[1].name, "LuckyHansi")
+        if HAS_NUMPY:
+            with mock.patch("connect4.game_setup._load_network", return_value=ValueNetwork.random(seed=0)), \
+                    mock.patch("builtins.input", side_effect=["4"]), mock.patch("builtins.print"):
+                players = setup.create_players(1)
+            self.assertIsInstance(players[1], SearchBot)
+            self.assertIsNotNone(players[1]._engine.evaluator)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+from unittest import mock
+
+from connect4 import GameBoard, SearchBot
+from connect4.engine import SearchEngine
+from connect4.game_setup import MAX_SEARCH_WORKERS, GameSetup
+from connect4.parallel import ParallelSearch
+
+
+def _bitboards(moves: list[int]) -> tuple[int, int]:
+    """Return position and mask after the moves, for the player to move."""
+    board = GameBoard()
+    for column in moves:
+        board.play(column)
+    position = board.get_bitboard(board.color_to_move())
+    return position, board.get_bitboard("red") | board.get_bitboard("yellow")
+
+
+class TestParallelSearch(unittest.TestCase):
+    """
+    Test suite for ParallelSearch.
+
+    Tests cover:
+    - A search to a fixed depth finds the move and score of a single engine
+    - Table statistics of the workers are seen by the parent
+    - Immediate wins are found
+    - The deadline is kept
+    - SearchBot searches in parallel with more than one worker and stops its workers on close
+    - The setup caps the number of workers of MegaHansi
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.search = ParallelSearch(workers=2, table_size=1 << 14)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.search.close()
+
+    def test_same_result_as_engine(self):
+        """The combined result should match the search of a single engine."""
+        position, mask = _bitboards([3, 3, 2, 4, 4, 2])
+        result = self.search.search(position, mask, max_time=None, max_depth=6)
+        expected = SearchEngine(1 << 14).search(position, mask, max_time=None, max_depth=6)
+        self.assertEqual((result.column, result.score, result.depth), (expected.column, expected.score, 6))
+        self.assertGreaterEqual(result.nodes, expected.nodes)
+
+    def test_table_stats(self):
+        """The parent should see the table hits of the workers."""
+        self.search.search(*_bitboards([3, 3, 2]), max_time=None, max_depth=7)
+        stats = self.search.table.stats()
+        self.assertGreater(stats["hit_rate"], 0.0)
+        self.assertGreater(stats["stores"], 0)
+
+    def test_win(self):
+        """A winning move should be played."""
+        position, mask = _bitboards([0, 6, 0, 6, 0, 5])
+        self.assertEqual(self.search.search(position, mask, max_time=1.0).column, 0)
+
+    def test_deadline(self):
+        """A search without depth limit should answer within its time budget."""
+        start = time.perf_counter()
+        result = self.search.search(*_bitboards([3]), max_time=0.5)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(result.depth, 0)
+
+    def test_search_bot(self):
+        """A SearchBot with two workers should block an open three."""
+        board = GameBoard()
+        for column in (0, 6, 1, 6, 2):
+            board.play(column)
+        bot = SearchBot("parallel", max_time=None, max_depth=4, table_size=1 << 12, color="yellow", workers=2)
+        bot.verbose = False
+        self.assertIsInstance(bot._engine, ParallelSearch)
+        self.assertEqual(bot.play_turn(board), 3)
+        bot.close()
+        self.assertFalse(bot._engine._finalizer.alive)
+
+    def test_setup_caps_workers(self):
+        """MegaHansi should search with at most MAX_SEARCH_WORKERS processes."""
+        with mock.patch("os.cpu_count", return_value=64), mock.patch("builtins.input", side_effect=["2"]), \
+                mock.patch("builtins.print"):
+            players = GameSetup().create_players(1)
+        try:
+            self.assertEqual(players[1]._engine.workers, MAX_SEARCH_WORKERS)
+        finally:
+            players[1].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import pickle
+import random
+import unittest
+
+from connect4 import GameBoard
+from connect4 import bitboard
+from connect4.position import Position
+
+
+def random_moves(count, seed=0):
+    """Return a random game of at most ``count`` moves which ends before a win."""
+    rng = random.Random(seed)
+    board = GameBoard()
+    moves = []
+    while len(moves) < count and not board.check_for_draw():
+        column = rng.choice([column for column in range(7) if not board._full_columns >> column & 1])
+        board.play(column)
+        if board.check_last_move_wins():
+            break
+        moves.append(column)
+    return moves
+
+
+class TestPosition(unittest.TestCase):
+    """
+    Test suite for Position.
+
+    Tests cover:
+    - Playing returns a new position and leaves the old one unchanged
+    - Positions are immutable, hashable and picklable
+    - Full columns and invalid bitboards are rejected
+    - Wins and full boards
+    - Export to and import from GameBoard, also for other board sizes
+    """
+
+    def test_play_returns_new_position(self):
+        empty = Position()
+        child = empty.play(3)
+        self.assertEqual(empty, Position())
+        self.assertEqual(empty.moves, 0)
+        self.assertEqual(child.moves, 1)
+        self.assertFalse(child.red_to_move)
+        self.assertEqual(child.get_bitboard("red"), 1 << 3 * bitboard.HEIGHT)
+        self.assertEqual(child.get_bitboard("yellow"), 0)
+
+    def test_play_matches_game_board(self):
+        for seed in range(20):
+            board = GameBoard()
+            position = Position()
+            for column in random_moves(30, seed):
+                board.play(column)
+                position = position.play(column)
+                self.assertEqual(position.get_bitboard("red"), board.get_bitboard("red"))
+                self.assertEqual(position.get_bitboard("yellow"), board.get_bitboard("yellow"))
+                self.assertEqual(position.color_to_move, board.color_to_move())
+
+    def test_immutable(self):
+        position = Position.from_moves([3, 3, 2])
+        with self.assertRaises(AttributeError):
+            position.mask = 0
+        with self.assertRaises(AttributeError):
+            position.other = 1
+        with self.assertRaises(AttributeError):
+            del position.position
+
+    def test_hash_and_equality(self):
+        first = Position.from_moves([3, 2, 4])
+        second = Position.from_moves([4, 2, 3])
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second, Position.from_moves([3, 4, 2])}), 2)
+        self.assertNotEqual(Position.from_moves([3, 3]), Position.from_moves([3, 3, 3, 3]))
+        self.assertNotEqual(Position(), Position(red_to_move=False))
+        self.assertNotEqual(Position(), Position(geometry=bitboard.geometry(6, 9, 4)))
+
+    def test_pickle(self):
+        position = Position.from_moves([3, 3, 4, 0])
+        self.assertEqual(pickle.loads(pickle.dumps(position)), position)
+
+    def test_full_column(self):
+        position = Position.from_moves([0] * 6)
+        self.assertFalse(position.can_play(0))
+        self.assertNotIn(0, position.legal_moves())
+        with self.assertRaises(ValueError):
+            position.play(0)
+        with self.assertRaises(ValueError):
+            position.play(7)
+        self.assertEqual(position.legal_moves(), (3, 2, 4, 1, 5, 6))
+
+    def test_invalid_bitboards(self):
+        with self.assertRaises(ValueError):
+            Position(1, 0)
+        with self.assertRaises(ValueError):
+            Position(0, 0b101)
+        with self.assertRaises(ValueError):
+            Position(0, 1 << bitboard.ROW_COUNT)
+
+    def test_win_and_full_board(self):
+        position = Position.from_moves([0, 1, 0, 1, 0, 1])
+        self.assertTrue(position.is_winning_move(0))
+        self.assertFalse(position.is_winning_move(2))
+        self.assertFalse(position.is_won())
+        self.assertTrue(position.play(0).is_won())
+
+        full = Position(0, bitboard.BOARD_MASK)
+        self.assertTrue(full.is_full())
+        self.assertEqual(full.legal_moves(), ())
+        self.assertFalse(position.is_full())
+
+    def test_game_board_round_trip(self):
+        for seed in range(20):
+            board = GameBoard()
+            for column in random_moves(30, seed):
+                board.play(column)
+            position = board.to_position()
+            copy = GameBoard.from_position(position)
+            self.assertEqual(copy.to_bytes(), board.to_bytes())
+            self.assertEqual(copy.canonical_key(), board.canonical_key())
+            self.assertEqual(copy.color_to_move(), board.color_to_move())
+            self.assertEqual(copy.to_position(), position)
+
+    def test_other_board_size(self):
+        board = GameBoard(rows=5, columns=9, connect=4)
+        for column in [4, 4, 3, 5, 8, 0, 8]:
+            board.play(column)
+        position = board.to_position()
+        self.assertIs(position.geometry, board.geometry)
+        copy = GameBoard.from_position(position.play(8))
+        board.play(8)
+        self.assertEqual(copy.to_bytes(), board.to_bytes())
+        self.assertEqual(copy.geometry, board.geometry)
+
+
+if __name__ == "__main__":
+    unittest.main()
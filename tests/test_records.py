@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+
+from connect4 import GameSession, GameBoard
+from connect4.players import Player
+from connect4.records import GameLog, GameRecord, read_records, replay, summarize
+
+
+class ScriptedPlayer(Player):
+    """Player which plays a fixed list of moves; None surrenders."""
+
+    def __init__(self, name, color, moves):
+        super().__init__(name, color)
+        self._moves = list(moves)
+
+    def play_turn(self, board):
+        return self._moves.pop(0)
+
+
+def play(first_moves, second_moves, first="red", board=None):
+    """Play a scripted game and return its session."""
+    second = "yellow" if first == "red" else "red"
+    session = GameSession(ScriptedPlayer("one", first, first_moves), ScriptedPlayer("two", second, second_moves),
+                          board)
+    while not session.is_over:
+        session.play_turn()
+    return session
+
+
+class TestGameLog(unittest.TestCase):
+    """
+    Test suite for GameRecord, GameLog, read_records(), replay() and summarize().
+
+    Tests cover:
+    - Records of finished sessions are written and streamed back unchanged
+    - Appending to an existing log
+    - A record cut off at the end of the file ends the stream
+    - Replays use add_coin and reject invalid records
+    - Games on other board sizes are replayed on a board of their size
+    - Statistics of a log
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        """Records should be read back in order with outcome and move times."""
+        won = GameRecord.from_session(play([0, 0, 0, 0], [1, 1, 1], first="yellow"))
+        surrendered = GameRecord.from_session(play([3, None], [4]))
+        with GameLog(self.path) as log:
+            log.append(won)
+            log.append(surrendered)
+
+        records = list(read_records(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].moves, [0, 1, 0, 1, 0, 1, 0])
+        self.assertEqual(records[0].first, "yellow")
+        self.assertEqual(records[0].winner, "yellow")
+        self.assertFalse(records[0].surrendered)
+        self.assertEqual(len(records[0].move_times), 7)
+        self.assertAlmostEqual(records[0].move_times[0], won.move_times[0], places=6)
+        self.assertEqual(records[1].moves, [3, 4])
+        self.assertEqual(records[1].winner, "yellow")
+        self.assertTrue(records[1].surrendered)
+
+    def test_append_and_truncated_record(self):
+        """A second log object should append; a cut off record should be skipped."""
+        record = GameRecord([3, 3, 4], winner=None)
+        with GameLog(self.path) as log:
+            log.append(record)
+        with GameLog(self.path) as log:
+            log.append(record)
+        with open(self.path, "ab") as file:
+            file.write(b"\x20\x00\x00\x00\x01")
+        self.assertEqual([r.moves for r in read_records(self.path)], [[3, 3, 4], [3, 3, 4]])
+
+    def test_invalid_file(self):
+        """Files which are no game log should be rejected."""
+        with open(self.path, "wb") as file:
+            file.write(b"no game log")
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+        with self.assertRaises(ValueError):
+            GameLog(self.path)
+
+    def test_replay(self):
+        """Replaying a record should rebuild the final board; invalid moves raise a ValueError."""
+        session = play([0, 0, 0, 0], [1, 1, 1])
+        boards = [board.position_key() for board in replay(GameRecord.from_session(session))]
+        self.assertEqual(len(boards), 7)
+        self.assertEqual(boards[-1], session.board.position_key())
+
+        board = GameBoard()
+        with self.assertRaises(ValueError):
+            list(replay(GameRecord([0] * 7), board))
+        with self.assertRaises(ValueError):
+            list(replay(GameRecord([0, 1, 0, 1, 0, 1, 0, 1]), board))
+
+    def test_other_board_size(self):
+        """A game on a 7x8 board should be logged with its size and replayed on a board of that size."""
+        session = play([7, 7, 7, 7], [0, 0, 0], board=GameBoard(rows=7, columns=8))
+        with GameLog(self.path) as log:
+            log.append(GameRecord.from_session(session))
+        record = next(read_records(self.path))
+        self.assertEqual((record.rows, record.columns, record.connect), (7, 8, 4))
+        boards = [board.position_key() for board in replay(record)]
+        self.assertEqual(len(boards), 7)
+        self.assertEqual(boards[-1], session.board.position_key())
+        with self.assertRaises(ValueError):
+            list(replay(record, GameBoard()))
+
+    def test_summarize(self):
+        """Statistics should count the outcomes and moves."""
+        with GameLog(self.path) as log:
+            log.append(GameRecord.from_session(play([0, 0, 0, 0], [1, 1, 1])))
+            log.append(GameRecord([3, 4], winner="red", surrendered=True))
+        stats = summarize(self.path)
+        self.assertEqual(stats["games"], 2)
+        self.assertEqual(stats["red"], 2)
+        self.assertEqual(stats["surrendered"], 1)
+        self.assertAlmostEqual(stats["average_moves"], 4.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
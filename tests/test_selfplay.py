@@ -0,0 +1,138 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+
+from connect4 import Bot, GameBoard, SmartBot
+from connect4.position import Position
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAS_NUMPY:
+    import numpy as np
+    from connect4.selfplay import CONFIG_FILE, RECORD_DTYPE, SHARD_PATTERN, SelfPlayDataset, game_records, generate
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestGameRecords(unittest.TestCase):
+    """
+    Test suite for game_records().
+
+    Tests cover:
+    - Positions, moves and outcomes from the view of the player to move
+    - Random opening moves are left out
+    """
+
+    def test_labels(self):
+        moves = [3, 2, 3, 2, 3, 2, 3]
+        records = game_records(moves, "red", random_moves=2)
+        self.assertEqual(records.dtype, RECORD_DTYPE)
+        self.assertEqual(len(records), 5)
+        self.assertEqual(list(records["move"]), moves[2:])
+        self.assertEqual(list(records["value"]), [1, -1, 1, -1, 1])
+        self.assertEqual(list(records["ply"]), [2, 3, 4, 5, 6])
+        self.assertEqual(list(records["remaining"]), [5, 4, 3, 2, 1])
+        position = Position.from_moves(moves[:4])
+        self.assertEqual((int(records[2]["position"]), int(records[2]["mask"])), (position.position, position.mask))
+
+    def test_draw(self):
+        records = game_records([0, 1, 2], None)
+        self.assertEqual(list(records["value"]), [0, 0, 0])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestGenerate(unittest.TestCase):
+    """
+    Test suite for generate() and SelfPlayDataset.
+
+    Tests cover:
+    - Shards hold the labelled positions of complete games
+    - An interrupted run is resumed and gives the same shards
+    - A short last shard is played again when the number of games changes
+    - Other settings on the same directory are rejected
+    - Batches are shuffled and hold every record once per epoch
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shards_hold_games(self):
+        report = generate(self.path, SmartBot, Bot, games=5, workers=1, games_per_shard=2, random_moves=2)
+        self.assertEqual((report.shards, report.skipped, report.games), (3, 0, 5))
+        dataset = SelfPlayDataset(self.path)
+        self.assertEqual(len(dataset.paths), 3)
+        self.assertEqual(len(dataset), report.records)
+
+        records = dataset.records()
+        self.assertTrue(set(records["value"].tolist()) <= {-1, 0, 1})
+        # Every game starts after the random opening and ends with a move which wins or fills the board
+        for record in records[records["remaining"] == 1]:
+            mask = int(record["mask"])
+            board = GameBoard.from_position(Position(int(record["position"]), mask, record["ply"] % 2 == 0))
+            board.play(int(record["move"]))
+            self.assertEqual(record["value"] == 1, board.check_last_move_wins())
+        self.assertEqual(int(np.sum(records["ply"] == 2)), 5)
+
+    def test_resume(self):
+        generate(self.path, SmartBot, Bot, games=4, workers=1, games_per_shard=2)
+        shard = os.path.join(self.path, SHARD_PATTERN.format(1))
+        expected = np.load(shard)
+        os.remove(shard)
+
+        report = generate(self.path, SmartBot, Bot, games=6, workers=2, games_per_shard=2)
+        self.assertEqual((report.shards, report.skipped, report.games), (2, 1, 4))
+        np.testing.assert_array_equal(np.load(shard), expected)
+        self.assertFalse([name for name in os.listdir(self.path) if name.endswith(".tmp")])
+
+    def test_short_last_shard(self):
+        generate(self.path, SmartBot, Bot, games=3, workers=1, games_per_shard=2)
+        shard = os.path.join(self.path, SHARD_PATTERN.format(1))
+        short = np.load(shard)
+
+        report = generate(self.path, SmartBot, Bot, games=4, workers=1, games_per_shard=2)
+        self.assertEqual((report.shards, report.skipped, report.games), (1, 1, 2))
+        records = np.load(shard)
+        self.assertEqual(int(np.sum(records["ply"] == 4)), 2)
+        np.testing.assert_array_equal(records[:len(short)], short)
+
+        report = generate(self.path, SmartBot, Bot, games=3, workers=1, games_per_shard=2)
+        self.assertEqual((report.shards, report.skipped, report.games), (1, 1, 1))
+        np.testing.assert_array_equal(np.load(shard), short)
+        report = generate(self.path, SmartBot, Bot, games=2, workers=1, games_per_shard=2)
+        self.assertEqual((report.shards, report.skipped), (0, 1))
+        self.assertFalse(os.path.exists(shard))
+
+    def test_other_settings_rejected(self):
+        generate(self.path, SmartBot, Bot, games=2, workers=1, games_per_shard=2)
+        with open(os.path.join(self.path, CONFIG_FILE)) as file:
+            self.assertEqual(json.load(file)["player1"]["class"], "SmartBot")
+        with self.assertRaises(ValueError):
+            generate(self.path, SmartBot, Bot, games=2, workers=1, games_per_shard=2, seed=1)
+
+    def test_batches(self):
+        generate(self.path, SmartBot, Bot, games=6, workers=1, games_per_shard=2)
+        dataset = SelfPlayDataset(self.path)
+        records = dataset.records()
+        epoch = list(dataset.batches(batch_size=16, buffer_size=40, seed=0))
+        self.assertTrue(all(len(batch) == 16 for batch in epoch[:-1]))
+        self.assertEqual(sum(len(batch) for batch in epoch), len(records))
+
+        def key(array):
+            return sorted(zip(array["position"].tolist(), array["mask"].tolist(), array["move"].tolist()))
+
+        self.assertEqual(key(np.concatenate(epoch)), key(records))
+        self.assertNotEqual(key(epoch[0]), key(records[:16]))
+
+        # The same seed shuffles the same way, every epoch covers all records again
+        batches = np.concatenate(list(dataset.batches(batch_size=16, buffer_size=40, seed=0, epochs=2)))
+        np.testing.assert_array_equal(batches[:len(records)], np.concatenate(epoch))
+        self.assertEqual(key(batches[len(records):]), key(records))
+
+
+if __name__ == "__main__":
+    unittest.main()
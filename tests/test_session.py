@@ -0,0 +1,213 @@
+import asyncio
+import time
+import unittest
+
+from connect4 import GameBoard, GameSession, SmartBot, SearchBot, Bot
+from connect4.players import Player
+from connect4.server import GameServer
+
+
+class ScriptedPlayer(Player):
+    """Player which plays a fixed list of moves."""
+
+    def __init__(self, name, color, moves):
+        super().__init__(name, color)
+        self._moves = list(moves)
+
+    def play_turn(self, board):
+        return self._moves.pop(0)
+
+
+class TestGameSession(unittest.TestCase):
+    """
+    Test suite for GameSession.
+
+    Tests cover:
+    - Players alternate and the game ends with a win
+    - Invalid moves keep the turn
+    - Surrender and draw end the game
+    """
+
+    def test_win(self):
+        """Red stacking four coins in column 0 should win."""
+        red = ScriptedPlayer("red", "red", [0, 0, 0, 0])
+        yellow = ScriptedPlayer("yellow", "yellow", [1, 1, 1])
+        session = GameSession(red, yellow)
+        while not session.is_over:
+            self.assertTrue(session.play_turn())
+        self.assertIs(session.winner, red)
+        self.assertEqual(session.moves, [0, 1, 0, 1, 0, 1, 0])
+        self.assertEqual(len(session.move_times), 7)
+        self.assertEqual(session.result_message(), "red has won the game!")
+
+    def test_invalid_move_keeps_turn(self):
+        """An invalid column should be rejected without changing the current player."""
+        red = ScriptedPlayer("red", "red", [])
+        yellow = ScriptedPlayer("yellow", "yellow", [])
+        session = GameSession(red, yellow)
+        self.assertEqual(session.apply_move(9), "Error, invalid column!")
+        self.assertIs(session.current_player, red)
+        for _ in range(6):
+            session.apply_move(2)
+        self.assertIs(session.apply_move(2), False)
+
+    def test_surrender(self):
+        """A surrender should end the game with the opponent as winner."""
+        red = ScriptedPlayer("red", "red", [3, None])
+        yellow = ScriptedPlayer("yellow", "yellow", [3])
+        session = GameSession(red, yellow)
+        while not session.is_over:
+            session.play_turn()
+        self.assertIs(session.winner, yellow)
+        self.assertEqual(session.result_message(), "yellow has won the game! red surrendered.")
+
+    def test_draw(self):
+        """Filling the board without four in a row should be a draw."""
+        red = ScriptedPlayer("red", "red", [])
+        yellow = ScriptedPlayer("yellow", "yellow", [])
+        session = GameSession(red, yellow)
+        for column in "361313645534311043046626105524515600224220":
+            self.assertFalse(session.is_over)
+            self.assertTrue(session.apply_move(int(column)))
+        self.assertTrue(session.is_over)
+        self.assertIsNone(session.winner)
+        self.assertEqual(session.result_message(), "Game has ended with a draw.")
+
+
+class SlowPlayer(ScriptedPlayer):
+    """Scripted player which takes some time for every move, like a human."""
+
+    def play_turn(self, board):
+        time.sleep(0.3)
+        return super().play_turn(board)
+
+
+class TestPondering(unittest.TestCase):
+    """
+    Test suite for pondering of the SearchBot.
+
+    Tests cover:
+    - The search after the opponent's move reuses the pondering results
+    - The session stops pondering at the end of the game
+    """
+
+    def test_reuse(self):
+        """A search after pondering should need fewer nodes than a search from scratch."""
+        board = GameBoard()
+        for column in (3, 3, 2, 4):
+            board.play(column)
+        fresh = SearchBot("fresh", max_time=None, max_depth=8, table_size=1 << 16, color="yellow")
+        pondering = SearchBot("ponder", max_time=None, max_depth=8, table_size=1 << 16, color="yellow",
+                              ponder=True)
+        fresh.verbose = pondering.verbose = False
+        pondering.start_pondering(board)
+        time.sleep(0.5)
+        board.play(2)
+        self.assertEqual(pondering.play_turn(board), fresh.play_turn(board))
+        self.assertIsNone(pondering._ponder_thread)
+        self.assertLess(pondering._engine.nodes, fresh._engine.nodes)
+
+    def test_session(self):
+        """The bot should ponder during the opponent's moves and stop when the game ends."""
+        red = SlowPlayer("red", "red", [0, 0, 0, 0])
+        bot = SearchBot("bot", max_time=0.1, table_size=1 << 12, color="yellow", ponder=True)
+        bot.verbose = False
+        session = GameSession(red, bot)
+        session.play_turn()
+        self.assertIsNotNone(bot._ponder_thread)
+        session.apply_move(6)
+        session.play_turn()
+        session.apply_move(None)
+        self.assertTrue(session.is_over)
+        self.assertIsNone(bot._ponder_thread)
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the asyncio GameServer.
+
+    Tests cover:
+    - Several clients play complete games against bots at the same time
+    - Invalid commands, also non-decimal digits and bytes which are not UTF-8, are answered with ERROR
+    - Other clients are answered while the search bot computes a move
+    """
+
+    async def asyncSetUp(self):
+        self.game_server = GameServer()
+        self.server = await self.game_server.start("127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.game_server.close()
+
+    async def play(self, difficulty):
+        """Play a game with the lowest free column until the server sends a result."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.assertEqual(await reader.readline(), b"HELLO connect4\n")
+        writer.write(f"NEW {difficulty} first\n".encode())
+        self.assertTrue((await reader.readline()).startswith(b"GAME you=red"))
+        self.assertEqual(await reader.readline(), b"TURN\n")
+        heights = [0] * 7
+        result = None
+        while result is None:
+            column = min(range(7), key=lambda c: (heights[c] >= 6, c))
+            writer.write(f"MOVE {column}\n".encode())
+            while True:
+                line = (await reader.readline()).decode().split()
+                if line[0] in ("OK", "BOT"):
+                    heights[int(line[1])] += 1
+                elif line[0] == "RESULT":
+                    result = line[1]
+                    break
+                elif line[0] == "TURN":
+                    break
+        writer.write(b"QUIT\n")
+        self.assertEqual(await reader.readline(), b"BYE\n")
+        writer.close()
+        return result
+
+    async def test_concurrent_games(self):
+        """Games against different bots should run at the same time and all end with a result."""
+        results = await asyncio.gather(*(self.play(difficulty) for difficulty in (0, 1, 1, 0)))
+        self.assertTrue(all(result in ("win", "loss", "draw") for result in results))
+
+    async def test_errors(self):
+        """Moves without a game, unknown commands and undecodable lines should be answered with ERROR."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        await reader.readline()
+        writer.write(b"MOVE 3\nHELLO\nNEW 9\nNEW \xc2\xb2\n\xff\xfe\n")
+        for _ in range(5):
+            self.assertTrue((await reader.readline()).startswith(b"ERROR"))
+        writer.write(b"QUIT\n")
+        await reader.readline()
+        writer.close()
+
+    async def test_search_does_not_stall_other_clients(self):
+        """While the search bot computes its first move in a worker process, another client gets its answers."""
+        searching_reader, searching_writer = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        await searching_reader.readline()
+        await reader.readline()
+        # Start the worker processes before timing
+        writer.write(b"NEW 0 second\n")
+        for _ in range(3):
+            await reader.readline()
+
+        searching_writer.write(b"NEW 2 second\n")
+        self.assertTrue((await searching_reader.readline()).startswith(b"GAME"))
+        start = time.perf_counter()
+        writer.write(b"BOARD\n")
+        self.assertTrue((await reader.readline()).startswith(b"BOARD"))
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertTrue((await searching_reader.readline()).startswith(b"BOT "))
+        self.assertEqual(await searching_reader.readline(), b"TURN\n")
+        for stream_reader, stream_writer in ((reader, writer), (searching_reader, searching_writer)):
+            stream_writer.write(b"QUIT\n")
+            self.assertEqual(await stream_reader.readline(), b"BYE\n")
+            stream_writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
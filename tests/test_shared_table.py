@@ -0,0 +1,114 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from connect4.engine import _HASH_MULTIPLIER, EXACT, LOWER, UPPER, SearchEngine, TranspositionTable
+from connect4.movepool import MoveService
+from connect4.shared_table import BUCKET_SIZE, SharedTranspositionTable
+from connect4 import GameBoard
+
+
+def _store_in_worker(table, keys):
+    """Store entries from another process and return its counts."""
+    for key in keys:
+        table.store(key, 5, LOWER, -key, key % 7)
+    return table.get(keys[0]), table.take_counts()
+
+
+class TestSharedTranspositionTable(unittest.TestCase):
+    """
+    Test suite for SharedTranspositionTable.
+
+    Tests cover:
+    - Stored entries are found again with all fields, also negative values
+    - Entries written by another process are visible, its counts can be added
+    - Replacement prefers older and shallower entries of a full bucket
+    - Statistics report hits, fill level and memory use
+    - SearchEngine and MoveService work with a shared table
+    """
+
+    def setUp(self):
+        self.table = SharedTranspositionTable(1 << 10)
+
+    def tearDown(self):
+        self.table.close()
+        self.table.unlink()
+
+    def test_store_and_get(self):
+        """Entries should round trip and unknown keys should miss."""
+        self.table.store(12345, 7, EXACT, -99999, 3)
+        self.table.store(777, 0, UPPER, 100000, -1)
+        self.assertEqual(self.table.get(12345), (7, EXACT, -99999, 3))
+        self.assertEqual(self.table.get(777), (0, UPPER, 100000, -1))
+        self.assertIsNone(self.table.get(12345 + self.table.size))
+        self.assertEqual(self.table.size % BUCKET_SIZE, 0)
+
+    def test_other_process(self):
+        """Entries stored by a worker process should be visible to the creator."""
+        keys = [3, 1000, 123456789]
+        with ProcessPoolExecutor(1) as executor:
+            entry, counts = executor.submit(_store_in_worker, self.table, keys).result()
+        self.assertEqual(entry, (5, LOWER, -3, 3))
+        self.assertEqual(counts, (1, 1, 3))
+        self.assertEqual(self.table.stats()["stores"], 0)
+        self.table.add_counts(counts)
+        self.assertEqual((self.table.stats()["stores"], self.table.stats()["hits"]), (3, 1))
+        for key in keys:
+            self.assertEqual(self.table.get(key), (5, LOWER, -key, key % 7))
+
+    def test_replacement(self):
+        """In a full bucket the shallowest entry goes first, entries of older searches before that."""
+        buckets = self.table.size // BUCKET_SIZE
+        keys = [key for key in range(1, 100000) if (key * _HASH_MULTIPLIER >> 32) % buckets == 0][:BUCKET_SIZE + 2]
+        for depth, key in enumerate(keys[:BUCKET_SIZE], 3):
+            self.table.store(key, depth, EXACT, 0, 0)
+        self.table.store(keys[BUCKET_SIZE], 10, EXACT, 0, 0)
+        self.assertIsNone(self.table.get(keys[0]))
+        self.assertIsNotNone(self.table.get(keys[1]))
+
+        self.table.new_search()
+        self.table.store(keys[1], 9, EXACT, 0, 0)
+        self.table.store(keys[BUCKET_SIZE + 1], 1, EXACT, 0, 0)
+        self.assertIsNotNone(self.table.get(keys[1]))
+        self.assertIsNone(self.table.get(keys[2]))
+
+    def test_stats(self):
+        """Statistics should count hits and used entries."""
+        self.table.store(5, 1, EXACT, 0, 0)
+        self.table.get(5)
+        self.table.get(6)
+        stats = self.table.stats()
+        self.assertEqual((stats["probes"], stats["hits"], stats["hit_rate"]), (2, 1, 0.5))
+        self.assertEqual((stats["used"], stats["current"]), (1, 1))
+        self.assertGreaterEqual(stats["memory_bytes"], 16 * self.table.size)
+        self.table.new_search()
+        self.table.store(6, 1, EXACT, 0, 0)
+        self.assertEqual((self.table.stats()["used"], self.table.stats()["current"]), (2, 1))
+        self.assertEqual(self.table.take_counts(), (2, 1, 2))
+        self.assertEqual(self.table.stats()["probes"], 0)
+        self.table.clear()
+        self.assertEqual(self.table.stats()["used"], 0)
+
+    def test_engine(self):
+        """A search with a shared table should find the same move as with a local table."""
+        board = GameBoard()
+        for col in (3, 3, 2, 4):
+            board.play(col)
+        position = board.get_bitboard("red")
+        mask = position | board.get_bitboard("yellow")
+        shared = SearchEngine(table=self.table).search(position, mask, max_time=None, max_depth=6)
+        local = SearchEngine(1 << 12).search(position, mask, max_time=None, max_depth=6)
+        self.assertEqual((shared.column, shared.score), (local.column, local.score))
+        self.assertGreater(self.table.stats()["hits"], 0)
+        self.assertIsInstance(SearchEngine(1 << 4).table, TranspositionTable)
+
+    def test_move_service(self):
+        """Workers of a MoveService with a shared table should fill the table."""
+        with MoveService(workers=2, table_size=1 << 12, shared_table=True) as service:
+            board = GameBoard()
+            service.submit(board, "red", 0.5, max_depth=6).result(5)
+            self.assertGreater(service.table.stats()["used"], 0)
+            self.assertGreater(service.table.stats()["stores"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from connect4 import Bot, SmartBot, GameBoard
+from connect4.simulate import play_game, simulate
+
+
+class TestPlayGame(unittest.TestCase):
+    """
+    Test suite for play_game().
+
+    Tests cover:
+    - A finished game has a winner whose last move connects four, or a full board
+    """
+
+    def test_game_ends_with_win_or_draw(self):
+        """Replaying the moves of a game should end in the reported result."""
+        red = SmartBot("red", color="red")
+        yellow = Bot("yellow", color="yellow")
+        red.verbose = yellow.verbose = False
+        result = play_game(red, yellow)
+        board = GameBoard()
+        for move in result.moves:
+            board.play(move)
+        if result.winner is None:
+            self.assertTrue(board.check_for_draw())
+        else:
+            self.assertTrue(board.check_for_winner(result.winner))
+            self.assertEqual(board._moves[-1][1], result.winner)
+
+
+class TestSimulate(unittest.TestCase):
+    """
+    Test suite for simulate().
+
+    Tests cover:
+    - Results add up to the number of games and every move is timed
+    - Same seed gives the same results in one process and on a process pool
+    """
+
+    def test_counts(self):
+        """Wins, draws and losses should add up to the number of games."""
+        report = simulate(SmartBot, Bot, games=20, workers=1, seed=3)
+        self.assertEqual(report.games, 20)
+        self.assertEqual(report.wins + report.draws + report.losses, 20)
+        self.assertGreater(report.wins, report.losses)
+        self.assertTrue(report.move_times["player1"])
+        self.assertGreater(report.games_per_second, 0)
+
+    def test_reproducible_with_workers(self):
+        """The same seed and chunk size should give the same counts with one and with two workers."""
+        single = simulate(Bot, Bot, games=12, workers=1, seed=5, chunk_size=3)
+        pool = simulate(Bot, Bot, games=12, workers=2, seed=5, chunk_size=3)
+        self.assertEqual((single.wins, single.draws, single.losses), (pool.wins, pool.draws, pool.losses))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import random
+import tempfile
+import unittest
+
+from connect4 import GameBoard
+from connect4.snapshot import SnapshotFile, write_snapshot
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_boards(count, seed=0):
+    """Return boards with random positions."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = GameBoard()
+        for _ in range(rng.randrange(40)):
+            board.play(rng.randrange(7))
+        boards.append(board)
+    return boards
+
+
+class TestSnapshotFile(unittest.TestCase):
+    """
+    Test suite for write_snapshot() and SnapshotFile.
+
+    Tests cover:
+    - Written boards are read back by index and as a stream
+    - The color which started is kept
+    - The file closes while a stream is still open
+    - Appending to a file
+    - Files which are no snapshot are rejected
+    - NumPy view of the mapped file
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "positions.c4ps")
+        self.boards = random_boards(50)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_back(self):
+        """Every board should be read back unchanged."""
+        self.assertEqual(write_snapshot(self.path, self.boards), 50)
+        with SnapshotFile(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 50)
+            for index, board in enumerate(self.boards):
+                self.assertEqual(snapshot[index].position_key(), board.position_key())
+            self.assertEqual(snapshot[-1].position_key(), self.boards[-1].position_key())
+            expected = [(board.get_bitboard("red"), board.get_bitboard("yellow")) for board in self.boards]
+            self.assertEqual(list(snapshot.iter_bitboards()), expected)
+            self.assertEqual(snapshot.bitboards(7), expected[7])
+            with self.assertRaises(IndexError):
+                snapshot[50]
+
+    def test_append(self):
+        """Appending should add records behind the existing ones."""
+        write_snapshot(self.path, self.boards[:20])
+        write_snapshot(self.path, self.boards[20:], append=True)
+        with SnapshotFile(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 50)
+            self.assertEqual(snapshot[20].position_key(), self.boards[20].position_key())
+
+    def test_starter(self):
+        """A board started by yellow should be read back with yellow to move after the same number of coins."""
+        board = GameBoard()
+        board.add_coin("yellow", 3)
+        board.add_coin("red", 3)
+        write_snapshot(self.path, [board, self.boards[0]])
+        with SnapshotFile(self.path) as snapshot:
+            self.assertEqual(snapshot[0].first_color(), "yellow")
+            self.assertEqual(snapshot[0].color_to_move(), "yellow")
+            self.assertEqual(snapshot[1].first_color(), "red")
+
+    def test_close_with_open_stream(self):
+        """Closing should not fail while an iterator over the records is alive."""
+        write_snapshot(self.path, self.boards)
+        snapshot = SnapshotFile(self.path)
+        stream = snapshot.iter_bitboards()
+        self.assertEqual(next(stream), (self.boards[0].get_bitboard("red"), self.boards[0].get_bitboard("yellow")))
+        snapshot.close()
+        with self.assertRaises(ValueError):
+            next(stream)
+
+    def test_empty_and_invalid_files(self):
+        """An empty snapshot has no records, other files are rejected."""
+        write_snapshot(self.path, [])
+        with SnapshotFile(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertEqual(list(snapshot.iter_bitboards()), [])
+        with open(self.path, "wb") as file:
+            file.write(b"no snapshot")
+        with self.assertRaises(ValueError):
+            SnapshotFile(self.path)
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, self.boards, append=True)
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_numpy_view(self):
+        """The NumPy array should hold the bitboards of all boards."""
+        write_snapshot(self.path, self.boards)
+        with SnapshotFile(self.path) as snapshot:
+            array = snapshot.to_numpy()
+            self.assertEqual(array.shape, (50,))
+            self.assertEqual(int(array["red"][3]), self.boards[3].get_bitboard("red"))
+            self.assertEqual(int(array["yellow"][3]), self.boards[3].get_bitboard("yellow"))
+            self.assertEqual(int(array["first"][3]), 0)
+            del array
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from connect4 import GameBoard, PerfectBot, bitboard
+from connect4.records import GameLog, GameRecord
+from connect4.solver import EndgameTable, Solution, Solver, _solver, build_endgame_table, main, solve
+
+
+# Positions with their scores from the test sets of the well-known Connect 4 solver; columns count from 1
+KNOWN_POSITIONS = [
+    ("2252576253462244111563365343671351441", -1),
+    ("7422341735647741166133573473242566", 1),
+    ("23163416124767223154467471272416755633", 0),
+]
+
+# Middlegame of two search bots, red to move after 14 moves
+MIDDLEGAME = [3, 3, 2, 4, 0, 1, 3, 4, 1, 4, 4, 3, 2, 2, 3, 4, 0, 3, 2, 1, 1, 2, 2, 0]
+
+
+def bitboards(moves: list[int]) -> tuple[int, int]:
+    """Return position and mask after the moves, for the player to move."""
+    position = mask = 0
+    for column in moves:
+        position, mask = bitboard.play(position, mask, column)
+    return position, mask
+
+
+def brute_force(position: int, mask: int) -> int:
+    """Return the score of a position by searching every move without pruning."""
+    moves = bitboard.popcount(mask)
+    best = None
+    for column in range(bitboard.COLUMN_COUNT):
+        if not bitboard.can_play(mask, column):
+            continue
+        if bitboard.is_winning_move(position, mask, column):
+            return (bitboard.CELL_COUNT + 1 - moves) // 2
+        score = 0 if moves + 1 == bitboard.CELL_COUNT else -brute_force(*bitboard.play(position, mask, column))
+        best = score if best is None else max(best, score)
+    return best
+
+
+class TestSolver(unittest.TestCase):
+    """
+    Test suite for the Solver.
+
+    Tests cover:
+    - Known scores and the scores of a search without pruning
+    - Best moves keep the score, the scores of all columns
+    - Mirrored positions have the same score
+    - Distances to the end of the game
+    - solve() for GameBoards, reusing its solver, and the command line
+    """
+
+    def test_known_positions(self):
+        """The scores of the reference positions should be reproduced."""
+        solver = Solver(1 << 16)
+        for moves, score in KNOWN_POSITIONS:
+            self.assertEqual(solver.solve(*bitboards([int(column) - 1 for column in moves])), score, moves)
+
+    def test_brute_force(self):
+        """Scores of endgame positions should match a search without pruning."""
+        solver = Solver(1 << 16)
+        for cut in (32, 33, 34):
+            position, mask = bitboards([int(column) - 1 for column in KNOWN_POSITIONS[2][0][:cut]])
+            self.assertEqual(solver.solve(position, mask), brute_force(position, mask))
+
+    def test_best_move(self):
+        """The best move should keep the score and analyze() should agree with it."""
+        solver = Solver(1 << 18)
+        position, mask = bitboards(MIDDLEGAME[:18])
+        solution = solver.best_move(position, mask)
+        scores = solver.analyze(position, mask)
+        self.assertEqual(solution.score, max(scores.values()))
+        self.assertEqual(scores[solution.column], solution.score)
+        self.assertEqual(solution.result, "loss")
+
+    def test_mirror(self):
+        """A position and its mirror image should have the same score."""
+        moves = MIDDLEGAME[:18]
+        solver = Solver(1 << 18)
+        score = solver.solve(*bitboards(moves))
+        self.assertEqual(Solver(1 << 18).solve(*bitboards([6 - column for column in moves])), score)
+
+    def test_distance(self):
+        """Distances should count the plies until the winning move."""
+        self.assertEqual(Solution.from_score(21, 0), Solution(21, "win", 1))
+        self.assertEqual(Solution.from_score(18, 4), Solution(18, "win", 3))
+        self.assertEqual(Solution.from_score(-17, 7), Solution(-17, "loss", 2))
+        self.assertEqual(Solution.from_score(0, 38, 2), Solution(0, "draw", 4, 2))
+
+    def test_solve_board(self):
+        """solve() should take the color to move from the board and reject boards it cannot solve."""
+        board = GameBoard()
+        for column in (3, 3, 2, 3):
+            board.play(column)
+        self.assertEqual(solve(board, 1 << 12), Solution(18, "win", 3, 4))
+        for column in (4, 0, 1):
+            board.play(column)
+        with self.assertRaises(ValueError):
+            solve(board)
+        with self.assertRaises(ValueError):
+            solve(GameBoard(7, 9, 5))
+
+    def test_solve_reuses_table(self):
+        """solve() should keep its solver, so solving a position again searches far fewer nodes."""
+        board = GameBoard()
+        for column in (1, 3, 4, 2, 1, 0, 4, 6, 0, 4, 6, 1, 4, 3, 1, 6, 6, 6):
+            board.play(column)
+        counts = []
+        for _ in range(2):
+            nodes = _solver(1 << 12).nodes
+            self.assertEqual(solve(board, 1 << 12).result, "win")
+            counts.append(_solver(1 << 12).nodes - nodes)
+        self.assertLess(4 * counts[1], counts[0])
+
+    def test_command_line(self):
+        """The command line should print the result and the scores of all columns."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(["".join(str(int(column) - 1) for column in KNOWN_POSITIONS[1][0]), "--analyze"])
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[:3], ["score    1", "result   win for red in 7 plies", "best     1"])
+        self.assertIn("column 4: -4", lines)
+
+
+class TestEndgameTable(unittest.TestCase):
+    """
+    Test suite for the endgame table.
+
+    Tests cover:
+    - Building a table from a game log and reading its scores
+    - The solver takes scores from the table
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.directory.name, "games.bin")
+        self.table_path = os.path.join(self.directory.name, "endgame.bin")
+        with GameLog(self.log_path) as log:
+            log.append(GameRecord([int(column) - 1 for column in KNOWN_POSITIONS[0][0]]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_build_and_lookup(self):
+        """The table should hold the solved endgame positions of the logged game."""
+        count = build_endgame_table(self.table_path, self.log_path, max_empty=8)
+        table = EndgameTable(self.table_path)
+        self.assertEqual((len(table), table.max_empty), (count, 8))
+        position, mask = bitboards([int(column) - 1 for column in KNOWN_POSITIONS[0][0]])
+        self.assertEqual(table.lookup(bitboard.canonical_key(position, mask)[0]), -1)
+        self.assertIsNone(table.lookup(0))
+        table.close()
+
+    def test_solver_uses_table(self):
+        """The solver should open the table lazily and answer endgame positions from it."""
+        build_endgame_table(self.table_path, self.log_path, max_empty=8)
+        solver = Solver(1 << 12, endgame=self.table_path)
+        self.assertIsInstance(solver._endgame, str)
+        position, mask = bitboards([int(column) - 1 for column in KNOWN_POSITIONS[0][0][:35]])
+        score = solver.solve(position, mask)
+        self.assertIsInstance(solver._endgame, EndgameTable)
+        searching = Solver(1 << 12, endgame=None)
+        self.assertEqual(score, searching.solve(position, mask))
+        self.assertLess(solver.nodes, searching.nodes)
+        solver._endgame.close()
+
+
+class TestPerfectBot(unittest.TestCase):
+    """Test suite for the PerfectBot."""
+
+    def test_plays_best_move(self):
+        """The bot should play a move which keeps the proven score."""
+        board = GameBoard()
+        for column in MIDDLEGAME[:18]:
+            board.play(column)
+        bot = PerfectBot("perfect", table_size=1 << 18, color="red")
+        bot.verbose = False
+        column = bot.play_turn(board)
+        position, mask = bitboards(MIDDLEGAME[:18])
+        scores = Solver(1 << 18).analyze(position, mask)
+        self.assertEqual(scores[column], max(scores.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()